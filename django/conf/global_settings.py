@@ -209,6 +209,22 @@ TEMPLATE_CONTEXT_PROCESSORS = (
 # Output to use in template system for invalid (e.g. misspelled) variables.
 TEMPLATE_STRING_IF_INVALID = ''
 
+# Whether to compile templates to Python functions, which render them faster.
+# Not used when TEMPLATE_DEBUG is True.
+TEMPLATE_COMPILE = False
+
+# Seconds between the checks of the cached template loader for modified
+# template files. None means that cached templates are never reloaded.
+TEMPLATE_CACHE_CHECK_INTERVAL = None
+
+# Directory in which the cached template loader shares parsed templates
+# between processes. None disables this cache.
+TEMPLATE_CACHE_DIR = None
+
+# Changed on each deployment to discard the templates shared through
+# TEMPLATE_CACHE_DIR, which may depend on code that has changed.
+TEMPLATE_CACHE_VERSION = ''
+
 # Default email address to use for various automated correspondence from
 # the site managers.
 DEFAULT_FROM_EMAIL = 'webmaster@localhost'
@@ -473,6 +489,13 @@ CACHES = {
 CACHE_MIDDLEWARE_KEY_PREFIX = ''
 CACHE_MIDDLEWARE_SECONDS = 600
 CACHE_MIDDLEWARE_ALIAS = 'default'
+# The number of seconds expired pages are served while one request
+# regenerates them, and the longest time it may take.
+CACHE_MIDDLEWARE_STALE_SECONDS = 0
+CACHE_MIDDLEWARE_LOCK_SECONDS = 10
+# How early pages are regenerated before they expire, relative to the time
+# they took to generate. 0 disables early regeneration.
+CACHE_MIDDLEWARE_EARLY_REFRESH = 0
 
 ####################
 # COMMENTS         #
@@ -18,7 +18,7 @@ from django.db.models.constants import LOOKUP_SEP
 from django.db.models.related import RelatedObject
 from django.db.models.fields import BLANK_CHOICE_DASH, FieldDoesNotExist
 from django.db.models.sql.constants import QUERY_TERMS
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.http import Http404, HttpResponse, HttpResponseBase, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.template.response import SimpleTemplateResponse, TemplateResponse
 from django.utils.decorators import method_decorator
@@ -321,6 +321,7 @@ class ModelAdmin(BaseModelAdmin):
     save_as = False
     save_on_top = False
     paginator = Paginator
+    count_strategy = None
     inlines = []
 
     # Custom templates (designed to be over-ridden in subclasses)
@@ -508,7 +509,10 @@ class ModelAdmin(BaseModelAdmin):
             yield inline.get_formset(request, obj)
 
     def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
-        return self.paginator(queryset, per_page, orphans, allow_empty_first_page)
+        if self.count_strategy is None:
+            return self.paginator(queryset, per_page, orphans, allow_empty_first_page)
+        return self.paginator(queryset, per_page, orphans, allow_empty_first_page,
+                              count_strategy=self.count_strategy)
 
     def log_addition(self, request, object):
         """
@@ -911,7 +915,7 @@ class ModelAdmin(BaseModelAdmin):
             # Actions may return an HttpResponse, which will be used as the
             # response from the POST. If not, we'll be a good little HTTP
             # citizen and redirect back to the changelist page.
-            if isinstance(response, HttpResponse):
+            if isinstance(response, HttpResponseBase):
                 return response
             else:
                 return HttpResponseRedirect(request.get_full_path())
@@ -169,8 +169,11 @@ class ChangeList(object):
         # Perform a slight optimization: Check to see whether any filters were
         # given. If not, use paginator.hits to calculate the number of objects,
         # because we've already done paginator.hits and the value is cached.
+        # The count strategy of the paginator, if any, is used for both.
         if not self.query_set.query.where:
             full_result_count = result_count
+        elif getattr(paginator, 'count_strategy', None) is not None:
+            full_result_count = paginator.count_strategy.count(self.root_query_set)
         else:
             full_result_count = self.root_query_set.count()
 
@@ -63,7 +63,11 @@ class GenericForeignKey(object):
             # This should never happen. I love comments like this, don't you?
             raise Exception("Impossible arguments to GFK.get_content_type!")
 
-    def get_prefetch_query_set(self, instances):
+    def get_prefetch_query_set(self, instances, queryset=None):
+        if queryset is not None:
+            raise ValueError("Custom querysets can't be used to prefetch "
+                             "generic foreign keys.")
+
         # For efficiency, group the instances by content type and then do one
         # query per model
         fk_dict = defaultdict(set)
@@ -321,14 +325,16 @@ def create_generic_related_manager(superclass):
                 db = self._db or router.db_for_read(self.model, instance=self.instance)
                 return super(GenericRelatedObjectManager, self).get_query_set().using(db).filter(**self.core_filters)
 
-        def get_prefetch_query_set(self, instances):
-            db = self._db or router.db_for_read(self.model, instance=instances[0])
+        def get_prefetch_query_set(self, instances, queryset=None):
+            if queryset is None:
+                db = self._db or router.db_for_read(self.model, instance=instances[0])
+                queryset = super(GenericRelatedObjectManager, self).get_query_set().using(db)
             query = {
                 '%s__pk' % self.content_type_field_name: self.content_type.id,
                 '%s__in' % self.object_id_field_name:
                     set(obj._get_pk_val() for obj in instances)
                 }
-            qs = super(GenericRelatedObjectManager, self).get_query_set().using(db).filter(**query)
+            qs = queryset.filter(**query)
             return (qs,
                     attrgetter(self.object_id_field_name),
                     lambda obj: obj._get_pk_val(),
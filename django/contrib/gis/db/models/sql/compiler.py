@@ -279,7 +279,7 @@ class SQLDateCompiler(compiler.SQLDateCompiler, GeoSQLCompiler):
     `GeoQuery.resolve_columns` is used for spatial values.
     See #14648, #16757.
     """
-    def results_iter(self):
+    def results_iter(self, chunk_size=None):
         if self.connection.ops.oracle:
             from django.db.models.fields import DateTimeField
             fields = [DateTimeField()]
@@ -287,7 +287,7 @@ class SQLDateCompiler(compiler.SQLDateCompiler, GeoSQLCompiler):
             needs_string_cast = self.connection.features.needs_datetime_string_cast
 
         offset = len(self.query.extra_select)
-        for rows in self.execute_sql(MULTI):
+        for rows in self.execute_sql(MULTI, chunk_size=chunk_size):
             for row in rows:
                 date = row[offset]
                 if self.connection.ops.oracle:
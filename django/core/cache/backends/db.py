@@ -1,5 +1,6 @@
 "Database cache backend."
 import base64
+import random
 import time
 from datetime import datetime
 
@@ -52,6 +53,20 @@ class DatabaseCache(BaseDatabaseCache):
     # We work around this problem by always using naive datetimes when writing
     # expiration values, in UTC when USE_TZ = True and in local time otherwise.
 
+    def __init__(self, table, params):
+        super(DatabaseCache, self).__init__(table, params)
+        # Counting the entries of the table on every write is too slow, so
+        # writes only check whether the cache must be culled with this
+        # probability. By default, caches of up to 300 entries, the default
+        # MAX_ENTRIES, are checked on every write, and larger ones grow past
+        # MAX_ENTRIES by about 0.3% between two checks.
+        options = params.get('OPTIONS', {})
+        default = min(1.0, 300.0 / max(self._max_entries, 1))
+        try:
+            self._cull_probability = float(options.get('CULL_PROBABILITY', default))
+        except (ValueError, TypeError):
+            self._cull_probability = default
+
     def get(self, key, default=None, version=None):
         key = self.make_key(key, version=version)
         self.validate_key(key)
@@ -75,49 +90,152 @@ class DatabaseCache(BaseDatabaseCache):
         value = connections[db].ops.process_clob(row[1])
         return pickle.loads(base64.b64decode(force_bytes(value)))
 
+    def get_many(self, keys, version=None):
+        key_map = {}
+        for key in keys:
+            cache_key = self.make_key(key, version=version)
+            self.validate_key(cache_key)
+            key_map[cache_key] = key
+        if not key_map:
+            return {}
+        db = router.db_for_read(self.cache_model_class)
+        connection = connections[db]
+        table = connection.ops.quote_name(self._table)
+        cursor = connection.cursor()
+
+        rows = []
+        for batch in self._batches(connection, list(key_map), 1):
+            cursor.execute("SELECT cache_key, value, expires FROM %s "
+                           "WHERE cache_key IN (%s)" % (table, ', '.join(['%s'] * len(batch))),
+                           batch)
+            rows.extend(cursor.fetchall())
+        now = timezone.now()
+        result, expired = {}, []
+        for cache_key, value, expires in rows:
+            if expires < now:
+                expired.append(cache_key)
+                continue
+            value = connection.ops.process_clob(value)
+            result[key_map[cache_key]] = pickle.loads(base64.b64decode(force_bytes(value)))
+        if expired:
+            self._base_delete_many(expired)
+        return result
+
     def set(self, key, value, timeout=None, version=None):
         key = self.make_key(key, version=version)
         self.validate_key(key)
         self._base_set('set', key, value, timeout)
 
+    def set_many(self, data, timeout=None, version=None):
+        items = []
+        for key, value in data.items():
+            key = self.make_key(key, version=version)
+            self.validate_key(key)
+            items.append((key, value))
+        if items:
+            self._base_set_many(items, timeout)
+
     def add(self, key, value, timeout=None, version=None):
         key = self.make_key(key, version=version)
         self.validate_key(key)
         return self._base_set('add', key, value, timeout)
 
-    def _base_set(self, mode, key, value, timeout=None):
+    def _expiry(self, timeout):
         if timeout is None:
             timeout = self.default_timeout
-        db = router.db_for_write(self.cache_model_class)
-        table = connections[db].ops.quote_name(self._table)
-        cursor = connections[db].cursor()
-
-        cursor.execute("SELECT COUNT(*) FROM %s" % table)
-        num = cursor.fetchone()[0]
-        now = timezone.now()
-        now = now.replace(microsecond=0)
         if settings.USE_TZ:
             exp = datetime.utcfromtimestamp(time.time() + timeout)
         else:
             exp = datetime.fromtimestamp(time.time() + timeout)
-        exp = exp.replace(microsecond=0)
+        return exp.replace(microsecond=0)
+
+    def _encode(self, value):
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return base64.b64encode(pickled).strip()
+
+    def _batches(self, connection, items, params_per_item):
+        """
+        Splits ``items`` into lists small enough for their parameters,
+        ``params_per_item`` per item, to fit in a single query and in a
+        single IN list.
+        """
+        limits = [connection.ops.max_in_list_size()]
+        max_params = connection.ops.max_query_params()
+        if max_params:
+            limits.append(max(max_params // params_per_item, 1))
+        limits = [limit for limit in limits if limit]
+        size = min(limits) if limits else len(items)
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def _maybe_cull(self, db, cursor, now, num_writes=1):
+        if random.random() >= self._cull_probability * num_writes:
+            return
+        table = connections[db].ops.quote_name(self._table)
+        cursor.execute("SELECT COUNT(*) FROM %s" % table)
+        num = cursor.fetchone()[0]
         if num > self._max_entries:
             self._cull(db, cursor, now)
-        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
-        encoded = base64.b64encode(pickled).strip()
+
+    def _base_set(self, mode, key, value, timeout=None):
+        if mode == 'set':
+            return self._base_set_many([(key, value)], timeout)
+        db = router.db_for_write(self.cache_model_class)
+        table = connections[db].ops.quote_name(self._table)
+        cursor = connections[db].cursor()
+
+        now = timezone.now()
+        now = now.replace(microsecond=0)
+        exp = connections[db].ops.value_to_db_datetime(self._expiry(timeout))
+        self._maybe_cull(db, cursor, now)
+        encoded = self._encode(value)
         cursor.execute("SELECT cache_key, expires FROM %s "
                        "WHERE cache_key = %%s" % table, [key])
         try:
             result = cursor.fetchone()
-            if result and (mode == 'set' or
-                    (mode == 'add' and result[1] < now)):
-                cursor.execute("UPDATE %s SET value = %%s, expires = %%s "
-                               "WHERE cache_key = %%s" % table,
-                               [encoded, connections[db].ops.value_to_db_datetime(exp), key])
-            else:
+            added = result is None or result[1] < now
+            if result is None:
                 cursor.execute("INSERT INTO %s (cache_key, value, expires) "
                                "VALUES (%%s, %%s, %%s)" % table,
-                               [key, encoded, connections[db].ops.value_to_db_datetime(exp)])
+                               [key, encoded, exp])
+            elif added:
+                cursor.execute("UPDATE %s SET value = %%s, expires = %%s "
+                               "WHERE cache_key = %%s" % table,
+                               [encoded, exp, key])
+        except DatabaseError:
+            # To be threadsafe, updates/inserts are allowed to fail silently
+            transaction.rollback_unless_managed(using=db)
+            return False
+        else:
+            transaction.commit_unless_managed(using=db)
+            return added
+
+    def _base_set_many(self, items, timeout=None):
+        """
+        Sets the (key, value) pairs ``items``, with a single statement per
+        batch on backends which can upsert rows, and a DELETE and INSERTs
+        otherwise.
+        """
+        db = router.db_for_write(self.cache_model_class)
+        connection = connections[db]
+        table = connection.ops.quote_name(self._table)
+        cursor = connection.cursor()
+
+        now = timezone.now()
+        now = now.replace(microsecond=0)
+        exp = connection.ops.value_to_db_datetime(self._expiry(timeout))
+        self._maybe_cull(db, cursor, now, len(items))
+        rows = [(key, self._encode(value), exp) for key, value in items]
+        try:
+            for batch in self._batches(connection, rows, 3):
+                sql = connection.ops.cache_upsert_sql(len(batch))
+                if sql is not None:
+                    cursor.execute(sql % table, [param for row in batch for param in row])
+                    continue
+                cursor.execute("DELETE FROM %s WHERE cache_key IN (%s)" % (
+                               table, ', '.join(['%s'] * len(batch))),
+                               [row[0] for row in batch])
+                cursor.executemany("INSERT INTO %s (cache_key, value, expires) "
+                                   "VALUES (%%s, %%s, %%s)" % table, batch)
         except DatabaseError:
             # To be threadsafe, updates/inserts are allowed to fail silently
             transaction.rollback_unless_managed(using=db)
@@ -137,6 +255,26 @@ class DatabaseCache(BaseDatabaseCache):
         cursor.execute("DELETE FROM %s WHERE cache_key = %%s" % table, [key])
         transaction.commit_unless_managed(using=db)
 
+    def delete_many(self, keys, version=None):
+        cache_keys = []
+        for key in keys:
+            cache_key = self.make_key(key, version=version)
+            self.validate_key(cache_key)
+            cache_keys.append(cache_key)
+        if cache_keys:
+            self._base_delete_many(cache_keys)
+
+    def _base_delete_many(self, keys):
+        db = router.db_for_write(self.cache_model_class)
+        connection = connections[db]
+        table = connection.ops.quote_name(self._table)
+        cursor = connection.cursor()
+
+        for batch in self._batches(connection, keys, 1):
+            cursor.execute("DELETE FROM %s WHERE cache_key IN (%s)" % (
+                           table, ', '.join(['%s'] * len(batch))), batch)
+        transaction.commit_unless_managed(using=db)
+
     def has_key(self, key, version=None):
         key = self.make_key(key, version=version)
         self.validate_key(key)
@@ -1,23 +1,60 @@
-"File-based cache backend"
+"""
+File-based cache backend.
+
+Each entry is stored in its own file, written to a temporary file and renamed,
+so that readers never see a partially written entry. With the INDEX option,
+the paths and expiry times of the entries are kept in a SQLite index at the
+top of the cache directory, along with their number, so that culling the cache
+doesn't require scanning the directory: the entries expiring first, which
+include the expired ones, are removed first. SQLite databases can't be shared
+over network filesystems, so the index is only suitable for directories on a
+local filesystem. Without the index, or the sqlite3 module, the cache scans
+the directory.
+"""
 
 import hashlib
 import os
 import shutil
+import tempfile
+import threading
 import time
 try:
     from django.utils.six.moves import cPickle as pickle
 except ImportError:
     import pickle
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
 
 from django.core.cache.backends.base import BaseCache
+from django.core.files.move import file_move_safe
 from django.utils.encoding import force_bytes
 
+INDEX_NAME = 'index.sqlite3'
+
+INDEX_SCHEMA = [
+    'CREATE TABLE entries (path TEXT PRIMARY KEY, expires REAL NOT NULL)',
+    'CREATE INDEX entries_expires ON entries (expires)',
+    # The number of entries, maintained by triggers.
+    'CREATE TABLE entry_count (count INTEGER NOT NULL)',
+    'INSERT INTO entry_count VALUES (0)',
+    'CREATE TRIGGER entries_insert AFTER INSERT ON entries '
+    'BEGIN UPDATE entry_count SET count = count + 1; END',
+    'CREATE TRIGGER entries_delete AFTER DELETE ON entries '
+    'BEGIN UPDATE entry_count SET count = count - 1; END',
+]
+
 class FileBasedCache(BaseCache):
     def __init__(self, dir, params):
         BaseCache.__init__(self, params)
         self._dir = dir
         if not os.path.exists(self._dir):
             self._createdir()
+        self._index_path = os.path.join(self._dir, INDEX_NAME)
+        self._use_index = bool(params.get('OPTIONS', {}).get('INDEX', False))
+        # SQLite connections can't be shared between threads or processes.
+        self._local = threading.local()
 
     def add(self, key, value, timeout=None, version=None):
         if self.has_key(key, version=version):
@@ -59,12 +96,22 @@ class FileBasedCache(BaseCache):
             if not os.path.exists(dirname):
                 os.makedirs(dirname)
 
-            with open(fname, 'wb') as f:
-                now = time.time()
-                pickle.dump(now + timeout, f, pickle.HIGHEST_PROTOCOL)
-                pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+            fd, tmp_path = tempfile.mkstemp(dir=dirname)
+            renamed = False
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    expires = time.time() + timeout
+                    pickle.dump(expires, f, pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+                file_move_safe(tmp_path, fname, allow_overwrite=True)
+                renamed = True
+            finally:
+                if not renamed:
+                    os.remove(tmp_path)
         except (IOError, OSError):
             pass
+        else:
+            self._index_entry(fname, expires)
 
     def delete(self, key, version=None):
         key = self.make_key(key, version=version)
@@ -75,7 +122,10 @@ class FileBasedCache(BaseCache):
             pass
 
     def _delete(self, fname):
-        os.remove(fname)
+        try:
+            os.remove(fname)
+        finally:
+            self._unindex_entries([fname])
         try:
             # Remove the 2 subdirs if they're empty
             dirname = os.path.dirname(fname)
@@ -100,7 +150,119 @@ class FileBasedCache(BaseCache):
         except (IOError, OSError, EOFError, pickle.PickleError):
             return False
 
+    def _index(self):
+        """
+        Returns the connection of the current thread to the index, or None if
+        the index isn't used or can't be opened.
+        """
+        if not self._use_index or sqlite3 is None:
+            return None
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) == pid:
+            return self._local.connection
+        try:
+            connection = self._open_index()
+        except sqlite3.Error:
+            # The index may be locked, e.g. while another process indexes
+            # the existing entries. It's opened again on the next call.
+            return None
+        self._local.pid, self._local.connection = pid, connection
+        return connection
+
+    def _open_index(self):
+        connection = sqlite3.connect(self._index_path, isolation_level=None)
+        # Writes don't wait for the index to reach the disk, but a crash
+        # can't corrupt it either.
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if connection.execute("SELECT 1 FROM sqlite_master WHERE "
+                                  "type = 'table' AND name = 'entries'").fetchone() is None:
+                for statement in INDEX_SCHEMA:
+                    connection.execute(statement)
+                # Index the entries written before the index was created.
+                connection.executemany(
+                    'INSERT OR IGNORE INTO entries (path, expires) VALUES (?, ?)',
+                    self._scan_entries())
+            connection.execute('COMMIT')
+        except:
+            connection.execute('ROLLBACK')
+            connection.close()
+            raise
+        return connection
+
+    def _scan_entries(self):
+        """
+        Yields the (path, expiry time) pairs of the entries of the cache
+        directory, relative to it.
+        """
+        for root, _, files in os.walk(self._dir):
+            if root == self._dir:
+                continue
+            for name in files:
+                fname = os.path.join(root, name)
+                try:
+                    with open(fname, 'rb') as f:
+                        exp = pickle.load(f)
+                except (IOError, OSError, EOFError, pickle.PickleError):
+                    continue
+                yield os.path.relpath(fname, self._dir), exp
+
+    def _index_entry(self, fname, expires):
+        index = self._index()
+        if index is None:
+            return
+        path = os.path.relpath(fname, self._dir)
+        try:
+            if index.execute('INSERT OR IGNORE INTO entries (path, expires) '
+                             'VALUES (?, ?)', (path, expires)).rowcount != 1:
+                index.execute('UPDATE entries SET expires = ? WHERE path = ?',
+                              (expires, path))
+        except sqlite3.Error:
+            pass
+
+    def _unindex_entries(self, fnames):
+        index = self._index()
+        if index is None:
+            return
+        try:
+            index.executemany('DELETE FROM entries WHERE path = ?',
+                [(os.path.relpath(fname, self._dir),) for fname in fnames])
+        except sqlite3.Error:
+            pass
+
     def _cull(self):
+        index = self._index()
+        if index is None:
+            return self._cull_by_scanning()
+        try:
+            count = index.execute('SELECT count FROM entry_count').fetchone()[0]
+            if count < self._max_entries:
+                return
+            if self._cull_frequency == 0:
+                return self.clear()
+            # Remove 1 / CULL_FREQUENCY of the entries, or every expired one
+            # if there are more.
+            doomed = index.execute('SELECT path FROM entries WHERE expires < ?',
+                                   (time.time(),)).fetchall()
+            if len(doomed) < -(-count // self._cull_frequency):
+                doomed = index.execute('SELECT path FROM entries ORDER BY expires LIMIT ?',
+                                       (-(-count // self._cull_frequency),)).fetchall()
+        except sqlite3.Error:
+            return
+        fnames = [os.path.join(self._dir, path) for path, in doomed]
+        for fname in fnames:
+            try:
+                os.remove(fname)
+                dirname = os.path.dirname(fname)
+                os.rmdir(dirname)
+                os.rmdir(os.path.dirname(dirname))
+            except (IOError, OSError):
+                pass
+        self._unindex_entries(fnames)
+
+    def _cull_by_scanning(self):
         if int(self._num_entries) < self._max_entries:
             return
 
@@ -142,17 +304,41 @@ class FileBasedCache(BaseCache):
         return os.path.join(self._dir, path)
 
     def _get_num_entries(self):
+        index = self._index()
+        if index is not None:
+            try:
+                return index.execute('SELECT count FROM entry_count').fetchone()[0]
+            except sqlite3.Error:
+                pass
         count = 0
-        for _,_,files in os.walk(self._dir):
-            count += len(files)
+        for root, _, files in os.walk(self._dir):
+            if root != self._dir:
+                count += len(files)
         return count
     _num_entries = property(_get_num_entries)
 
     def clear(self):
+        index = self._index()
+        if index is None:
+            try:
+                shutil.rmtree(self._dir)
+            except (IOError, OSError):
+                pass
+            return
+        # The index is emptied rather than deleted, since other threads and
+        # processes have it open.
         try:
-            shutil.rmtree(self._dir)
-        except (IOError, OSError):
+            index.execute('DELETE FROM entries')
+        except sqlite3.Error:
             pass
+        try:
+            names = os.listdir(self._dir)
+        except (IOError, OSError):
+            return
+        for name in names:
+            path = os.path.join(self._dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
 
 # For backwards compatibility
 class CacheClass(FileBasedCache):
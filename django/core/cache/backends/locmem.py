@@ -1,5 +1,21 @@
-"Thread-safe in-memory cache backend."
-
+"""
+Thread-safe in-memory cache backend.
+
+Entries are kept in least recently used order: when the cache is full, the
+least recently used ``1 / CULL_FREQUENCY`` of them are evicted. Expired
+entries are deleted when they're accessed, and otherwise age out with the
+least recently used ones.
+
+Values are pickled, so that changes made to them after they're cached don't
+affect the cache. When the ``PICKLE`` option is False, values of immutable
+types (strings, numbers, dates, None, and tuples or frozensets of those) are
+stored as is instead.
+"""
+
+import datetime
+import decimal
+import sys
+import threading
 import time
 try:
     from django.utils.six.moves import cPickle as pickle
@@ -7,59 +23,106 @@ except ImportError:
     import pickle
 
 from django.core.cache.backends.base import BaseCache
-from django.utils.synch import RWLock
+from django.utils.datastructures import LRUDict
+from django.utils import six
 
 # Global in-memory store of cache data. Keyed by name, to provide
 # multiple named local memory caches.
 _caches = {}
 _expire_info = {}
 _locks = {}
+_stats = {}
+
+# Values of these types can't be modified in place.
+IMMUTABLE_TYPES = frozenset((type(None), bool, float, complex, decimal.Decimal,
+    datetime.date, datetime.datetime, datetime.time, datetime.timedelta,
+    six.text_type, six.binary_type) + six.integer_types)
+
+def _is_immutable(value):
+    if type(value) in (tuple, frozenset):
+        return all(_is_immutable(item) for item in value)
+    return type(value) in IMMUTABLE_TYPES
+
+
+class Pickled(object):
+    """
+    A pickled value, as stored in the cache.
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+
+# Returned by _get_entry() for missing or expired keys.
+MISSING = object()
 
 class LocMemCache(BaseCache):
     def __init__(self, name, params):
         BaseCache.__init__(self, params)
-        global _caches, _expire_info, _locks
-        self._cache = _caches.setdefault(name, {})
+        options = params.get('OPTIONS', {})
+        self._pickle = options.get('PICKLE', True)
+        global _caches, _expire_info, _locks, _stats
+        # The size of the shared store is limited by _cull(), according to
+        # the MAX_ENTRIES of the instance adding entries.
+        self._cache = _caches.setdefault(name, LRUDict(sys.maxsize))
         self._expire_info = _expire_info.setdefault(name, {})
-        self._lock = _locks.setdefault(name, RWLock())
+        self._lock = _locks.setdefault(name, threading.Lock())
+        self._stats = _stats.setdefault(name, {'hits': 0, 'misses': 0, 'evictions': 0})
+
+    def _encode(self, value):
+        if not self._pickle and _is_immutable(value):
+            return value
+        return Pickled(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def _decode(self, value):
+        if type(value) is Pickled:
+            return pickle.loads(value.data)
+        return value
+
+    def _get_entry(self, key):
+        """
+        Returns the stored value of ``key`` and marks it as the most recently
+        used, or returns MISSING and deletes it if it has expired. Must be
+        called with the lock held.
+        """
+        exp = self._expire_info.get(key)
+        if exp is None:
+            return MISSING
+        if exp <= time.time():
+            self._delete(key)
+            return MISSING
+        return self._cache.get(key, MISSING)
 
     def add(self, key, value, timeout=None, version=None):
         key = self.make_key(key, version=version)
         self.validate_key(key)
-        with self._lock.writer():
-            exp = self._expire_info.get(key)
-            if exp is None or exp <= time.time():
-                try:
-                    pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
-                    self._set(key, pickled, timeout)
-                    return True
-                except pickle.PickleError:
-                    pass
+        try:
+            value = self._encode(value)
+        except pickle.PickleError:
             return False
+        with self._lock:
+            if self._get_entry(key) is not MISSING:
+                return False
+            self._set(key, value, timeout)
+            return True
 
     def get(self, key, default=None, version=None):
         key = self.make_key(key, version=version)
         self.validate_key(key)
-        with self._lock.reader():
-            exp = self._expire_info.get(key)
-            if exp is None:
+        with self._lock:
+            value = self._get_entry(key)
+            if value is MISSING:
+                self._stats['misses'] += 1
                 return default
-            elif exp > time.time():
-                try:
-                    pickled = self._cache[key]
-                    return pickle.loads(pickled)
-                except pickle.PickleError:
-                    return default
-        with self._lock.writer():
-            try:
-                del self._cache[key]
-                del self._expire_info[key]
-            except KeyError:
-                pass
+            self._stats['hits'] += 1
+        try:
+            return self._decode(value)
+        except pickle.PickleError:
             return default
 
     def _set(self, key, value, timeout=None):
-        if len(self._cache) >= self._max_entries:
+        if key not in self._cache and len(self._cache) >= self._max_entries:
             self._cull()
         if timeout is None:
             timeout = self.default_timeout
@@ -69,23 +132,28 @@ class LocMemCache(BaseCache):
     def set(self, key, value, timeout=None, version=None):
         key = self.make_key(key, version=version)
         self.validate_key(key)
-        with self._lock.writer():
-            try:
-                pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
-                self._set(key, pickled, timeout)
-            except pickle.PickleError:
-                pass
+        try:
+            value = self._encode(value)
+        except pickle.PickleError:
+            return
+        with self._lock:
+            self._set(key, value, timeout)
 
     def incr(self, key, delta=1, version=None):
-        value = self.get(key, version=version)
-        if value is None:
-            raise ValueError("Key '%s' not found" % key)
-        new_value = value + delta
-        key = self.make_key(key, version=version)
-        with self._lock.writer():
+        cache_key = self.make_key(key, version=version)
+        self.validate_key(cache_key)
+        with self._lock:
+            value = self._get_entry(cache_key)
             try:
-                pickled = pickle.dumps(new_value, pickle.HIGHEST_PROTOCOL)
-                self._cache[key] = pickled
+                value = MISSING if value is MISSING else self._decode(value)
+            except pickle.PickleError:
+                value = MISSING
+            if value is MISSING or value is None:
+                raise ValueError("Key '%s' not found" % key)
+            new_value = value + delta
+            try:
+                # The expiry time isn't modified, like with memcached.
+                self._cache[cache_key] = self._encode(new_value)
             except pickle.PickleError:
                 pass
         return new_value
@@ -93,48 +161,56 @@ class LocMemCache(BaseCache):
     def has_key(self, key, version=None):
         key = self.make_key(key, version=version)
         self.validate_key(key)
-        with self._lock.reader():
+        with self._lock:
             exp = self._expire_info.get(key)
             if exp is None:
                 return False
             elif exp > time.time():
                 return True
-
-        with self._lock.writer():
-            try:
-                del self._cache[key]
-                del self._expire_info[key]
-            except KeyError:
-                pass
+            self._delete(key)
             return False
 
     def _cull(self):
         if self._cull_frequency == 0:
-            self.clear()
+            self._stats['evictions'] += len(self._cache)
+            self._cache.clear()
+            self._expire_info.clear()
         else:
-            doomed = [k for (i, k) in enumerate(self._cache) if i % self._cull_frequency == 0]
-            for k in doomed:
-                self._delete(k)
+            count = -(-len(self._cache) // self._cull_frequency)
+            for i in range(count):
+                key, value = self._cache.popitem()
+                self._expire_info.pop(key, None)
+            self._stats['evictions'] += count
 
     def _delete(self, key):
-        try:
-            del self._cache[key]
-        except KeyError:
-            pass
-        try:
-            del self._expire_info[key]
-        except KeyError:
-            pass
+        self._cache.pop(key, None)
+        self._expire_info.pop(key, None)
 
     def delete(self, key, version=None):
         key = self.make_key(key, version=version)
         self.validate_key(key)
-        with self._lock.writer():
+        with self._lock:
             self._delete(key)
 
     def clear(self):
-        self._cache.clear()
-        self._expire_info.clear()
+        with self._lock:
+            self._cache.clear()
+            self._expire_info.clear()
+
+    def stats(self):
+        """
+        Returns the number of hits, misses and evictions of the cache since it
+        was created or reset_stats() was called, and its number of entries.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._cache)
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for counter in self._stats:
+                self._stats[counter] = 0
 
 # For backwards compatibility
 class CacheClass(LocMemCache):
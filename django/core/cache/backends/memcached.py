@@ -1,12 +1,22 @@
 "Memcached cache backend"
 
+import bisect
+import hashlib
+import os
+import re
+import socket
+import threading
 import time
 from threading import local
+try:
+    from django.utils.six.moves import cPickle as pickle
+except ImportError:
+    import pickle
 
 from django.core.cache.backends.base import BaseCache, InvalidCacheBackendError
 
 from django.utils import six
-from django.utils.encoding import force_str
+from django.utils.encoding import force_bytes, force_str
 
 class BaseMemcachedCache(BaseCache):
     def __init__(self, server, params, library, value_not_found_exception):
@@ -182,3 +192,415 @@ class PyLibMCCache(BaseMemcachedCache):
         self._local.client = client
 
         return client
+
+
+# The flags python-memcached stores with values, to tell how to decode them.
+FLAG_PICKLE = 1
+FLAG_INTEGER = 2
+FLAG_LONG = 4
+
+# The number of keys sent to a server before reading its replies, so that
+# neither end blocks on a full socket buffer.
+PIPELINE_SIZE = 256
+
+# Control characters and whitespace aren't allowed in keys.
+invalid_key_re = re.compile(b'[\x00-\x20\x7f]')
+
+def _ketama_points(digest):
+    """
+    Returns the 4 points of the ketama continuum given by an MD5 digest.
+    """
+    digest = bytearray(digest)
+    return [(digest[3 + i * 4] << 24) | (digest[2 + i * 4] << 16) |
+            (digest[1 + i * 4] << 8) | digest[i * 4] for i in range(4)]
+
+def _command(*parts):
+    return b' '.join(part if isinstance(part, bytes) else str(part).encode('ascii')
+                     for part in parts) + b'\r\n'
+
+
+class ConsistentHashRing(object):
+    """
+    Maps keys to nodes with the ketama algorithm: each node is placed at
+    ``points`` pseudo-random points of a circle, and a key belongs to the
+    first node following its hash. Adding or removing a node only moves the
+    keys of the arcs it gains or loses.
+    """
+    def __init__(self, nodes, points=160):
+        ring = []
+        for node in nodes:
+            for i in range(points // 4):
+                digest = hashlib.md5(force_bytes('%s-%d' % (node, i))).digest()
+                ring.extend((point, node) for point in _ketama_points(digest))
+        ring.sort(key=lambda item: item[0])
+        self._points = [point for point, node in ring]
+        self._nodes = [node for point, node in ring]
+
+    def get_node(self, key, is_usable=None):
+        """
+        Returns the node of ``key``, a bytestring. If ``is_usable`` is given,
+        nodes for which it returns False are skipped, and None is returned
+        if there's no usable node.
+        """
+        if not self._nodes:
+            return None
+        point = _ketama_points(hashlib.md5(key).digest())[0]
+        index = bisect.bisect(self._points, point)
+        for i in range(len(self._nodes)):
+            node = self._nodes[(index + i) % len(self._nodes)]
+            if is_usable is None or is_usable(node):
+                return node
+        return None
+
+
+class MemcachedConnection(object):
+    """
+    A buffered socket connected to a memcached server.
+    """
+    def __init__(self, family, address, timeout):
+        self.pid = os.getpid()
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            self.socket.settimeout(timeout)
+            self.socket.connect(address)
+            if family != getattr(socket, 'AF_UNIX', None):
+                self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except socket.error:
+            self.socket.close()
+            raise
+        self._buffer = bytearray()
+
+    def send(self, data):
+        self.socket.sendall(data)
+
+    def _fill(self):
+        data = self.socket.recv(65536)
+        if not data:
+            raise socket.error("The memcached server closed the connection.")
+        self._buffer += data
+
+    def readline(self):
+        start = 0
+        while True:
+            index = self._buffer.find(b'\r\n', start)
+            if index >= 0:
+                line = bytes(self._buffer[:index])
+                del self._buffer[:index + 2]
+                return line
+            start = max(len(self._buffer) - 1, 0)
+            self._fill()
+
+    def read(self, size):
+        while len(self._buffer) < size:
+            self._fill()
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def close(self):
+        self.socket.close()
+
+
+class MemcachedServer(object):
+    """
+    A memcached server, with a pool of idle connections shared by threads.
+
+    A server which can't be connected to isn't used for ``dead_retry``
+    seconds. Connections are only reused by the process which opened them,
+    so that processes forked after using the cache don't share sockets.
+    """
+    def __init__(self, address, pool_size=10, socket_timeout=3, dead_retry=30):
+        self.address = address
+        if address.startswith('unix:'):
+            self._family, self._address = socket.AF_UNIX, address[5:]
+        else:
+            host, _, port = address.rpartition(':')
+            if not host:
+                host, port = port, 11211
+            self._family, self._address = socket.AF_INET, (host, int(port))
+        self.pool_size = pool_size
+        self.socket_timeout = socket_timeout
+        self.dead_retry = dead_retry
+        self._idle = []
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._dead_until = 0
+
+    def __str__(self):
+        return self.address
+
+    def is_alive(self):
+        return self._dead_until <= time.time()
+
+    def acquire(self):
+        """
+        Returns an idle connection to the server, or a new one, or None if
+        the server can't be reached.
+        """
+        inherited = []
+        with self._lock:
+            if self._pid != os.getpid():
+                # The idle connections were inherited across os.fork(). The
+                # replies to both processes would be interleaved on them.
+                # Closing them only releases the descriptors of this process.
+                self._pid, inherited, self._idle = os.getpid(), self._idle, []
+            elif self._idle:
+                return self._idle.pop()
+        for connection in inherited:
+            connection.close()
+        try:
+            return MemcachedConnection(self._family, self._address, self.socket_timeout)
+        except socket.error:
+            self._dead_until = time.time() + self.dead_retry
+            self.close()
+            return None
+
+    def release(self, connection):
+        with self._lock:
+            if connection.pid == self._pid == os.getpid() and len(self._idle) < self.pool_size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class PooledClient(object):
+    """
+    A memcached client with the API of python-memcached's Client, which can
+    be shared by threads.
+
+    Keys are distributed over the servers by consistent hashing. Operations
+    on several keys send the commands for up to PIPELINE_SIZE of them to
+    every server before reading the replies. Values are encoded like
+    python-memcached does.
+    """
+    def __init__(self, servers, pool_size=10, socket_timeout=3, dead_retry=30,
+                 points=160):
+        self.servers = [MemcachedServer(address, pool_size, socket_timeout, dead_retry)
+                        for address in servers]
+        self._ring = ConsistentHashRing(self.servers, points)
+
+    def _encode_key(self, key):
+        key = force_bytes(key)
+        if len(key) > 250 or invalid_key_re.search(key):
+            raise ValueError("Invalid memcached key: %r" % key)
+        return key
+
+    def _encode_value(self, value):
+        if type(value) is six.binary_type:
+            return 0, value
+        if type(value) in six.integer_types:
+            flags = FLAG_INTEGER if type(value) is int else FLAG_LONG
+            return flags, str(value).encode('ascii')
+        return FLAG_PICKLE, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def _decode_value(self, flags, data):
+        if flags & FLAG_PICKLE:
+            return pickle.loads(data)
+        if flags & FLAG_INTEGER:
+            return int(data)
+        if flags & FLAG_LONG:
+            return six.integer_types[-1](data)
+        return data
+
+    def _group(self, keys):
+        """
+        Returns a dictionary mapping servers to the keys they hold, leaving
+        out the keys of unreachable servers.
+        """
+        groups = {}
+        for key in keys:
+            server = self._ring.get_node(key, MemcachedServer.is_alive)
+            if server is not None:
+                groups.setdefault(server, []).append(key)
+        return groups
+
+    def _requests(self, groups, encode):
+        """
+        Splits the keys of ``groups``, a dictionary mapping servers to keys,
+        in batches of at most PIPELINE_SIZE keys. Returns a dictionary
+        mapping the servers to lists of (``encode(keys)``, keys) pairs.
+        """
+        return dict((server, [(encode(keys[i:i + PIPELINE_SIZE]), keys[i:i + PIPELINE_SIZE])
+                              for i in range(0, len(keys), PIPELINE_SIZE)])
+                    for server, keys in groups.items())
+
+    def _pipeline(self, requests, read_reply):
+        """
+        Sends the requests of ``requests``, a dictionary mapping servers to
+        lists of (data, keys) batches, one batch per server at a time, and
+        reads the replies to each batch with ``read_reply(connection, keys)``
+        before sending the next one. Returns the list of (server, keys,
+        result) triples of the batches which were replied to. A server
+        failing isn't sent its remaining batches.
+        """
+        pending = dict((server, list(batches)) for server, batches in requests.items())
+        connections = {}
+        results = []
+        while pending:
+            sent = []
+            for server, batches in list(pending.items()):
+                connection = connections.get(server)
+                if connection is None:
+                    connection = connections[server] = server.acquire()
+                    if connection is None:
+                        del pending[server]
+                        continue
+                data, keys = batches.pop(0)
+                try:
+                    connection.send(data)
+                except socket.error:
+                    connection.close()
+                    del pending[server]
+                else:
+                    sent.append((server, connection, keys))
+            for server, connection, keys in sent:
+                try:
+                    results.append((server, keys, read_reply(connection, keys)))
+                except (socket.error, ValueError):
+                    # The connection may be out of sync with the server.
+                    connection.close()
+                    del pending[server]
+                else:
+                    if not pending[server]:
+                        del pending[server]
+                        server.release(connection)
+        return results
+
+    def _read_values(self, connection, keys):
+        values = {}
+        while True:
+            line = connection.readline()
+            if line == b'END':
+                return values
+            parts = line.split()
+            if len(parts) < 4 or parts[0] != b'VALUE':
+                raise ValueError("Unexpected reply from memcached: %r" % line)
+            data = connection.read(int(parts[3]) + 2)[:-2]
+            try:
+                values[parts[1]] = self._decode_value(int(parts[2]), data)
+            except Exception:
+                # Values which can't be unpickled are treated as missing.
+                pass
+
+    def _read_lines(self, connection, keys):
+        return [connection.readline() for key in keys]
+
+    def get_multi(self, keys):
+        originals = dict((self._encode_key(key), key) for key in keys)
+        requests = self._requests(self._group(originals), lambda keys: _command(b'get', *keys))
+        values = {}
+        for server, keys, server_values in self._pipeline(requests, self._read_values):
+            for key, value in server_values.items():
+                if key in originals:
+                    values[originals[key]] = value
+        return values
+
+    def get(self, key):
+        return self.get_multi([key]).get(key)
+
+    def _store_multi(self, command, mapping, time):
+        """
+        Runs the storage ``command`` for the items of ``mapping`` and returns
+        the list of the keys which weren't stored.
+        """
+        originals, commands = {}, {}
+        for key, value in mapping.items():
+            encoded = self._encode_key(key)
+            originals[encoded] = key
+            flags, data = self._encode_value(value)
+            commands[encoded] = (_command(command, encoded, flags, int(time), len(data)) +
+                                 data + b'\r\n')
+        requests = self._requests(self._group(originals),
+                                  lambda keys: b''.join(commands[key] for key in keys))
+        stored = set()
+        for server, keys, replies in self._pipeline(requests, self._read_lines):
+            stored.update(key for key, reply in zip(keys, replies) if reply == b'STORED')
+        return [original for key, original in originals.items() if key not in stored]
+
+    def set_multi(self, mapping, time=0):
+        return self._store_multi(b'set', mapping, time)
+
+    def set(self, key, value, time=0):
+        return not self._store_multi(b'set', {key: value}, time)
+
+    def add(self, key, value, time=0):
+        return not self._store_multi(b'add', {key: value}, time)
+
+    def delete_multi(self, keys):
+        keys = [self._encode_key(key) for key in keys]
+        requests = self._requests(self._group(keys),
+                                  lambda keys: b''.join(_command(b'delete', key) for key in keys))
+        results = self._pipeline(requests, self._read_lines)
+        return len(results) == sum(len(batches) for batches in requests.values())
+
+    def delete(self, key):
+        return self.delete_multi([key])
+
+    def _incr(self, command, key, delta):
+        key = self._encode_key(key)
+        requests = self._requests(self._group([key]),
+                                  lambda keys: _command(command, keys[0], int(delta)))
+        for server, keys, replies in self._pipeline(requests, self._read_lines):
+            if replies[0].isdigit():
+                return int(replies[0])
+        return None
+
+    def incr(self, key, delta=1):
+        return self._incr(b'incr', key, delta)
+
+    def decr(self, key, delta=1):
+        return self._incr(b'decr', key, delta)
+
+    def flush_all(self):
+        requests = dict((server, [(_command(b'flush_all'), [None])])
+                        for server in self.servers if server.is_alive())
+        self._pipeline(requests, self._read_lines)
+
+    def disconnect_all(self):
+        for server in self.servers:
+            server.close()
+
+
+# Shared clients, keyed by servers and options, so that the connections of
+# every cache instance using the same servers are pooled.
+_clients = {}
+_clients_lock = threading.Lock()
+
+class PooledMemcachedCache(BaseMemcachedCache):
+    """
+    An implementation of a cache binding using a built-in memcached client,
+    which keeps a pool of connections per server shared by all threads, and
+    distributes keys over the servers by consistent hashing.
+    """
+    def __init__(self, server, params):
+        super(PooledMemcachedCache, self).__init__(server, params,
+                                                   library=None,
+                                                   value_not_found_exception=ValueError)
+
+    @property
+    def _cache(self):
+        client = getattr(self, '_client', None)
+        if client is None:
+            options = self._options or {}
+            # repr() since options may be unhashable, e.g. lists.
+            key = (tuple(self._servers), repr(sorted(options.items())))
+            with _clients_lock:
+                client = _clients.get(key)
+                if client is None:
+                    client = _clients[key] = PooledClient(self._servers,
+                        pool_size=options.get('POOL_SIZE', 10),
+                        socket_timeout=options.get('SOCKET_TIMEOUT', 3),
+                        dead_retry=options.get('DEAD_RETRY', 30),
+                        points=options.get('KETAMA_POINTS', 160))
+            self._client = client
+        return client
+
+    def close(self, **kwargs):
+        # The connections stay in the pool, for later requests.
+        pass
@@ -0,0 +1,225 @@
+"""
+Two-tier cache backend.
+
+Values are read from a local-memory cache (L1), in front of another cache
+(L2), typically shared by all processes, such as memcached. Values found in L2
+are copied to L1 for ``L1_TIMEOUT`` seconds, so that reading hot keys doesn't
+require a round trip to L2. Writes go to both tiers.
+
+Since each process has its own L1, values changed by other processes may be
+stale for up to ``L1_TIMEOUT`` seconds. When ``VERSION_KEY`` is set, L2 holds
+a random generation token under that key, which incr_version(), decr_version()
+and clear() replace, and which processes check every
+``VERSION_CHECK_INTERVAL`` seconds: the values cached in L1 under another
+generation are discarded. Tokens aren't reused, even if L2 loses the key.
+"""
+
+import threading
+
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.crypto import get_random_string
+
+# Hit and miss counters of each tier, by name of L1.
+_stats = {}
+_stats_lock = threading.Lock()
+
+# Returned by get() for missing keys.
+MISSING = object()
+
+# The timeout of the generation token in L2. Entries live much less in L1.
+GENERATION_TIMEOUT = 60 * 60 * 24 * 30
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        # Imported here to avoid a circular import.
+        from django.core.cache import get_cache
+        BaseCache.__init__(self, params)
+        options = params.get('OPTIONS', {})
+        # The settings of this cache which apply to keys and timeouts
+        # override those of L2, and apply to L1.
+        overrides = dict((name, params[name]) for name in
+                         ('TIMEOUT', 'KEY_PREFIX', 'VERSION', 'KEY_FUNCTION')
+                         if name in params)
+        self._l2 = get_cache(location, **overrides)
+        self.default_timeout = self._l2.default_timeout
+        self.key_prefix = self._l2.key_prefix
+        self.version = self._l2.version
+        self.key_func = self._l2.key_func
+
+        self._l1_timeout = int(options.get('L1_TIMEOUT', 5))
+        name = options.get('L1_NAME', 'tiered:%s' % location)
+        self._l1 = LocMemCache(name, {
+            'TIMEOUT': self._l1_timeout,
+            'KEY_PREFIX': self.key_prefix,
+            'VERSION': self.version,
+            'KEY_FUNCTION': self.key_func,
+            'OPTIONS': {
+                'MAX_ENTRIES': options.get('L1_MAX_ENTRIES', 1000),
+                'CULL_FREQUENCY': options.get('L1_CULL_FREQUENCY', 3),
+                'PICKLE': options.get('L1_PICKLE', True),
+            },
+        })
+        self._version_key = options.get('VERSION_KEY')
+        self._version_check_interval = int(options.get('VERSION_CHECK_INTERVAL', 1))
+        with _stats_lock:
+            self._stats = _stats.setdefault(name, {
+                'l1_hits': 0, 'l1_misses': 0, 'l2_hits': 0, 'l2_misses': 0})
+
+    def _count(self, counter, n=1):
+        with _stats_lock:
+            self._stats[counter] += n
+
+    def _l1_timeout_for(self, timeout):
+        if timeout is None:
+            timeout = self.default_timeout
+        return min(timeout, self._l1_timeout)
+
+    def _generation(self):
+        """
+        Returns the current generation of the values of L1, as stored in L2
+        and cached in L1 for VERSION_CHECK_INTERVAL seconds, or None if
+        there's no VERSION_KEY.
+        """
+        if self._version_key is None:
+            return None
+        generation = self._l1.get(self._version_key)
+        if generation is None:
+            generation = self._l2.get(self._version_key)
+            if generation is None:
+                # A new token, so that the values cached under the lost one
+                # are discarded.
+                generation = get_random_string(12)
+                if not self._l2.add(self._version_key, generation, GENERATION_TIMEOUT):
+                    generation = self._l2.get(self._version_key, generation)
+            self._l1.set(self._version_key, generation, self._version_check_interval)
+        return generation
+
+    def _next_generation(self):
+        if self._version_key is None:
+            return
+        self._l2.set(self._version_key, get_random_string(12), GENERATION_TIMEOUT)
+        self._l1.delete(self._version_key)
+
+    def _get_l1_many(self, keys, version, generation):
+        """
+        Returns the values of ``keys`` found in L1 under ``generation``.
+        """
+        values = self._l1.get_many(keys, version=version)
+        if self._version_key is not None:
+            values = dict((key, entry[1]) for key, entry in values.items()
+                          if entry[0] == generation)
+        return values
+
+    def _set_l1_many(self, data, timeout, version, generation):
+        """
+        Stores ``data`` in L1 under ``generation``, which must have been read
+        before L2 was, so that values read before L2 is invalidated aren't
+        stored under the next generation.
+        """
+        if self._version_key is not None:
+            data = dict((key, (generation, value)) for key, value in data.items())
+        self._l1.set_many(data, self._l1_timeout_for(timeout), version=version)
+
+    def add(self, key, value, timeout=None, version=None):
+        generation = self._generation()
+        if self._l2.add(key, value, timeout, version=version):
+            self._set_l1_many({key: value}, timeout, version, generation)
+            return True
+        self._l1.delete(key, version=version)
+        return False
+
+    def get(self, key, default=None, version=None):
+        generation = self._generation()
+        values = self._get_l1_many([key], version, generation)
+        if key in values:
+            self._count('l1_hits')
+            return values[key]
+        self._count('l1_misses')
+        value = self._l2.get(key, MISSING, version=version)
+        if value is MISSING:
+            self._count('l2_misses')
+            return default
+        self._count('l2_hits')
+        self._set_l1_many({key: value}, None, version, generation)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        generation = self._generation()
+        values = self._get_l1_many(keys, version, generation)
+        missing = [key for key in keys if key not in values]
+        self._count('l1_hits', len(keys) - len(missing))
+        self._count('l1_misses', len(missing))
+        if missing:
+            l2_values = self._l2.get_many(missing, version=version)
+            self._count('l2_hits', len(l2_values))
+            self._count('l2_misses', len(missing) - len(l2_values))
+            if l2_values:
+                self._set_l1_many(l2_values, None, version, generation)
+            values.update(l2_values)
+        return values
+
+    def set(self, key, value, timeout=None, version=None):
+        generation = self._generation()
+        self._l2.set(key, value, timeout, version=version)
+        self._set_l1_many({key: value}, timeout, version, generation)
+
+    def set_many(self, data, timeout=None, version=None):
+        generation = self._generation()
+        self._l2.set_many(data, timeout, version=version)
+        self._set_l1_many(data, timeout, version, generation)
+
+    def delete(self, key, version=None):
+        self._l2.delete(key, version=version)
+        self._l1.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self._l2.delete_many(keys, version=version)
+        self._l1.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        return (key in self._get_l1_many([key], version, self._generation()) or
+                self._l2.has_key(key, version=version))
+
+    def incr(self, key, delta=1, version=None):
+        generation = self._generation()
+        value = self._l2.incr(key, delta, version=version)
+        self._set_l1_many({key: value}, None, version, generation)
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        generation = self._generation()
+        value = self._l2.decr(key, delta, version=version)
+        self._set_l1_many({key: value}, None, version, generation)
+        return value
+
+    def incr_version(self, key, delta=1, version=None):
+        new_version = super(TieredCache, self).incr_version(key, delta, version)
+        # Discard the copies of the key cached by other processes.
+        self._next_generation()
+        return new_version
+
+    def clear(self):
+        self._l2.clear()
+        self._l1.clear()
+        self._next_generation()
+
+    def stats(self):
+        """
+        Returns the number of hits and misses of each tier since the cache was
+        created or reset_stats() was called, and their hit ratios, or None
+        when a tier hasn't been read. L2 is only read on L1 misses.
+        """
+        with _stats_lock:
+            stats = dict(self._stats)
+        for tier in ('l1', 'l2'):
+            reads = stats['%s_hits' % tier] + stats['%s_misses' % tier]
+            stats['%s_hit_ratio' % tier] = float(stats['%s_hits' % tier]) / reads if reads else None
+        return stats
+
+    def reset_stats(self):
+        with _stats_lock:
+            for counter in self._stats:
+                self._stats[counter] = 0
@@ -1,5 +1,8 @@
 from math import ceil
 
+from django.core import signing
+from django.core.exceptions import ValidationError
+
 class InvalidPage(Exception):
     pass
 
@@ -9,12 +12,108 @@ class PageNotAnInteger(InvalidPage):
 class EmptyPage(InvalidPage):
     pass
 
+class InvalidCursor(InvalidPage):
+    pass
+
+class ExactCount(object):
+    """
+    Counts the objects of a list or QuerySet exactly.
+    """
+    def count(self, object_list):
+        try:
+            return object_list.count()
+        except (AttributeError, TypeError):
+            # AttributeError if object_list has no count() method.
+            # TypeError if object_list.count() requires arguments
+            # (i.e. is of type list).
+            return len(object_list)
+
+class EstimatedCount(object):
+    """
+    Estimates the number of objects of an unfiltered QuerySet from the
+    statistics of the database, which is much cheaper than a COUNT query on
+    large tables, but can be inaccurate.
+
+    Filtered QuerySets, lists, estimates below ``threshold`` (for which
+    counting is cheap and inaccuracies more visible), and backends without
+    statistics fall back to the ``fallback`` strategy, which counts exactly by
+    default.
+    """
+    def __init__(self, threshold=1000, fallback=None):
+        self.threshold = threshold
+        self.fallback = fallback or ExactCount()
+
+    def count(self, object_list):
+        from django.db.models.query import EmptyQuerySet
+        estimate = None
+        query = getattr(object_list, 'query', None)
+        if (not isinstance(object_list, EmptyQuerySet) and hasattr(query, 'where')
+                and not query.where and not query.having
+                and not query.distinct and not query.extra and not query.extra_tables
+                and query.low_mark == 0 and query.high_mark is None):
+            from django.db import connections
+            connection = connections[object_list.db]
+            estimate = connection.ops.estimated_row_count(
+                object_list.model._meta.db_table)
+        if estimate is None or estimate < self.threshold:
+            return self.fallback.count(object_list)
+        return estimate
+
+class CachedCount(object):
+    """
+    Caches the counts of QuerySets for ``timeout`` seconds, in the cache
+    named ``cache_alias``. QuerySets are identified by the SQL of their
+    query, so that the same filters share the same count. The counts are
+    computed by the ``strategy`` count strategy, exact by default.
+    """
+    def __init__(self, timeout=60, cache_alias='default', key_prefix='',
+                 strategy=None):
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+        self.strategy = strategy or ExactCount()
+
+    def get_cache_key(self, object_list):
+        """
+        Returns the cache key of the count of ``object_list``, or None if it
+        can't be cached.
+        """
+        import hashlib
+        from django.db.models.query import EmptyQuerySet
+        from django.db.models.sql.datastructures import EmptyResultSet
+        from django.utils.encoding import force_bytes
+        query = getattr(object_list, 'query', None)
+        if (isinstance(object_list, EmptyQuerySet) or
+                not hasattr(query, 'sql_with_params')):
+            return None
+        try:
+            sql, params = query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        key = hashlib.md5(force_bytes('%s:%s:%r' % (
+            object_list.db, sql, params))).hexdigest()
+        return 'paginator.count.%s.%s' % (self.key_prefix, key)
+
+    def count(self, object_list):
+        from django.core.cache import get_cache
+        key = self.get_cache_key(object_list)
+        if key is None:
+            return self.strategy.count(object_list)
+        cache = get_cache(self.cache_alias)
+        count = cache.get(key)
+        if count is None:
+            count = self.strategy.count(object_list)
+            cache.set(key, count, self.timeout)
+        return count
+
 class Paginator(object):
-    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True):
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 count_strategy=None):
         self.object_list = object_list
         self.per_page = int(per_page)
         self.orphans = int(orphans)
         self.allow_empty_first_page = allow_empty_first_page
+        self.count_strategy = count_strategy or ExactCount()
         self._num_pages = self._count = None
 
     def validate_number(self, number):
@@ -44,13 +143,7 @@ class Paginator(object):
     def _get_count(self):
         "Returns the total number of objects, across all pages."
         if self._count is None:
-            try:
-                self._count = self.object_list.count()
-            except (AttributeError, TypeError):
-                # AttributeError if object_list has no count() method.
-                # TypeError if object_list.count() requires arguments
-                # (i.e. is of type list).
-                self._count = len(self.object_list)
+            self._count = self.count_strategy.count(self.object_list)
         return self._count
     count = property(_get_count)
 
@@ -156,3 +249,171 @@ class Page(object):
         if self.number == self.paginator.num_pages:
             return self.paginator.count
         return self.number * self.paginator.per_page
+
+
+class CursorPaginator(object):
+    """
+    Paginates a QuerySet by the values of an ordered, unique tuple of fields
+    (keyset pagination) rather than by page number.
+
+    Each page is retrieved with a filter such as ``(start, id) > (%s, %s)``
+    starting from the last object of the previous page, instead of an
+    ``OFFSET``, so its cost doesn't depend on how deep it is, and no
+    ``COUNT`` query is needed. Pages are identified by opaque cursors, signed
+    with django.core.signing so that they can't be forged.
+
+    ``ordering`` lists the names of the fields, prefixed with '-' for a
+    descending order, and defaults to the ordering of the QuerySet. The
+    primary key is appended unless it's already included, which makes the
+    tuple unique. The fields must not be nullable.
+    """
+    def __init__(self, object_list, per_page, ordering=None, salt=None,
+                 max_age=None):
+        from django.db.models.constants import LOOKUP_SEP
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.max_age = max_age
+        opts = object_list.model._meta
+        if ordering is None:
+            ordering = object_list.query.order_by or opts.ordering
+        self.fields = []
+        for name in ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            if name == '?' or LOOKUP_SEP in name:
+                raise ValueError("CursorPaginator can't order by '%s'." % name)
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+            if field.rel and field is not opts.pk:
+                raise ValueError("CursorPaginator can't order by the relation "
+                                 "'%s'." % name)
+            self.fields.append((field, descending))
+        if opts.pk not in [field for field, descending in self.fields]:
+            descending = self.fields[-1][1] if self.fields else False
+            self.fields.append((opts.pk, descending))
+        self.ordering = []
+        for field, descending in self.fields:
+            name = field.name
+            # Order by the column of a primary key which is a relation (such
+            # as a parent link) rather than by the ordering of its model.
+            target = field
+            while target.rel:
+                target = target.rel.get_related_field()
+                name += LOOKUP_SEP + target.name
+            self.ordering.append(('-%s' if descending else '%s') % name)
+        self.salt = 'django.core.paginator.CursorPaginator:%s.%s:%s' % (
+            opts.app_label, opts.object_name, salt or '')
+
+    def encode_cursor(self, obj, reverse=False):
+        """
+        Returns the cursor of the page starting after ``obj``, or before it
+        when ``reverse`` is True.
+        """
+        values = [field.value_to_string(obj) for field, descending in self.fields]
+        return signing.dumps([values, int(reverse)], salt=self.salt)
+
+    def decode_cursor(self, cursor):
+        """
+        Returns the (position, reverse) pair encoded in ``cursor``.
+        """
+        try:
+            values, reverse = signing.loads(cursor, salt=self.salt,
+                                            max_age=self.max_age)
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [field.to_python(value)
+                        for (field, descending), value in zip(self.fields, values)]
+        except (signing.BadSignature, ValidationError, ValueError, TypeError):
+            raise InvalidCursor('That cursor is invalid')
+        return position, bool(reverse)
+
+    def _seek(self, queryset, position, reverse):
+        """
+        Restricts ``queryset`` to the objects after ``position`` in the
+        ordering of the paginator, or before it when ``reverse`` is True.
+        """
+        from django.db import connections
+        from django.db.models import Q
+        directions = set(descending for field, descending in self.fields)
+        connection = connections[queryset.db]
+        if len(directions) == 1 and connection.features.supports_row_value_comparison:
+            qn = connection.ops.quote_name
+            columns = ', '.join('%s.%s' % (qn(field.model._meta.db_table), qn(field.column))
+                                for field, descending in self.fields)
+            operator = '<' if directions.pop() != reverse else '>'
+            params = [field.get_db_prep_value(value, connection=connection)
+                      for (field, descending), value in zip(self.fields, position)]
+            where = '(%s) %s (%s)' % (columns, operator,
+                                      ', '.join(['%s'] * len(params)))
+            return queryset.extra(where=[where], params=params)
+        # (a, b) > (x, y) is a >= x AND (a > x OR (a = x AND b > y)).
+        condition = Q()
+        equal = {}
+        for (field, descending), value in zip(self.fields, position):
+            lookup = '%s__%s' % (field.name, 'lt' if descending != reverse else 'gt')
+            condition |= Q(**dict(equal, **{lookup: value}))
+            equal[field.name] = value
+        field, descending = self.fields[0]
+        if len(self.fields) > 1:
+            lookup = '%s__%s' % (field.name, 'lte' if descending != reverse else 'gte')
+            condition = Q(**{lookup: position[0]}) & condition
+        return queryset.filter(condition)
+
+    def page(self, cursor=None):
+        "Returns a CursorPage object for the given cursor, or the first page."
+        queryset = self.object_list.order_by(*self.ordering)
+        reverse = False
+        if cursor:
+            position, reverse = self.decode_cursor(cursor)
+            if reverse:
+                queryset = queryset.reverse()
+            queryset = self._seek(queryset, position, reverse)
+        # One more object tells if there's another page in that direction.
+        objects = list(queryset[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        del objects[self.per_page:]
+        if reverse:
+            objects.reverse()
+            return CursorPage(objects, self, has_next=True, has_previous=has_more)
+        return CursorPage(objects, self, has_next=has_more,
+                          has_previous=bool(cursor))
+
+
+class CursorPage(object):
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<CursorPage of %s objects>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def next_cursor(self):
+        "Returns the cursor of the next page, or None if there is none."
+        if not self.has_next() or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    def previous_cursor(self):
+        "Returns the cursor of the previous page, or None if there is none."
+        if not self.has_previous() or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], reverse=True)
@@ -8,12 +8,13 @@ a string) and returns a tuple in this format:
 """
 from __future__ import unicode_literals
 
+import itertools
 import re
-from threading import local
+from threading import local, Lock
 
 from django.http import Http404
 from django.core.exceptions import ImproperlyConfigured, ViewDoesNotExist
-from django.utils.datastructures import MultiValueDict
+from django.utils.datastructures import LRUDict, MultiValueDict
 from django.utils.encoding import force_str, force_text, iri_to_uri
 from django.utils.functional import memoize, lazy
 from django.utils.importlib import import_module
@@ -27,6 +28,15 @@ _resolver_cache = {} # Maps URLconf modules to RegexURLResolver instances.
 _ns_resolver_cache = {} # Maps namespaces to RegexURLResolver instances.
 _callable_cache = {} # Maps view and url pattern names to their view functions.
 
+# The most recently reversed URLs, by the arguments of reverse().
+REVERSE_CACHE_SIZE = 1000
+_reverse_cache = LRUDict(REVERSE_CACHE_SIZE)
+_reverse_cache_lock = Lock()
+
+# The types of arguments which are reversed to the same URL whenever they're
+# equal, and can be used in keys of _reverse_cache.
+_reverse_cache_types = (six.text_type, six.binary_type, bool, float) + six.integer_types
+
 # SCRIPT_NAME prefixes for each thread are stored here. If there's no entry for
 # the current thread (which is the only one we ever access), it is assumed to
 # be empty.
@@ -143,6 +153,196 @@ def get_mod_func(callback):
         return callback, ''
     return callback[:dot], callback[dot+1:]
 
+def literal_prefix(pattern):
+    """
+    Returns the literal string every match of the regular expression
+    ``pattern`` begins with at the start of the searched string, or '' if
+    there's none (e.g. the pattern isn't anchored with '^', or sets flags
+    such as (?i), which apply to the whole pattern wherever they appear).
+    """
+    if not pattern.startswith('^'):
+        return ''
+    # An alternation outside of groups isn't anchored as a whole.
+    depth = 0
+    in_class = escaped = False
+    for i, char in enumerate(pattern):
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            if pattern[i + 1:i + 2] == '?' and pattern[i + 2:i + 3] in tuple('iLmsux'):
+                return ''
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return ''
+    prefix = []
+    i = 1
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            char = pattern[i + 1:i + 2]
+            # Only escaped punctuation is literal; \d, \b, \1... aren't.
+            if not char or char.isalnum() or char == '_':
+                break
+            i += 2
+        elif char in '.^$*+?{}[]|()':
+            break
+        else:
+            i += 1
+        if pattern[i:i + 1] in ('*', '+', '?', '{'):
+            # The character may be repeated or missing.
+            break
+        prefix.append(char)
+    return ''.join(prefix)
+
+
+def reverse_validators(pattern):
+    """
+    Returns a (format, validators) pair if the regular expression ``pattern``
+    is only made of literal text and of groups whose matches don't depend on
+    the text around them, or None otherwise. ``format`` is the format string
+    of the URLs matching ``pattern``, and ``validators`` maps the name of each
+    group (as given by normalize()) to a regular expression matching its
+    values.
+
+    A URL built from ``format`` and values matched by the validators of their
+    groups always matches ``pattern``.
+    """
+    format = []
+    validators = {}
+    unnamed = 0
+    i = 0
+    if pattern.startswith('^'):
+        i = 1
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            char = pattern[i + 1:i + 2]
+            if not char or char.isalnum() or char == '_':
+                return None
+            i += 2
+        elif char == '$' and i == len(pattern) - 1:
+            break
+        elif char == '(':
+            end = pattern.find(')', i)
+            if end == -1:
+                return None
+            group = pattern[i + 1:end]
+            if group.startswith('?P<') and '>' in group:
+                name, sub_pattern = group[3:].split('>', 1)
+            elif group.startswith('?'):
+                return None
+            else:
+                name, sub_pattern = '_%d' % unnamed, group
+                unnamed += 1
+            if name in validators or not _is_context_free(sub_pattern):
+                return None
+            try:
+                validators[name] = re.compile('^(?:%s)\\Z' % sub_pattern, re.UNICODE)
+            except re.error:
+                return None
+            format.append('%%(%s)s' % name)
+            i = end + 1
+            if pattern[i:i + 1] in ('*', '+', '?', '{'):
+                return None
+            continue
+        elif char in '.^$*+?{}[]|)%':
+            return None
+        else:
+            i += 1
+        if pattern[i:i + 1] in ('*', '+', '?', '{'):
+            return None
+        format.append(char)
+    return ''.join(format), validators
+
+def _is_context_free(pattern):
+    """
+    Returns True if the regular expression ``pattern`` matches the same
+    strings wherever it's embedded: it contains no groups, anchors,
+    backreferences or word boundaries.
+    """
+    in_class = escaped = False
+    for char in pattern:
+        if escaped:
+            if not in_class and (char.isdigit() or char in 'AbBZ'):
+                return False
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char in '()^$':
+            return False
+    return not (escaped or in_class)
+
+
+class ReverseTemplate(object):
+    """
+    One way of reversing a URL pattern under a given prefix: the format string
+    of the URL, its parameters and default arguments, and the regular
+    expression the URL must match.
+    """
+    def __init__(self, format, params, defaults, pattern):
+        self.format = format
+        self.params = params
+        self.defaults = defaults
+        self.keys = set(params) | set(defaults)
+        self.pattern = pattern
+        self._regex = None
+        # When the arguments are matched by the regular expressions of their
+        # groups, the URL matches the pattern without being checked.
+        self.validators = None
+        parsed = reverse_validators(pattern)
+        if parsed is not None:
+            expected_format, validators = parsed
+            if expected_format == format and set(validators) == set(params):
+                self.validators = [validators[param] for param in params]
+
+    @property
+    def regex(self):
+        if self._regex is None:
+            self._regex = re.compile('^%s' % self.pattern, re.UNICODE)
+        return self._regex
+
+    def reverse(self, args, kwargs):
+        """
+        Returns the URL for ``args`` or ``kwargs``, or None if they don't fit
+        this template.
+        """
+        if args:
+            if len(args) != len(self.params):
+                return None
+            values = [force_text(val) for val in args]
+            candidate = self.format % dict(zip(self.params, values))
+        else:
+            if set(kwargs) | set(self.defaults) != self.keys:
+                return None
+            for k, v in self.defaults.items():
+                if kwargs.get(k, v) != v:
+                    return None
+            unicode_kwargs = dict([(k, force_text(v)) for (k, v) in kwargs.items()])
+            candidate = self.format % unicode_kwargs
+            values = [unicode_kwargs[param] for param in self.params]
+        if self.validators is not None:
+            for validator, value in zip(self.validators, values):
+                if not validator.match(value):
+                    break
+            else:
+                return candidate
+        if self.regex.search(candidate):
+            return candidate
+        return None
+
+
 class LocaleRegexProvider(object):
     """
     A mixin to provide a default regex property which can vary by active
@@ -243,6 +443,8 @@ class RegexURLResolver(LocaleRegexProvider):
         self._reverse_dict = {}
         self._namespace_dict = {}
         self._app_dict = {}
+        self._prefix_index = {}
+        self._reverse_templates = {}
 
     def __repr__(self):
         if isinstance(self.urlconf_name, list) and len(self.urlconf_name):
@@ -310,25 +512,78 @@ class RegexURLResolver(LocaleRegexProvider):
             self._populate()
         return self._app_dict[language_code]
 
+    def _build_prefix_index(self, patterns):
+        """
+        Returns a trie of the literal prefixes of ``patterns``. Each node is
+        a dictionary mapping characters to child nodes, and '' to the indexes
+        of the patterns whose prefix ends at this node.
+        """
+        trie = {'': []}
+        for index, pattern in enumerate(patterns):
+            prefix = ''
+            resolve = type(pattern).resolve
+            if getattr(resolve, '__func__', resolve) in _indexable_resolve_methods:
+                try:
+                    regex = pattern.regex
+                    if not regex.flags & (re.I | re.L | re.X):
+                        prefix = literal_prefix(regex.pattern)
+                except ImproperlyConfigured:
+                    # Let resolve() raise the error when the pattern is tried.
+                    pass
+            node = trie
+            for char in prefix:
+                node = node.setdefault(char, {'': []})
+            node[''].append(index)
+        return trie
+
+    def _candidates(self, patterns, path):
+        """
+        Returns the indexes of the patterns which may match ``path``, in
+        order: those whose literal prefix is a prefix of ``path``.
+        """
+        language_code = get_language()
+        entry = self._prefix_index.get(language_code)
+        if entry is None or entry[0] is not patterns or entry[1] != len(patterns):
+            entry = (patterns, len(patterns), self._build_prefix_index(patterns))
+            self._prefix_index[language_code] = entry
+        node = entry[2]
+        candidates = list(node[''])
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                break
+            candidates.extend(node[''])
+        candidates.sort()
+        return candidates
+
     def resolve(self, path):
         tried = []
         match = self.regex.search(path)
         if match:
             new_path = path[match.end():]
-            for pattern in self.url_patterns:
+            patterns = self.url_patterns
+            if not isinstance(patterns, (list, tuple)):
+                patterns = list(patterns)
+            # Only the patterns whose literal prefix matches are tried; the
+            # others can't match.
+            failures = {}
+            for index in self._candidates(patterns, new_path):
                 try:
-                    sub_match = pattern.resolve(new_path)
+                    sub_match = patterns[index].resolve(new_path)
                 except Resolver404 as e:
-                    sub_tried = e.args[0].get('tried')
-                    if sub_tried is not None:
-                        tried.extend([[pattern] + t for t in sub_tried])
-                    else:
-                        tried.append([pattern])
+                    failures[index] = e
                 else:
                     if sub_match:
                         sub_match_dict = dict(match.groupdict(), **self.default_kwargs)
                         sub_match_dict.update(sub_match.kwargs)
                         return ResolverMatch(sub_match.func, sub_match.args, sub_match_dict, sub_match.url_name, self.app_name or sub_match.app_name, [self.namespace] + sub_match.namespaces)
+            for index, pattern in enumerate(patterns):
+                sub_tried = None
+                if index in failures:
+                    sub_tried = failures[index].args[0].get('tried')
+                if sub_tried is not None:
+                    tried.extend([[pattern] + t for t in sub_tried])
+                else:
                     tried.append([pattern])
             raise Resolver404({'tried': tried, 'path': new_path})
         raise Resolver404({'path' : path})
@@ -371,6 +626,26 @@ class RegexURLResolver(LocaleRegexProvider):
     def reverse(self, lookup_view, *args, **kwargs):
         return self._reverse_with_prefix(lookup_view, '', *args, **kwargs)
 
+    def reverse_templates(self, lookup_view, _prefix):
+        """
+        Returns the ReverseTemplates of ``lookup_view`` under ``_prefix``, in
+        the order they're tried.
+        """
+        key = (get_language(), lookup_view, _prefix)
+        try:
+            return self._reverse_templates[key]
+        except KeyError:
+            pass
+        prefix_norm, prefix_args = normalize(_prefix)[0]
+        templates = []
+        for possibility, pattern, defaults in self.reverse_dict.getlist(lookup_view):
+            for result, params in possibility:
+                templates.append(ReverseTemplate(prefix_norm + result,
+                    prefix_args + params, defaults, _prefix + pattern))
+        if templates:
+            self._reverse_templates[key] = templates
+        return templates
+
     def _reverse_with_prefix(self, lookup_view, _prefix, *args, **kwargs):
         if args and kwargs:
             raise ValueError("Don't mix *args and **kwargs in call to reverse()!")
@@ -378,29 +653,10 @@ class RegexURLResolver(LocaleRegexProvider):
             lookup_view = get_callable(lookup_view, True)
         except (ImportError, AttributeError) as e:
             raise NoReverseMatch("Error importing '%s': %s." % (lookup_view, e))
-        possibilities = self.reverse_dict.getlist(lookup_view)
-        prefix_norm, prefix_args = normalize(_prefix)[0]
-        for possibility, pattern, defaults in possibilities:
-            for result, params in possibility:
-                if args:
-                    if len(args) != len(params) + len(prefix_args):
-                        continue
-                    unicode_args = [force_text(val) for val in args]
-                    candidate =  (prefix_norm + result) % dict(zip(prefix_args + params, unicode_args))
-                else:
-                    if set(kwargs.keys()) | set(defaults.keys()) != set(params) | set(defaults.keys()) | set(prefix_args):
-                        continue
-                    matches = True
-                    for k, v in defaults.items():
-                        if kwargs.get(k, v) != v:
-                            matches = False
-                            break
-                    if not matches:
-                        continue
-                    unicode_kwargs = dict([(k, force_text(v)) for (k, v) in kwargs.items()])
-                    candidate = (prefix_norm + result) % unicode_kwargs
-                if re.search('^%s%s' % (_prefix, pattern), candidate, re.UNICODE):
-                    return candidate
+        for template in self.reverse_templates(lookup_view, _prefix):
+            candidate = template.reverse(args, kwargs)
+            if candidate is not None:
+                return candidate
         # lookup_view can be URL label, or dotted path, or callable, Any of
         # these can be passed in at the top, but callables are not friendly in
         # error messages.
@@ -413,6 +669,13 @@ class RegexURLResolver(LocaleRegexProvider):
         raise NoReverseMatch("Reverse for '%s' with arguments '%s' and keyword "
                 "arguments '%s' not found." % (lookup_view_s, args, kwargs))
 
+# Patterns resolved by these methods only match paths starting with the
+# literal prefix of their regex.
+_indexable_resolve_methods = (
+    getattr(RegexURLPattern.resolve, '__func__', RegexURLPattern.resolve),
+    getattr(RegexURLResolver.resolve, '__func__', RegexURLResolver.resolve),
+)
+
 class LocaleRegexURLResolver(RegexURLResolver):
     """
     A URL resolver that always matches the active language code as URL prefix.
@@ -437,16 +700,42 @@ def resolve(path, urlconf=None):
         urlconf = get_urlconf()
     return get_resolver(urlconf).resolve(path)
 
+def _reverse_cache_key(urlconf, viewname, args, kwargs, prefix, current_app):
+    """
+    Returns the key of the URL reversed for these arguments of reverse() in
+    _reverse_cache, or None if it can't be cached.
+    """
+    for value in itertools.chain(args, kwargs.values()):
+        if type(value) not in _reverse_cache_types:
+            return None
+    # Equal values of different types, e.g. 1 and True, give different URLs.
+    key = (urlconf, viewname, tuple([(type(v), v) for v in args]),
+           frozenset([(k, type(v), v) for k, v in kwargs.items()]),
+           prefix, current_app, get_language())
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
 def reverse(viewname, urlconf=None, args=None, kwargs=None, prefix=None, current_app=None):
     if urlconf is None:
         urlconf = get_urlconf()
-    resolver = get_resolver(urlconf)
     args = args or []
     kwargs = kwargs or {}
 
     if prefix is None:
         prefix = get_script_prefix()
 
+    key = _reverse_cache_key(urlconf, viewname, args, kwargs, prefix, current_app)
+    if key is not None:
+        with _reverse_cache_lock:
+            url = _reverse_cache.get(key)
+        if url is not None:
+            return url
+
+    resolver = get_resolver(urlconf)
+
     if not isinstance(viewname, six.string_types):
         view = viewname
     else:
@@ -491,7 +780,11 @@ def reverse(viewname, urlconf=None, args=None, kwargs=None, prefix=None, current
         if ns_pattern:
             resolver = get_ns_resolver(ns_pattern, resolver)
 
-    return iri_to_uri(resolver._reverse_with_prefix(view, prefix, *args, **kwargs))
+    url = iri_to_uri(resolver._reverse_with_prefix(view, prefix, *args, **kwargs))
+    if key is not None:
+        with _reverse_cache_lock:
+            _reverse_cache[key] = url
+    return url
 
 reverse_lazy = lazy(reverse, str)
 
@@ -502,6 +795,8 @@ def clear_url_caches():
     _resolver_cache.clear()
     _ns_resolver_cache.clear()
     _callable_cache.clear()
+    with _reverse_cache_lock:
+        _reverse_cache.clear()
 
 def set_script_prefix(prefix):
     """
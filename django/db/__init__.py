@@ -40,7 +40,8 @@ connection = DefaultConnectionProxy()
 backend = load_backend(connection.settings_dict['ENGINE'])
 
 # Register an event that closes the database connection
-# when a Django request is finished.
+# when a Django request is finished. Connections of aliases with a POOL
+# configured are handed back to their pool for reuse instead.
 def close_connection(**kwargs):
     for conn in connections.all():
         conn.close()
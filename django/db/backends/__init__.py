@@ -9,6 +9,7 @@ from contextlib import contextmanager
 from django.conf import settings
 from django.db import DEFAULT_DB_ALIAS
 from django.db.backends import util
+from django.db.backends.pool import pools
 from django.db.transaction import TransactionManagementError
 from django.utils.functional import cached_property
 from django.utils.importlib import import_module
@@ -41,6 +42,9 @@ class BaseDatabaseWrapper(object):
         self._thread_ident = thread.get_ident()
         self.allow_thread_sharing = allow_thread_sharing
 
+        # (pool, created_at) while the connection is checked out of a pool.
+        self._pool_entry = None
+
     def __eq__(self, other):
         return self.alias == other.alias
 
@@ -301,20 +305,77 @@ class BaseDatabaseWrapper(object):
         """
         pass
 
+    @property
+    def pool(self):
+        """
+        The ConnectionPool shared by all the wrappers of this alias, or None
+        if connection pooling isn't enabled for it.
+        """
+        return pools.get(self.alias, self.settings_dict)
+
+    def is_usable(self):
+        """
+        Tests if the database connection is still usable. Used to validate
+        pooled connections before they're handed out.
+        """
+        try:
+            self.connection.cursor().execute("SELECT 1")
+        except Exception:
+            return False
+        return True
+
+    def _init_pooled_connection(self):
+        """
+        A hook for backend-specific setup of a connection reused from the
+        pool, e.g. to restore connection state this wrapper expects.
+        """
+        pass
+
+    def _release_pooled_connection(self):
+        """
+        Hands the connection back to the pool it was checked out of. Returns
+        False if the connection doesn't belong to a pool.
+        """
+        if self._pool_entry is None:
+            return False
+        self._pool_entry[0].checkin(self)
+        return True
+
     def close(self):
         self.validate_thread_sharing()
         if self.connection is not None:
-            self.connection.close()
+            if not self._release_pooled_connection():
+                self.connection.close()
             self.connection = None
 
+    def _checkout_pooled_connection(self):
+        """
+        Attaches a connection from the pool, if pooling is enabled and no
+        connection is open yet.
+        """
+        if self.connection is None:
+            pool = self.pool
+            if pool is not None:
+                pool.checkout(self)
+
     def cursor(self):
         self.validate_thread_sharing()
+        self._checkout_pooled_connection()
+        return self._wrap_cursor(self._cursor())
+
+    def chunked_cursor(self):
+        """
+        Returns a cursor meant to read a large result set in chunks, without
+        the whole result set being loaded in memory by the database driver.
+        Backends that can't stream results return a regular cursor.
+        """
+        return self.cursor()
+
+    def _wrap_cursor(self, cursor):
         if (self.use_debug_cursor or
             (self.use_debug_cursor is None and settings.DEBUG)):
-            cursor = self.make_debug_cursor(self._cursor())
-        else:
-            cursor = util.CursorWrapper(self._cursor(), self)
-        return cursor
+            return self.make_debug_cursor(cursor)
+        return util.CursorWrapper(cursor, self)
 
     def make_debug_cursor(self, cursor):
         return util.CursorDebugWrapper(cursor, self)
@@ -394,6 +455,14 @@ class BaseDatabaseFeatures(object):
     # Is there a 1000 item limit on query parameters?
     supports_1000_query_parameters = True
 
+    # Must a CASE expression used as an UPDATE value be cast to the column
+    # type, because the backend types untyped literals in it as text?
+    requires_casted_case_in_updates = False
+
+    # Can rows be compared with row value constructors, as in
+    # "(a, b) > (%s, %s)", and use indexes on (a, b) to do so?
+    supports_row_value_comparison = False
+
     # Can an object have a primary key of 0? MySQL says No.
     allows_primary_key_0 = True
 
@@ -497,6 +566,17 @@ class BaseDatabaseOperations(object):
         """
         return "SELECT cache_key FROM %s ORDER BY cache_key LIMIT 1 OFFSET %%s"
 
+    def cache_upsert_sql(self, num_values):
+        """
+        Returns a SQL statement that inserts ``num_values`` rows of
+        (cache_key, value, expires) into a table, replacing the rows which
+        have the same keys, or None if the backend can't do that in a single
+        statement.
+
+        This is used by the 'db' cache backend to set entries.
+        """
+        return None
+
     def date_extract_sql(self, lookup_type, field_name):
         """
         Given a lookup_type of 'year', 'month' or 'day', returns the SQL that
@@ -646,6 +726,29 @@ class BaseDatabaseOperations(object):
         """
         return None
 
+    def max_query_params(self):
+        """
+        Returns the maximum number of parameters that can be passed in a
+        single query, or None if the backend does not impose a limit.
+        """
+        return None
+
+    def estimated_row_count(self, table_name):
+        """
+        Returns the number of rows in the given table as estimated from the
+        statistics of the database, without scanning the table, or None if
+        no estimate is available.
+        """
+        return None
+
+    def replication_lag(self):
+        """
+        Returns the number of seconds by which the database lags behind the
+        primary it replicates, 0 if it isn't a replica, or None if the
+        backend can't tell.
+        """
+        return None
+
     def max_name_length(self):
         """
         Returns the maximum length of table and column names, or None if there
@@ -3,6 +3,7 @@ import sys
 import time
 
 from django.conf import settings
+from django.db.backends.pool import pools
 from django.db.utils import load_backend
 from django.utils.encoding import force_bytes
 from django.utils.six.moves import input
@@ -268,6 +269,8 @@ class BaseDatabaseCreation(object):
         self._create_test_db(verbosity, autoclobber)
 
         self.connection.close()
+        # Pooled connections still point to the previous database.
+        pools.discard(self.connection.alias)
         self.connection.settings_dict["NAME"] = test_database_name
 
         # Report syncdb messages at one level lower than that requested.
@@ -365,6 +368,7 @@ class BaseDatabaseCreation(object):
         database already exists.
         """
         self.connection.close()
+        pools.discard(self.connection.alias)
         test_database_name = self.connection.settings_dict['NAME']
         if verbosity >= 1:
             test_db_repr = ''
@@ -379,6 +383,7 @@ class BaseDatabaseCreation(object):
         # Refs #10868 and #17786.
         settings_dict = self.connection.settings_dict.copy()
         settings_dict['NAME'] = old_database_name
+        settings_dict['POOL'] = None
         backend = load_backend(settings_dict['ENGINE'])
         new_connection = backend.DatabaseWrapper(
                              settings_dict,
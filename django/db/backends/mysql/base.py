@@ -320,9 +320,36 @@ class DatabaseOperations(BaseDatabaseOperations):
         second = '%s-12-31 23:59:59.99'
         return [first % value, second % value]
 
+    def estimated_row_count(self, table_name):
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s", [table_name])
+        row = cursor.fetchone()
+        if row is None or row[0] is None:
+            return None
+        return int(row[0])
+
+    def replication_lag(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SHOW SLAVE STATUS")
+        row = cursor.fetchone()
+        if row is None:
+            return 0
+        columns = [column[0] for column in cursor.description]
+        lag = row[columns.index('Seconds_Behind_Master')]
+        # Seconds_Behind_Master is NULL when replication is stopped, in which
+        # case the replica falls further behind indefinitely.
+        return float('inf') if lag is None else float(lag)
+
     def max_name_length(self):
         return 64
 
+    def cache_upsert_sql(self, num_values):
+        return ("INSERT INTO %s (cache_key, value, expires) VALUES " +
+                ", ".join(["(%%s, %%s, %%s)"] * num_values) +
+                " ON DUPLICATE KEY UPDATE value = VALUES(value), expires = VALUES(expires)")
+
     def bulk_insert_sql(self, fields, num_values):
         items_sql = "(%s)" % ", ".join(["%s"] * len(fields))
         return "VALUES " + ", ".join([items_sql] * num_values)
@@ -376,7 +403,24 @@ class DatabaseWrapper(BaseDatabaseWrapper):
                 self.connection = None
         return False
 
-    def _cursor(self):
+    def is_usable(self):
+        try:
+            self.connection.ping()
+        except DatabaseError:
+            return False
+        return True
+
+    def chunked_cursor(self):
+        # An unbuffered SSCursor streams rows from the server as they are
+        # fetched. However, no other query can run on the connection until
+        # every row has been read, so it must be enabled explicitly.
+        if not self.settings_dict['OPTIONS'].get('server_side_cursors'):
+            return self.cursor()
+        self.validate_thread_sharing()
+        self._checkout_pooled_connection()
+        return self._wrap_cursor(self._cursor(Database.cursors.SSCursor))
+
+    def _cursor(self, cursorclass=None):
         new_connection = False
         if not self._valid_connection():
             new_connection = True
@@ -402,11 +446,16 @@ class DatabaseWrapper(BaseDatabaseWrapper):
             # "UPDATE", not the number of changed rows.
             kwargs['client_flag'] = CLIENT.FOUND_ROWS
             kwargs.update(settings_dict['OPTIONS'])
+            if 'server_side_cursors' in kwargs:
+                del kwargs['server_side_cursors']
             self.connection = Database.connect(**kwargs)
             self.connection.encoders[SafeText] = self.connection.encoders[six.text_type]
             self.connection.encoders[SafeBytes] = self.connection.encoders[bytes]
             connection_created.send(sender=self.__class__, connection=self)
-        cursor = self.connection.cursor()
+        if cursorclass is None:
+            cursor = self.connection.cursor()
+        else:
+            cursor = self.connection.cursor(cursorclass)
         if new_connection:
             # SQL_AUTO_IS_NULL in MySQL controls whether an AUTO_INCREMENT column
             # on a recently-inserted row will return when the field is tested for
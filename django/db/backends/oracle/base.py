@@ -240,6 +240,15 @@ WHEN (new.%(col_name)s IS NULL)
     def max_name_length(self):
         return 30
 
+    def estimated_row_count(self, table_name):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT num_rows FROM user_tables WHERE table_name = %s",
+                       [self.quote_name(table_name)[1:-1]])
+        row = cursor.fetchone()
+        if row is None or row[0] is None:
+            return None
+        return int(row[0])
+
     def prep_for_iexact_query(self, x):
         return x
 
@@ -472,6 +481,13 @@ class DatabaseWrapper(BaseDatabaseWrapper):
     def _valid_connection(self):
         return self.connection is not None
 
+    def is_usable(self):
+        try:
+            self.connection.cursor().execute("SELECT 1 FROM DUAL")
+        except Database.Error:
+            return False
+        return True
+
     def _connect_string(self):
         settings_dict = self.settings_dict
         if not settings_dict['HOST'].strip():
@@ -0,0 +1,287 @@
+"""
+Persistent connection pooling for database backends.
+
+A pool is shared by every ``DatabaseWrapper`` configured for the same alias,
+across all threads. Instead of being closed at the end of each request, the
+underlying DB-API connection is handed back to the pool and reused by the
+next wrapper that needs one. Pooling is enabled per alias through the
+``POOL`` key of the :setting:`DATABASES` setting, e.g.::
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql_psycopg2',
+            'NAME': 'wyrdin',
+            'POOL': {
+                'MAX_SIZE': 10,         # connections opened at most
+                'MAX_AGE': 600,         # seconds before a connection is recycled
+                'HEALTH_CHECK': True,   # validate connections on checkout
+                'TIMEOUT': 30,          # seconds to wait for a free connection
+            },
+        },
+    }
+"""
+from __future__ import unicode_literals
+
+import threading
+import time
+from collections import deque
+
+from django.db.utils import DatabaseError
+
+
+class PoolTimeout(DatabaseError):
+    """
+    Raised when no connection could be checked out of a pool in time.
+    """
+    pass
+
+
+class ConnectionPool(object):
+    """
+    A bounded pool of open DB-API connections for a single database alias.
+
+    ``max_size`` limits the number of connections opened at the same time,
+    idle or in use. ``max_age`` (in seconds, ``None`` for no limit) is the
+    lifetime of a connection after which it is closed instead of being
+    reused. When ``health_check`` is True, idle connections are validated
+    with ``DatabaseWrapper.is_usable()`` before being handed out. A checkout
+    blocks for at most ``timeout`` seconds (``None`` to wait forever) when
+    every connection is in use.
+    """
+    def __init__(self, alias, max_size=10, max_age=None, health_check=False,
+                 timeout=None):
+        if max_size < 1:
+            raise ValueError("A connection pool needs a MAX_SIZE of at least 1.")
+        self.alias = alias
+        self.max_size = max_size
+        self.max_age = max_age
+        self.health_check = health_check
+        self.timeout = timeout
+        # Idle connections as (connection, created_at) pairs, most recently
+        # returned last so that hot connections are reused first.
+        self._idle = deque()
+        # Number of connections opened by the pool, idle or checked out.
+        self._size = 0
+        self._cond = threading.Condition(threading.Lock())
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._cond:
+            self._stats = {
+                'checkouts': 0,
+                'reused': 0,
+                'opened': 0,
+                'discarded': 0,
+                'waits': 0,
+                'wait_time': 0.0,
+                'max_wait_time': 0.0,
+                'timeouts': 0,
+            }
+
+    def stats(self):
+        """
+        Returns a dictionary of counters describing the pool activity:
+        number of checkouts, reused and newly opened connections, discarded
+        (stale, expired or broken) connections, checkouts that had to wait
+        for a free connection along with the total and maximum wait time in
+        seconds, and the current number of open and idle connections.
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+        return stats
+
+    def _expired(self, created_at, now=None):
+        if self.max_age is None:
+            return False
+        return (now or time.time()) - created_at >= self.max_age
+
+    def _close_connection(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            # The connection is being thrown away anyway.
+            pass
+
+    def _forget(self, connection):
+        """
+        Closes a connection owned by the pool and frees its slot.
+        """
+        self._close_connection(connection)
+        with self._cond:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._cond.notify()
+
+    def _record_wait(self, waited):
+        self._stats['wait_time'] += waited
+        self._stats['max_wait_time'] = max(self._stats['max_wait_time'], waited)
+
+    def _acquire(self):
+        """
+        Returns an idle (connection, created_at) pair, or (None, None) when a
+        slot was reserved for a new connection. Blocks while the pool is full.
+        """
+        start = None
+        with self._cond:
+            while True:
+                while self._idle:
+                    connection, created_at = self._idle.pop()
+                    if not self._expired(created_at):
+                        break
+                    self._size -= 1
+                    self._stats['discarded'] += 1
+                    self._close_connection(connection)
+                else:
+                    connection = created_at = None
+                if connection is not None or self._size < self.max_size:
+                    break
+                now = time.time()
+                if start is None:
+                    start = now
+                    self._stats['waits'] += 1
+                elif self.timeout is not None and now - start >= self.timeout:
+                    self._stats['timeouts'] += 1
+                    self._record_wait(now - start)
+                    raise PoolTimeout(
+                        "Couldn't check out a connection for database '%s' "
+                        "within %s seconds (%d connections in use)."
+                        % (self.alias, self.timeout, self._size))
+                if self.timeout is None:
+                    self._cond.wait()
+                else:
+                    self._cond.wait(self.timeout - (now - start))
+            if connection is None:
+                self._size += 1
+            if start is not None:
+                self._record_wait(time.time() - start)
+            self._stats['checkouts'] += 1
+        return connection, created_at
+
+    def checkout(self, wrapper):
+        """
+        Attaches a connection to ``wrapper``, reusing an idle one when
+        possible and opening a new one through the backend otherwise.
+        """
+        while True:
+            connection, created_at = self._acquire()
+            if connection is None:
+                break
+            wrapper.connection = connection
+            if not self.health_check or wrapper.is_usable():
+                wrapper._pool_entry = (self, created_at)
+                wrapper._init_pooled_connection()
+                with self._cond:
+                    self._stats['reused'] += 1
+                return
+            wrapper.connection = None
+            self._forget(connection)
+
+        try:
+            # The backend's _cursor() opens and initializes the connection.
+            wrapper._cursor()
+        except Exception:
+            wrapper.connection = None
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        wrapper._pool_entry = (self, time.time())
+        with self._cond:
+            self._stats['opened'] += 1
+
+    def checkin(self, wrapper):
+        """
+        Takes the connection back from ``wrapper``. Any pending transaction
+        is rolled back; connections that can't be reset or are past their
+        ``max_age`` are closed instead of being kept.
+        """
+        connection = wrapper.connection
+        created_at = wrapper._pool_entry[1]
+        wrapper.connection = None
+        wrapper._pool_entry = None
+        try:
+            connection.rollback()
+        except Exception:
+            self._forget(connection)
+            return
+        if self._expired(created_at):
+            self._forget(connection)
+            return
+        with self._cond:
+            self._idle.append((connection, created_at))
+            self._cond.notify()
+
+    def close_all(self):
+        """
+        Closes every idle connection. Checked out connections are closed
+        when they are returned to the pool.
+        """
+        with self._cond:
+            idle, self._idle = self._idle, deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for connection, created_at in idle:
+            self._close_connection(connection)
+
+
+class PoolHandler(object):
+    """
+    Registry of the connection pools, keyed by database alias.
+    """
+    def __init__(self):
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def get(self, alias, settings_dict):
+        """
+        Returns the pool for ``alias``, creating it on first use, or None if
+        pooling isn't enabled in ``settings_dict``.
+        """
+        options = settings_dict.get('POOL')
+        if not options:
+            return None
+        try:
+            return self._pools[alias]
+        except KeyError:
+            pass
+        with self._lock:
+            if alias not in self._pools:
+                self._pools[alias] = ConnectionPool(alias,
+                    max_size=options.get('MAX_SIZE', 10),
+                    max_age=options.get('MAX_AGE'),
+                    health_check=options.get('HEALTH_CHECK', False),
+                    timeout=options.get('TIMEOUT'))
+            return self._pools[alias]
+
+    def __getitem__(self, alias):
+        return self._pools[alias]
+
+    def __contains__(self, alias):
+        return alias in self._pools
+
+    def all(self):
+        return list(self._pools.values())
+
+    def discard(self, alias):
+        """
+        Closes the idle connections of the pool for ``alias``, if any, and
+        forgets it so that it's rebuilt from the current settings.
+        """
+        with self._lock:
+            pool = self._pools.pop(alias, None)
+        if pool is not None:
+            pool.close_all()
+
+    def close_all(self):
+        """
+        Closes the idle connections of every pool and forgets the pools, so
+        that they're rebuilt from the current settings.
+        """
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.close_all()
+
+pools = PoolHandler()
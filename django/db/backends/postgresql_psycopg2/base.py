@@ -85,6 +85,8 @@ class DatabaseFeatures(BaseDatabaseFeatures):
     has_bulk_insert = True
     supports_tablespaces = True
     can_distinct_on_fields = True
+    requires_casted_case_in_updates = True
+    supports_row_value_comparison = True
 
 class DatabaseWrapper(BaseDatabaseWrapper):
     vendor = 'postgresql'
@@ -122,6 +124,7 @@ class DatabaseWrapper(BaseDatabaseWrapper):
         self.introspection = DatabaseIntrospection(self)
         self.validation = BaseDatabaseValidation(self)
         self._pg_version = None
+        self._named_cursor_count = 0
 
     def check_constraints(self, table_names=None):
         """
@@ -135,6 +138,8 @@ class DatabaseWrapper(BaseDatabaseWrapper):
         self.validate_thread_sharing()
         if self.connection is None:
             return
+        if self._release_pooled_connection():
+            return
 
         try:
             self.connection.close()
@@ -150,13 +155,27 @@ class DatabaseWrapper(BaseDatabaseWrapper):
             )
             raise
 
+    def _init_pooled_connection(self):
+        # A previous owner may have left the connection in another isolation
+        # level through transaction management.
+        self.connection.set_isolation_level(self.isolation_level)
+
     def _get_pg_version(self):
         if self._pg_version is None:
             self._pg_version = get_version(self.connection)
         return self._pg_version
     pg_version = property(_get_pg_version)
 
-    def _cursor(self):
+    def chunked_cursor(self):
+        # A named cursor is declared on the server, which sends rows only as
+        # they are fetched instead of the whole result set at once.
+        self.validate_thread_sharing()
+        self._checkout_pooled_connection()
+        self._named_cursor_count += 1
+        name = '_django_curs_%d_%d' % (thread.get_ident(), self._named_cursor_count)
+        return self._wrap_cursor(self._cursor(name=name))
+
+    def _cursor(self, name=None):
         settings_dict = self.settings_dict
         if self.connection is None:
             if not settings_dict['NAME']:
@@ -199,7 +218,15 @@ class DatabaseWrapper(BaseDatabaseWrapper):
             self.connection.set_isolation_level(self.isolation_level)
             self._get_pg_version()
             connection_created.send(sender=self.__class__, connection=self)
-        cursor = self.connection.cursor()
+        if name is None:
+            cursor = self.connection.cursor()
+        else:
+            # Unless transactions are managed, the cursor must be declared
+            # WITH HOLD to outlive the commits made while its rows are read:
+            # the implicit commit of its DECLARE statement in autocommit
+            # mode, or those of commit_unless_managed() otherwise. It's
+            # closed once its rows have been read.
+            cursor = self.connection.cursor(name, withhold=not self.is_managed())
         cursor.tzinfo_factory = utc_tzinfo_factory if settings.USE_TZ else None
         return CursorWrapper(cursor)
 
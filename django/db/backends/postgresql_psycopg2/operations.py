@@ -7,6 +7,29 @@ class DatabaseOperations(BaseDatabaseOperations):
     def __init__(self, connection):
         super(DatabaseOperations, self).__init__(connection)
 
+    def estimated_row_count(self, table_name):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                       [self.quote_name(table_name)])
+        row = cursor.fetchone()
+        # reltuples is negative or zero until the table has been analyzed.
+        if row is None or row[0] <= 0:
+            return None
+        return int(row[0])
+
+    def replication_lag(self):
+        # pg_last_xact_replay_timestamp() is NULL until a transaction has
+        # been replayed. Note that the lag of an idle replica grows until the
+        # primary commits a transaction. now() is the start of the current
+        # transaction, which may have been opened by earlier queries, so the
+        # current time is taken from clock_timestamp().
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "SELECT CASE WHEN pg_is_in_recovery() THEN COALESCE("
+            "EXTRACT(EPOCH FROM clock_timestamp() - pg_last_xact_replay_timestamp()), 0) "
+            "ELSE 0 END")
+        return float(cursor.fetchone()[0])
+
     def date_extract_sql(self, lookup_type, field_name):
         # http://www.postgresql.org/docs/8.0/static/functions-datetime.html#FUNCTIONS-DATETIME-EXTRACT
         if lookup_type == 'week_day':
@@ -123,6 +123,28 @@ class DatabaseOperations(BaseDatabaseOperations):
         """
         return (999 // len(fields)) if len(fields) > 0 else len(objs)
 
+    def cache_upsert_sql(self, num_values):
+        # Multiple-row VALUES clauses require SQLite 3.7.11.
+        return ("INSERT OR REPLACE INTO %s (cache_key, value, expires) " +
+                " UNION ALL ".join(["SELECT %%s, %%s, %%s"] * num_values))
+
+    def max_query_params(self):
+        # SQLITE_LIMIT_VARIABLE_NUMBER
+        return 999
+
+    def estimated_row_count(self, table_name):
+        # The statistics gathered by ANALYZE are stored in sqlite_stat1; the
+        # first number of each row is the number of rows in the table.
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            return None
+        cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table_name])
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return int(row[0].split()[0])
+
     def date_extract_sql(self, lookup_type, field_name):
         # sqlite doesn't support extract, so we fake it with the user-defined
         # function django_extract that's registered in connect(). Note that
@@ -336,6 +358,14 @@ class DatabaseWrapper(BaseDatabaseWrapper):
                         % (table_name, bad_row[0], table_name, column_name, bad_row[1],
                         referenced_table_name, referenced_column_name))
 
+    @property
+    def pool(self):
+        # Each in-memory database lives and dies with its own connection,
+        # so these connections can't be shared through a pool.
+        if self.settings_dict['NAME'] == ":memory:":
+            return None
+        return super(DatabaseWrapper, self).pool
+
     def close(self):
         self.validate_thread_sharing()
         # If database is in memory, closing the connection destroys the
@@ -407,6 +407,81 @@ class Model(six.with_metaclass(ModelBase, object)):
         super(Model, self).__init__()
         signals.post_init.send(sender=self.__class__, instance=self)
 
+    @classmethod
+    def _instance_builder(cls, attnames=None):
+        """
+        Returns a function building instances of this model from database
+        rows, for use when iterating over querysets.
+
+        The function takes a sequence of values for ``attnames`` (by default,
+        the attnames of every field of the model, in order) and the alias of
+        the database they come from. It produces the same instance as
+        ``cls(**dict(zip(attnames, values)))`` followed by setting its
+        database state, but without the overhead of __init__().
+
+        Returns None when that shortcut isn't safe: when __init__() is
+        overridden somewhere in the class hierarchy, or when pre_init or
+        post_init have receivers for this model.
+        """
+        for klass in cls.__mro__:
+            if klass is not Model and klass is not object and (
+                    '__init__' in klass.__dict__ or '__new__' in klass.__dict__):
+                return None
+        if (signals.pre_init.has_listeners(cls) or
+                signals.post_init.has_listeners(cls)):
+            return None
+
+        if attnames is None:
+            attnames = tuple(f.attname for f in cls._meta.fields)
+        loaded = set(attnames)
+        # Fields whose attribute is handled by a data descriptor (file fields,
+        # SubfieldBase fields...) must be set through setattr().
+        descriptor_attnames = []
+        # Fields which aren't loaded nor deferred get their default value.
+        default_fields = []
+        for field in cls._meta.fields:
+            attr = None
+            for klass in cls.__mro__:
+                if field.attname in klass.__dict__:
+                    attr = klass.__dict__[field.attname]
+                    break
+            if field.attname in loaded:
+                if hasattr(attr, '__set__'):
+                    descriptor_attnames.append(field.attname)
+            elif not isinstance(cls.__dict__.get(field.attname), DeferredAttribute):
+                if hasattr(attr, '__set__'):
+                    descriptor_attnames.append(field.attname)
+                default_fields.append(field)
+
+        new = cls.__new__
+
+        if not default_fields and not descriptor_attnames:
+            def build(values, using):
+                obj = new(cls)
+                data = dict(zip(attnames, values))
+                state = data['_state'] = ModelState(using)
+                state.adding = False
+                obj.__dict__ = data
+                return obj
+            return build
+
+        def build(values, using):
+            obj = new(cls)
+            data = dict(zip(attnames, values))
+            for field in default_fields:
+                data[field.attname] = field.get_default()
+            if descriptor_attnames:
+                descriptor_values = [(attname, data.pop(attname))
+                                     for attname in descriptor_attnames]
+            state = data['_state'] = ModelState(using)
+            state.adding = False
+            obj.__dict__.update(data)
+            if descriptor_attnames:
+                for attname, value in descriptor_values:
+                    setattr(obj, attname, value)
+            return obj
+        return build
+
     def __repr__(self):
         try:
             u = six.text_type(self)
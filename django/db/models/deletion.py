@@ -1,3 +1,4 @@
+import time
 from functools import wraps
 from operator import attrgetter
 
@@ -71,7 +72,7 @@ def force_managed(func):
 
 
 class Collector(object):
-    def __init__(self, using):
+    def __init__(self, using, chunk_size=None, progress=None):
         self.using = using
         # Initially, {model: set([instances])}, later values become lists.
         self.data = {}
@@ -88,6 +89,20 @@ class Collector(object):
         # parent.
         self.dependencies = {} # {model: set([models])}
 
+        # When deleting in chunks (see delete_in_chunks()), objects reached
+        # through CASCADE relations aren't collected: the querysets selecting
+        # them are kept in cascades, and deleted in chunks before the
+        # collected objects. Likewise, field updates of querysets are kept in
+        # queryset_updates as (field, value, queryset) triples and applied in
+        # chunks.
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.cascades = []
+        self.queryset_updates = []
+        # {concrete model: set([pks])} of the chunks being deleted, which
+        # cascades reaching them again must leave alone.
+        self.pending = {}
+
     def add(self, objs, source=None, nullable=False, reverse_dependency=False):
         """
         Adds 'objs' to the collection of objects to be deleted.  If the call is
@@ -127,6 +142,9 @@ class Collector(object):
         Schedules a field update. 'objs' must be a homogenous iterable
         collection of model instances (e.g. a QuerySet).
         """
+        if self.chunk_size and hasattr(objs, '_raw_delete'):
+            self.queryset_updates.append((field, value, objs))
+            return
         if not objs:
             return
         model = objs[0].__class__
@@ -222,6 +240,12 @@ class Collector(object):
                 sub_objs = self.related_objects(related, new_objs)
                 if self.can_fast_delete(sub_objs, from_field=field):
                     self.fast_deletes.append(sub_objs)
+                elif self.chunk_size and not field.rel.parent_link:
+                    # Don't load the related objects; there may be many.
+                    if field.rel.on_delete is CASCADE:
+                        self.cascades.append(sub_objs)
+                    elif sub_objs.exists():
+                        field.rel.on_delete(self, field, sub_objs, self.using)
                 elif sub_objs:
                     field.rel.on_delete(self, field, sub_objs, self.using)
 
@@ -232,6 +256,9 @@ class Collector(object):
             for relation in model._meta.many_to_many:
                 if not relation.rel.through:
                     sub_objs = relation.bulk_related_objects(new_objs, self.using)
+                    if self.chunk_size and not self.can_fast_delete(sub_objs):
+                        self.cascades.append(sub_objs)
+                        continue
                     self.collect(sub_objs,
                                  source=model,
                                  source_attr=relation.rel.related_name,
@@ -330,3 +357,110 @@ class Collector(object):
         for model, instances in six.iteritems(self.data):
             for instance in instances:
                 setattr(instance, model._meta.pk.attname, None)
+
+    def delete_in_chunks(self, queryset):
+        """
+        Deletes the objects of ``queryset``, and the objects cascading from
+        them, in chunks of at most ``chunk_size`` objects of the same model.
+
+        The objects are fetched and deleted in primary key order. Before a
+        chunk is deleted, the objects cascading from it are deleted in
+        chunks, recursively, and the foreign keys pointing to it are updated
+        in chunks, so that the memory used doesn't depend on the number of
+        related objects. Each chunk is deleted in its own transaction unless
+        a transaction is already being managed.
+
+        If ``progress`` is set, it's called after each chunk is deleted with
+        the model of the chunk, the number of objects deleted and the time
+        spent in seconds.
+        """
+        model = queryset.model
+        pending = self.pending.setdefault(model._meta.concrete_model, set())
+        queryset = queryset.using(self.using).order_by('pk')
+        fast = self.can_fast_delete(queryset)
+        last_pk = None
+        while True:
+            chunk = queryset
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            if fast:
+                pk_list = list(chunk.values_list('pk', flat=True)[:self.chunk_size])
+                if not pk_list:
+                    break
+                last_pk = pk_list[-1]
+                start = time.time()
+                self._delete_pks(model, pk_list)
+                count, elapsed = len(pk_list), time.time() - start
+            else:
+                objs = list(chunk[:self.chunk_size])
+                if not objs:
+                    break
+                last_pk = objs[-1].pk
+                # Objects of chunks being deleted by an outer call are left
+                # to it, so that reference cycles don't recurse forever.
+                objs = [obj for obj in objs if obj.pk not in pending]
+                if not objs:
+                    continue
+                pks = set(obj.pk for obj in objs)
+                pending.update(pks)
+                try:
+                    count, elapsed = len(objs), self._delete_chunk(objs)
+                finally:
+                    pending.difference_update(pks)
+            if self.progress is not None:
+                self.progress(model, count, elapsed)
+
+    def _delete_chunk(self, objs):
+        """
+        Deletes the objects of a chunk and returns the time spent doing it,
+        except for the time spent deleting other chunks in cascade.
+        """
+        start = time.time()
+        collector = Collector(self.using, chunk_size=self.chunk_size)
+        collector.collect(objs)
+        elapsed = time.time() - start
+
+        querysets = collector.cascades + collector.fast_deletes
+        for queryset in querysets:
+            self.delete_in_chunks(queryset)
+        collector.fast_deletes = []
+        for field, value, queryset in collector.queryset_updates:
+            self.update_in_chunks(queryset, field, value)
+
+        start = time.time()
+        if querysets:
+            # The cascades may have reached some of the collected objects.
+            for model, instances in list(six.iteritems(collector.data)):
+                pk_list = [obj.pk for obj in instances]
+                remaining = set(model._base_manager.using(self.using).filter(
+                    pk__in=pk_list).values_list('pk', flat=True))
+                collector.data[model] = set(
+                    obj for obj in instances if obj.pk in remaining)
+        collector.delete()
+        return elapsed + time.time() - start
+
+    def update_in_chunks(self, queryset, field, value):
+        """
+        Sets ``field`` to ``value`` on the objects of ``queryset``, in chunks
+        of at most ``chunk_size`` objects.
+        """
+        model = queryset.model
+        queryset = queryset.using(self.using).order_by('pk')
+        last_pk = None
+        while True:
+            chunk = queryset
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            pk_list = list(chunk.values_list('pk', flat=True)[:self.chunk_size])
+            if not pk_list:
+                break
+            last_pk = pk_list[-1]
+            self._update_pks(model, pk_list, field, value)
+
+    @force_managed
+    def _delete_pks(self, model, pk_list):
+        sql.DeleteQuery(model).delete_batch(pk_list, self.using)
+
+    @force_managed
+    def _update_pks(self, model, pk_list, field, value):
+        sql.UpdateQuery(model).update_batch(pk_list, {field.name: value}, self.using)
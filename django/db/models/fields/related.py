@@ -241,12 +241,14 @@ class SingleRelatedObjectDescriptor(object):
         db = router.db_for_read(self.related.model, **db_hints)
         return self.related.model._base_manager.using(db)
 
-    def get_prefetch_query_set(self, instances):
+    def get_prefetch_query_set(self, instances, queryset=None):
+        if queryset is None:
+            queryset = self.get_query_set(instance=instances[0])
         rel_obj_attr = attrgetter(self.related.field.attname)
         instance_attr = lambda obj: obj._get_pk_val()
         instances_dict = dict((instance_attr(inst), inst) for inst in instances)
         params = {'%s__pk__in' % self.related.field.name: list(instances_dict)}
-        qs = self.get_query_set(instance=instances[0]).filter(**params)
+        qs = queryset.filter(**params)
         # Since we're going to assign directly in the cache,
         # we must manage the reverse relation cache manually.
         rel_obj_cache_name = self.related.field.get_cache_name()
@@ -343,7 +345,9 @@ class ReverseSingleRelatedObjectDescriptor(object):
         else:
             return QuerySet(self.field.rel.to).using(db)
 
-    def get_prefetch_query_set(self, instances):
+    def get_prefetch_query_set(self, instances, queryset=None):
+        if queryset is None:
+            queryset = self.get_query_set(instance=instances[0])
         other_field = self.field.rel.get_related_field()
         rel_obj_attr = attrgetter(other_field.attname)
         instance_attr = attrgetter(self.field.attname)
@@ -352,7 +356,7 @@ class ReverseSingleRelatedObjectDescriptor(object):
             params = {'%s__pk__in' % self.field.rel.field_name: list(instances_dict)}
         else:
             params = {'%s__in' % self.field.rel.field_name: list(instances_dict)}
-        qs = self.get_query_set(instance=instances[0]).filter(**params)
+        qs = queryset.filter(**params)
         # Since we're going to assign directly in the cache,
         # we must manage the reverse relation cache manually.
         if not self.field.rel.multiple:
@@ -498,13 +502,15 @@ class ForeignRelatedObjectsDescriptor(object):
                     qs._known_related_object = (rel_field.name, self.instance)
                     return qs
 
-            def get_prefetch_query_set(self, instances):
+            def get_prefetch_query_set(self, instances, queryset=None):
+                if queryset is None:
+                    db = self._db or router.db_for_read(self.model, instance=instances[0])
+                    queryset = super(RelatedManager, self).get_query_set().using(db)
                 rel_obj_attr = attrgetter(rel_field.attname)
                 instance_attr = attrgetter(attname)
                 instances_dict = dict((instance_attr(inst), inst) for inst in instances)
-                db = self._db or router.db_for_read(self.model, instance=instances[0])
                 query = {'%s__%s__in' % (rel_field.name, attname): list(instances_dict)}
-                qs = super(RelatedManager, self).get_query_set().using(db).filter(**query)
+                qs = queryset.filter(**query)
                 # Since we just bypassed this class' get_query_set(), we must manage
                 # the reverse relation manually.
                 for rel_obj in qs:
@@ -584,13 +590,17 @@ def create_many_related_manager(superclass, rel):
                 db = self._db or router.db_for_read(self.instance.__class__, instance=self.instance)
                 return super(ManyRelatedManager, self).get_query_set().using(db)._next_is_sticky().filter(**self.core_filters)
 
-        def get_prefetch_query_set(self, instances):
+        def get_prefetch_query_set(self, instances, queryset=None):
             instance = instances[0]
             from django.db import connections
-            db = self._db or router.db_for_read(instance.__class__, instance=instance)
+            if queryset is None:
+                db = self._db or router.db_for_read(instance.__class__, instance=instance)
+                queryset = super(ManyRelatedManager, self).get_query_set().using(db)
+            else:
+                db = queryset.db
             query = {'%s__pk__in' % self.query_field_name:
                          set(obj._get_pk_val() for obj in instances)}
-            qs = super(ManyRelatedManager, self).get_query_set().using(db)._next_is_sticky().filter(**query)
+            qs = queryset._next_is_sticky().filter(**query)
 
             # M2M: need to annotate the query in order to get the primary model
             # that the secondary model was actually related to. We know that
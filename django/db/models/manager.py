@@ -151,6 +151,9 @@ class Manager(object):
     def bulk_create(self, *args, **kwargs):
         return self.get_query_set().bulk_create(*args, **kwargs)
 
+    def bulk_update(self, *args, **kwargs):
+        return self.get_query_set().bulk_update(*args, **kwargs)
+
     def filter(self, *args, **kwargs):
         return self.get_query_set().filter(*args, **kwargs)
 
@@ -14,6 +14,7 @@ from django.db.models.query_utils import (Q, select_related_descend,
     deferred_class_factory, InvalidQuery)
 from django.db.models.deletion import Collector
 from django.db.models import sql
+from django.db.models.sql.expressions import CaseByPk
 from django.utils.functional import partition
 from django.utils import six
 
@@ -25,6 +26,10 @@ ITER_CHUNK_SIZE = CHUNK_SIZE
 # The maximum number of items to display in a QuerySet.__repr__
 REPR_OUTPUT_SIZE = 20
 
+# The number of query parameters left for the filters of the related queryset
+# when prefetch_related() splits its "IN" lists (see get_prefetch_batch_size).
+PREFETCH_PARAMS_MARGIN = 20
+
 # Pull into this namespace for backwards compatibility.
 EmptyResultSet = sql.EmptyResultSet
 
@@ -233,10 +238,12 @@ class QuerySet(object):
     # METHODS THAT DO DATABASE QUERIES #
     ####################################
 
-    def iterator(self):
+    def iterator(self, chunk_size=None):
         """
         An iterator over the results from applying this QuerySet to the
-        database.
+        database. If chunk_size is given, rows are streamed from the database
+        that many at a time, using server-side cursors where the backend
+        supports them, so that memory use doesn't grow with the result set.
         """
         fill_cache = False
         if connections[self.db].features.supports_select_related:
@@ -294,10 +301,17 @@ class QuerySet(object):
         if fill_cache:
             klass_info = get_klass_info(model, max_depth=max_depth,
                                         requested=requested, only_load=only_load)
-        for row in compiler.results_iter():
+        elif skip:
+            build = model_cls._instance_builder(init_list)
+        else:
+            build = model._instance_builder()
+        for row in compiler.results_iter(chunk_size=chunk_size):
             if fill_cache:
                 obj, _ = get_cached_row(row, index_start, db, klass_info,
                                         offset=len(aggregate_select))
+            elif build is not None:
+                # Omit aggregates in object creation.
+                obj = build(row[index_start:aggregate_start], db)
             else:
                 # Omit aggregates in object creation.
                 row_data = row[index_start:aggregate_start]
@@ -441,6 +455,65 @@ class QuerySet(object):
 
         return objs
 
+    def bulk_update(self, objs, fields, batch_size=None):
+        """
+        Updates the given fields of each of the instances in the database,
+        using one UPDATE query per batch of objects. This does *not* call
+        save() on each of the instances and does not send any pre/post save
+        signals. Returns the number of rows matched.
+        """
+        assert batch_size is None or batch_size > 0
+        if not fields:
+            raise ValueError("Field names must be given to bulk_update().")
+        opts = self.model._meta
+        fields = [opts.get_field_by_name(name) for name in fields]
+        for field, model, direct, m2m in fields:
+            if not direct or m2m:
+                raise exceptions.FieldError("Cannot update model field %r (only "
+                    "non-relations and foreign keys permitted)." % field)
+            if field.primary_key:
+                raise exceptions.FieldError("bulk_update() cannot be used with primary "
+                    "key fields.")
+        fields = [f[0] for f in fields]
+        if any(obj.pk is None for obj in objs):
+            raise ValueError("All bulk_update() objects must have a primary "
+                             "key set.")
+        if not objs:
+            return 0
+        self._for_write = True
+        ops = connections[self.db].ops
+        # Each object takes a "WHEN pk THEN value" pair of parameters per
+        # updated field, plus its pk in the "WHERE pk IN (...)" clause.
+        max_batch_size = max(ops.bulk_batch_size(
+            [opts.pk] * (2 * len(fields) + 1), objs), 1)
+        batch_size = min(batch_size, max_batch_size) if batch_size else max_batch_size
+        if not transaction.is_managed(using=self.db):
+            transaction.enter_transaction_management(using=self.db)
+            forced_managed = True
+        else:
+            forced_managed = False
+        rows = 0
+        try:
+            for i in range(0, len(objs), batch_size):
+                batch = objs[i:i+batch_size]
+                values = dict(
+                    (field.name, CaseByPk(field,
+                        [(obj.pk, getattr(obj, field.attname)) for obj in batch]))
+                    for field in fields)
+                query = self.filter(pk__in=[obj.pk for obj in batch]).query.clone(sql.UpdateQuery)
+                query.add_update_values(values)
+                rows += query.get_compiler(self.db).execute_sql(None)
+            if forced_managed:
+                transaction.commit(using=self.db)
+            else:
+                transaction.commit_unless_managed(using=self.db)
+        finally:
+            if forced_managed:
+                transaction.leave_transaction_management(using=self.db)
+        self._result_cache = None
+        return rows
+    bulk_update.alters_data = True
+
     def get_or_create(self, **kwargs):
         """
         Looks up an object with the given kwargs, creating one if necessary.
@@ -502,9 +575,14 @@ class QuerySet(object):
         qs = self.filter(pk__in=id_list).order_by()
         return dict([(obj._get_pk_val(), obj) for obj in qs])
 
-    def delete(self):
+    def delete(self, chunk_size=None, progress=None):
         """
         Deletes the records in the current QuerySet.
+
+        If chunk_size is given, the records, and those cascading from them,
+        are deleted in chunks of at most chunk_size objects, each in its own
+        transaction. progress is then called after each chunk with its model,
+        its number of objects and the time spent deleting it.
         """
         assert self.query.can_filter(), \
                 "Cannot use 'limit' or 'offset' with delete."
@@ -521,9 +599,14 @@ class QuerySet(object):
         del_query.query.select_related = False
         del_query.query.clear_ordering()
 
-        collector = Collector(using=del_query.db)
-        collector.collect(del_query)
-        collector.delete()
+        assert chunk_size is None or chunk_size > 0
+        collector = Collector(using=del_query.db, chunk_size=chunk_size,
+                              progress=progress)
+        if chunk_size:
+            collector.delete_in_chunks(del_query)
+        else:
+            collector.collect(del_query)
+            collector.delete()
 
         # Clear the result cache, in case this QuerySet gets reused.
         self._result_cache = None
@@ -719,6 +802,9 @@ class QuerySet(object):
         Many-To-One and Many-To-Many related objects when the QuerySet is
         evaluated.
 
+        Lookups are either strings or Prefetch objects, which customize the
+        queryset used to retrieve the related objects.
+
         When prefetch_related() is called more than once, the list of lookups to
         prefetch is appended to. If prefetch_related(None) is called, the
         the list is cleared.
@@ -972,7 +1058,7 @@ class ValuesQuerySet(QuerySet):
         # QuerySet.clone() will also set up the _fields attribute with the
         # names of the model fields to select.
 
-    def iterator(self):
+    def iterator(self, chunk_size=None):
         # Purge any extra columns that haven't been explicitly asked for
         extra_names = list(self.query.extra_select)
         field_names = self.field_names
@@ -980,7 +1066,7 @@ class ValuesQuerySet(QuerySet):
 
         names = extra_names + field_names + aggregate_names
 
-        for row in self.query.get_compiler(self.db).results_iter():
+        for row in self.query.get_compiler(self.db).results_iter(chunk_size=chunk_size):
             yield dict(zip(names, row))
 
     def _setup_query(self):
@@ -1094,12 +1180,13 @@ class ValuesQuerySet(QuerySet):
 
 
 class ValuesListQuerySet(ValuesQuerySet):
-    def iterator(self):
+    def iterator(self, chunk_size=None):
+        compiler = self.query.get_compiler(self.db)
         if self.flat and len(self._fields) == 1:
-            for row in self.query.get_compiler(self.db).results_iter():
+            for row in compiler.results_iter(chunk_size=chunk_size):
                 yield row[0]
         elif not self.query.extra_select and not self.query.aggregate_select:
-            for row in self.query.get_compiler(self.db).results_iter():
+            for row in compiler.results_iter(chunk_size=chunk_size):
                 yield tuple(row)
         else:
             # When extra(select=...) or an annotation is involved, the extra
@@ -1118,7 +1205,7 @@ class ValuesListQuerySet(ValuesQuerySet):
             else:
                 fields = names
 
-            for row in self.query.get_compiler(self.db).results_iter():
+            for row in compiler.results_iter(chunk_size=chunk_size):
                 data = dict(zip(names, row))
                 yield tuple([data[f] for f in fields])
 
@@ -1131,8 +1218,8 @@ class ValuesListQuerySet(ValuesQuerySet):
 
 
 class DateQuerySet(QuerySet):
-    def iterator(self):
-        return self.query.get_compiler(self.db).results_iter()
+    def iterator(self, chunk_size=None):
+        return self.query.get_compiler(self.db).results_iter(chunk_size=chunk_size)
 
     def _setup_query(self):
         """
@@ -1169,7 +1256,7 @@ class EmptyQuerySet(QuerySet):
     def count(self):
         return 0
 
-    def delete(self):
+    def delete(self, chunk_size=None, progress=None):
         pass
 
     def _clone(self, klass=None, setup=False, **kwargs):
@@ -1177,7 +1264,7 @@ class EmptyQuerySet(QuerySet):
         c._result_cache = []
         return c
 
-    def iterator(self):
+    def iterator(self, chunk_size=None):
         # This slightly odd construction is because we need an empty generator
         # (it raises StopIteration immediately).
         yield next(iter([]))
@@ -1298,6 +1385,10 @@ def get_klass_info(klass, max_depth=0, cur_depth=0, requested=None,
        the full field list for `klass` can be assumed.
      * local_only - Only populate local fields. This is used when
        following reverse select-related relations
+
+    The last item of the returned tuple is the function building instances
+    of klass without calling its __init__() method, or None when klass
+    has to be instantiated normally (see Model._instance_builder()).
     """
     if max_depth and requested is None and cur_depth > max_depth:
         # We've recursed deeply enough; stop now.
@@ -1372,7 +1463,10 @@ def get_klass_info(klass, max_depth=0, cur_depth=0, requested=None,
                                             requested=next, only_load=only_load, local_only=True)
                 reverse_related_fields.append((o.field, klass_info))
 
-    return klass, field_names, field_count, related_fields, reverse_related_fields
+    build = klass._instance_builder(field_names or
+        [f.attname for f in klass._meta.fields[:field_count]])
+
+    return klass, field_names, field_count, related_fields, reverse_related_fields, build
 
 
 def get_cached_row(row, index_start, using,  klass_info, offset=0):
@@ -1395,7 +1489,8 @@ def get_cached_row(row, index_start, using,  klass_info, offset=0):
     """
     if klass_info is None:
         return None
-    klass, field_names, field_count, related_fields, reverse_related_fields = klass_info
+    (klass, field_names, field_count, related_fields, reverse_related_fields,
+     build) = klass_info
 
     fields = row[index_start : index_start + field_count]
     # If all the select_related columns are None, then the related
@@ -1403,16 +1498,18 @@ def get_cached_row(row, index_start, using,  klass_info, offset=0):
     # Otherwise, construct the related object.
     if fields == (None,) * field_count:
         obj = None
+    elif build is not None:
+        obj = build(fields, using)
     else:
         if field_names:
             obj = klass(**dict(zip(field_names, fields)))
         else:
             obj = klass(*fields)
 
-    # If an object was retrieved, set the database state.
-    if obj:
-        obj._state.db = using
-        obj._state.adding = False
+        # If an object was retrieved, set the database state.
+        if obj:
+            obj._state.db = using
+            obj._state.adding = False
 
     # Instantiate related fields
     index_end = index_start + field_count + offset
@@ -1615,6 +1712,81 @@ def insert_query(model, objs, fields, return_id=False, raw=False, using=None):
     return query.get_compiler(using=using).execute_sql(return_id)
 
 
+class Prefetch(object):
+    """
+    Describes a prefetch_related() lookup whose related objects are retrieved
+    with a custom queryset, and are optionally stored in a list attribute
+    named ``to_attr`` rather than in the cache of the related manager.
+    """
+    def __init__(self, lookup, queryset=None, to_attr=None):
+        if queryset is not None and (isinstance(queryset, ValuesQuerySet) or
+                                     not isinstance(queryset, QuerySet)):
+            raise ValueError("Prefetch querysets must be QuerySets returning "
+                             "model instances.")
+        # The path traversed to perform the prefetch.
+        self.prefetch_through = lookup
+        # The path the results are stored at.
+        if to_attr:
+            self.prefetch_to = LOOKUP_SEP.join(
+                lookup.split(LOOKUP_SEP)[:-1] + [to_attr])
+        else:
+            self.prefetch_to = lookup
+        self.queryset = queryset
+        self.to_attr = to_attr
+
+    def add_prefix(self, prefix):
+        self.prefetch_through = LOOKUP_SEP.join([prefix, self.prefetch_through])
+        self.prefetch_to = LOOKUP_SEP.join([prefix, self.prefetch_to])
+
+    def get_current_prefetch_to(self, level):
+        return LOOKUP_SEP.join(self.prefetch_to.split(LOOKUP_SEP)[:level + 1])
+
+    def get_current_to_attr(self, level):
+        """
+        Returns the attribute the results of the given level are stored at,
+        and whether it's a plain attribute given by ``to_attr``.
+        """
+        parts = self.prefetch_to.split(LOOKUP_SEP)
+        as_attr = bool(self.to_attr) and level == len(parts) - 1
+        return parts[level], as_attr
+
+    def get_current_queryset(self, level):
+        if level == len(self.prefetch_to.split(LOOKUP_SEP)) - 1:
+            return self.queryset
+        return None
+
+    def __eq__(self, other):
+        if isinstance(other, Prefetch):
+            return self.prefetch_to == other.prefetch_to
+        return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.__class__) ^ hash(self.prefetch_to)
+
+    def __repr__(self):
+        return "<%s: %s>" % (self.__class__.__name__, self.prefetch_to)
+
+
+def normalize_prefetch_lookups(lookups, prefix=None):
+    """
+    Turns the lookups given to prefetch_related() into Prefetch objects,
+    prefixing them with ``prefix`` if given.
+    """
+    ret = []
+    for lookup in lookups:
+        if isinstance(lookup, Prefetch):
+            lookup = copy.copy(lookup)
+        else:
+            lookup = Prefetch(lookup)
+        if prefix:
+            lookup.add_prefix(prefix)
+        ret.append(lookup)
+    return ret
+
+
 def prefetch_related_objects(result_cache, related_lookups):
     """
     Helper function for prefetch_related functionality
@@ -1630,16 +1802,21 @@ def prefetch_related_objects(result_cache, related_lookups):
     # We need to be able to dynamically add to the list of prefetch_related
     # lookups that we look up (see below).  So we need some book keeping to
     # ensure we don't do duplicate work.
-    done_lookups = set() # list of lookups like foo__bar__baz
+    done_lookups = set() # set of Prefetch objects like foo__bar__baz
     done_queries = {}    # dictionary of things like 'foo__bar': [results]
 
     auto_lookups = [] # we add to this as we go through.
     followed_descriptors = set() # recursion protection
 
-    all_lookups = itertools.chain(related_lookups, auto_lookups)
+    all_lookups = itertools.chain(normalize_prefetch_lookups(related_lookups),
+                                  auto_lookups)
     for lookup in all_lookups:
         if lookup in done_lookups:
             # We've done exactly this already, skip the whole thing
+            if lookup.queryset is not None:
+                raise ValueError("'%s' lookup was already seen with a different "
+                                 "queryset. You may need to adjust the ordering "
+                                 "of your lookups." % lookup.prefetch_to)
             continue
         done_lookups.add(lookup)
 
@@ -1647,7 +1824,7 @@ def prefetch_related_objects(result_cache, related_lookups):
         # from the primary QuerySet. It won't be for deeper levels.
         obj_list = result_cache
 
-        attrs = lookup.split(LOOKUP_SEP)
+        attrs = lookup.prefetch_through.split(LOOKUP_SEP)
         for level, attr in enumerate(attrs):
             # Prepare main instances
             if len(obj_list) == 0:
@@ -1681,7 +1858,8 @@ def prefetch_related_objects(result_cache, related_lookups):
             if not attr_found:
                 raise AttributeError("Cannot find '%s' on %s object, '%s' is an invalid "
                                      "parameter to prefetch_related()" %
-                                     (attr, first_obj.__class__.__name__, lookup))
+                                     (attr, first_obj.__class__.__name__,
+                                      lookup.prefetch_through))
 
             if level == len(attrs) - 1 and prefetcher is None:
                 # Last one, this *must* resolve to something that supports
@@ -1689,24 +1867,24 @@ def prefetch_related_objects(result_cache, related_lookups):
                 # developer asking for it has made a mistake.
                 raise ValueError("'%s' does not resolve to a item that supports "
                                  "prefetching - this is an invalid parameter to "
-                                 "prefetch_related()." % lookup)
+                                 "prefetch_related()." % lookup.prefetch_through)
 
             if prefetcher is not None and not is_fetched:
                 # Check we didn't do this already
-                current_lookup = LOOKUP_SEP.join(attrs[0:level+1])
+                current_lookup = lookup.get_current_prefetch_to(level)
                 if current_lookup in done_queries:
                     obj_list = done_queries[current_lookup]
                 else:
-                    obj_list, additional_prl = prefetch_one_level(obj_list, prefetcher, attr)
+                    obj_list, additional_prl = prefetch_one_level(obj_list,
+                        prefetcher, lookup, level)
                     # We need to ensure we don't keep adding lookups from the
                     # same relationships to stop infinite recursion. So, if we
                     # are already on an automatically added lookup, don't add
                     # the new lookups from relationships we've seen already.
                     if not (lookup in auto_lookups and
                             descriptor in followed_descriptors):
-                        for f in additional_prl:
-                            new_prl = LOOKUP_SEP.join([current_lookup, f])
-                            auto_lookups.append(new_prl)
+                        auto_lookups.extend(
+                            normalize_prefetch_lookups(additional_prl, current_lookup))
                         done_queries[current_lookup] = obj_list
                     followed_descriptors.add(descriptor)
             else:
@@ -1725,7 +1903,11 @@ def prefetch_related_objects(result_cache, related_lookups):
                         continue
                     if new_obj is None:
                         continue
-                    new_obj_list.append(new_obj)
+                    # Objects prefetched with a to_attr are stored in lists.
+                    if isinstance(new_obj, list):
+                        new_obj_list.extend(new_obj)
+                    else:
+                        new_obj_list.append(new_obj)
                 obj_list = new_obj_list
 
 
@@ -1772,7 +1954,30 @@ def get_prefetcher(instance, attr):
     return prefetcher, rel_obj_descriptor, attr_found, is_fetched
 
 
-def prefetch_one_level(instances, prefetcher, attname):
+def get_prefetch_batch_size(connection, queryset=None):
+    """
+    Returns the maximum number of instances whose related objects can be
+    retrieved by a single prefetch query on ``connection``, or None if there
+    is no limit. ``queryset`` is the custom queryset of the lookup, if any.
+    """
+    limits = [connection.ops.max_in_list_size()]
+    max_params = connection.ops.max_query_params()
+    if max_params:
+        reserved = 0
+        if queryset is not None:
+            try:
+                reserved = len(queryset.query.get_compiler(
+                    connection=connection).as_sql()[1])
+            except EmptyResultSet:
+                pass
+        # Leave some room for the parameters added by the prefetcher or the
+        # default manager of the related model.
+        limits.append(max(max_params - reserved - PREFETCH_PARAMS_MARGIN, 1))
+    limits = [limit for limit in limits if limit]
+    return min(limits) if limits else None
+
+
+def prefetch_one_level(instances, prefetcher, lookup, level):
     """
     Helper function for prefetch_related_objects
 
@@ -1784,7 +1989,7 @@ def prefetch_one_level(instances, prefetcher, attname):
     found from default managers.
     """
     # prefetcher must have a method get_prefetch_query_set() which takes a list
-    # of instances, and returns a tuple:
+    # of instances and an optional custom queryset, and returns a tuple:
 
     # (queryset of instances of self.model that are related to passed in instances,
     #  callable that gets value to be matched for returned instances,
@@ -1795,20 +2000,44 @@ def prefetch_one_level(instances, prefetcher, attname):
     # The 'values to be matched' must be hashable as they will be used
     # in a dictionary.
 
-    rel_qs, rel_obj_attr, instance_attr, single, cache_name =\
-        prefetcher.get_prefetch_query_set(instances)
-    # We have to handle the possibility that the default manager itself added
-    # prefetch_related lookups to the QuerySet we just got back. We don't want to
-    # trigger the prefetch_related functionality by evaluating the query.
-    # Rather, we need to merge in the prefetch_related lookups.
-    additional_prl = getattr(rel_qs, '_prefetch_related_lookups', [])
-    if additional_prl:
-        # Don't need to clone because the manager should have given us a fresh
-        # instance, so we access an internal instead of using public interface
-        # for performance reasons.
-        rel_qs._prefetch_related_lookups = []
-
-    all_related_objects = list(rel_qs)
+    attname = lookup.prefetch_through.split(LOOKUP_SEP)[level]
+    to_attr, as_attr = lookup.get_current_to_attr(level)
+    queryset = lookup.get_current_queryset(level)
+    if queryset is not None:
+        # Don't let the custom queryset evaluate itself.
+        queryset = queryset._clone()
+        if queryset._db is None:
+            queryset = queryset.using(
+                router.db_for_read(queryset.model, instance=instances[0]))
+        batch_size = get_prefetch_batch_size(connections[queryset.db], queryset)
+    else:
+        batch_size = get_prefetch_batch_size(connections[
+            router.db_for_read(instances[0].__class__, instance=instances[0])])
+    if not batch_size:
+        batch_size = len(instances)
+
+    # Backends limit the size of the "IN" list used to retrieve the related
+    # objects, so instances are handled in batches.
+    all_related_objects = []
+    additional_prl = []
+    for start in range(0, len(instances), batch_size):
+        rel_qs, rel_obj_attr, instance_attr, single, cache_name =\
+            prefetcher.get_prefetch_query_set(instances[start:start + batch_size],
+                                              queryset)
+        # We have to handle the possibility that the default manager itself
+        # added prefetch_related lookups to the QuerySet we just got back. We
+        # don't want to trigger the prefetch_related functionality by
+        # evaluating the query. Rather, we need to merge in the
+        # prefetch_related lookups.
+        batch_prl = getattr(rel_qs, '_prefetch_related_lookups', [])
+        if batch_prl:
+            # Don't need to clone because the manager should have given us a
+            # fresh instance, so we access an internal instead of using public
+            # interface for performance reasons.
+            rel_qs._prefetch_related_lookups = []
+            if not start:
+                additional_prl = batch_prl
+        all_related_objects.extend(rel_qs)
 
     rel_obj_cache = {}
     for rel_obj in all_related_objects:
@@ -1820,7 +2049,10 @@ def prefetch_one_level(instances, prefetcher, attname):
         vals = rel_obj_cache.get(instance_attr_val, [])
         if single:
             # Need to assign to single cache on instance
-            setattr(obj, cache_name, vals[0] if vals else None)
+            setattr(obj, to_attr if as_attr else cache_name,
+                    vals[0] if vals else None)
+        elif as_attr:
+            setattr(obj, to_attr, vals)
         else:
             # Multi, attribute represents a manager with an .all() method that
             # returns a QuerySet
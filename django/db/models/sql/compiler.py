@@ -10,6 +10,7 @@ from django.db.models.sql.constants import (SINGLE, MULTI, ORDER_DIR,
 from django.db.models.sql.datastructures import EmptyResultSet
 from django.db.models.sql.expressions import SQLEvaluator
 from django.db.models.sql.query import get_order_dir, Query
+from django.db.models.sql.sqlcache import get_sql_cache
 from django.db.utils import DatabaseError
 from django.utils import six
 
@@ -65,6 +66,16 @@ class SQLCompiler(object):
             return '', ()
 
         self.pre_sql_setup()
+        sql_cache = get_sql_cache(self.connection)
+        if sql_cache is not None:
+            return sql_cache.compile(self, with_limits, with_col_aliases)
+        return self.compile_sql(with_limits, with_col_aliases)
+
+    def compile_sql(self, with_limits=True, with_col_aliases=False):
+        """
+        Assembles the SQL for this query, once pre_sql_setup() has run.
+        Returns the SQL string and list of parameters.
+        """
         # After executing the query, we must get rid of any joins the query
         # setup created. So, take note of alias counts before the query ran.
         # However we do not want to get rid of stuff done in pre_sql_setup(),
@@ -755,9 +766,11 @@ class SQLCompiler(object):
         self.query.deferred_to_data(columns, self.query.deferred_to_columns_cb)
         return columns
 
-    def results_iter(self):
+    def results_iter(self, chunk_size=None):
         """
-        Returns an iterator over the results from executing this query.
+        Returns an iterator over the results from executing this query. If
+        chunk_size is given, rows are streamed from the database that many at
+        a time (see execute_sql()).
         """
         resolve_columns = hasattr(self, 'resolve_columns')
         fields = None
@@ -767,7 +780,7 @@ class SQLCompiler(object):
         # are released.
         if self.query.select_for_update and transaction.is_managed(self.using):
             transaction.set_dirty(self.using)
-        for rows in self.execute_sql(MULTI):
+        for rows in self.execute_sql(MULTI, chunk_size=chunk_size):
             for row in rows:
                 if resolve_columns:
                     if fields is None:
@@ -798,7 +811,7 @@ class SQLCompiler(object):
 
                 yield row
 
-    def execute_sql(self, result_type=MULTI):
+    def execute_sql(self, result_type=MULTI, chunk_size=None):
         """
         Run the query against the database and returns the result(s). The
         return value is a single data item if result_type is SINGLE, or an
@@ -810,6 +823,10 @@ class SQLCompiler(object):
         subclasses such as InsertQuery). It's possible, however, that no query
         is needed, as the filters describe an empty set. In that case, None is
         returned, to avoid any unnecessary database interaction.
+
+        If chunk_size is given with MULTI, the query runs on the connection's
+        chunked_cursor() and rows are fetched chunk_size at a time, so that
+        the database driver doesn't hold the whole result set in memory.
         """
         try:
             sql, params = self.as_sql()
@@ -821,7 +838,12 @@ class SQLCompiler(object):
             else:
                 return
 
-        cursor = self.connection.cursor()
+        chunked_fetch = bool(chunk_size) and result_type == MULTI
+        if chunked_fetch:
+            cursor = self.connection.chunked_cursor()
+        else:
+            cursor = self.connection.cursor()
+            chunk_size = GET_ITERATOR_CHUNK_SIZE
         cursor.execute(sql, params)
 
         if not result_type:
@@ -834,15 +856,18 @@ class SQLCompiler(object):
         # The MULTI case.
         if self.query.ordering_aliases:
             result = order_modified_iter(cursor, len(self.query.ordering_aliases),
-                    self.connection.features.empty_fetchmany_value)
+                    self.connection.features.empty_fetchmany_value, chunk_size)
         else:
-            result = iter((lambda: cursor.fetchmany(GET_ITERATOR_CHUNK_SIZE)),
+            result = iter((lambda: cursor.fetchmany(chunk_size)),
                     self.connection.features.empty_fetchmany_value)
         if not self.connection.features.can_use_chunked_reads:
             # If we are using non-chunked reads, we return the same data
             # structure as normally, but ensure it is all read into memory
             # before going any further.
             return list(result)
+        if chunked_fetch:
+            # Release server-side cursors as soon as all rows have been read.
+            return closing_iter(cursor, result)
         return result
 
 
@@ -1075,7 +1100,7 @@ class SQLAggregateCompiler(SQLCompiler):
         return (sql, params)
 
 class SQLDateCompiler(SQLCompiler):
-    def results_iter(self):
+    def results_iter(self, chunk_size=None):
         """
         Returns an iterator over the results from executing this query.
         """
@@ -1088,7 +1113,7 @@ class SQLDateCompiler(SQLCompiler):
             needs_string_cast = self.connection.features.needs_datetime_string_cast
 
         offset = len(self.query.extra_select)
-        for rows in self.execute_sql(MULTI):
+        for rows in self.execute_sql(MULTI, chunk_size=chunk_size):
             for row in rows:
                 date = row[offset]
                 if resolve_columns:
@@ -1098,13 +1123,25 @@ class SQLDateCompiler(SQLCompiler):
                 yield date
 
 
-def order_modified_iter(cursor, trim, sentinel):
+def order_modified_iter(cursor, trim, sentinel, chunk_size=GET_ITERATOR_CHUNK_SIZE):
     """
     Yields blocks of rows from a cursor. We use this iterator in the special
     case when extra output columns have been added to support ordering
     requirements. We must trim those extra columns before anything else can use
     the results, since they're only needed to make the SQL valid.
     """
-    for rows in iter((lambda: cursor.fetchmany(GET_ITERATOR_CHUNK_SIZE)),
+    for rows in iter((lambda: cursor.fetchmany(chunk_size)),
             sentinel):
         yield [r[:-trim] for r in rows]
+
+
+def closing_iter(cursor, blocks):
+    """
+    Yields the blocks of rows read from a cursor, closing the cursor once
+    they're exhausted or the iteration is abandoned.
+    """
+    try:
+        for rows in blocks:
+            yield rows
+    finally:
+        cursor.close()
@@ -105,3 +105,41 @@ class SQLEvaluator(object):
             return sql, params
 
         return connection.ops.date_interval_sql(sql, node.connector, timedelta), params
+
+
+class CaseByPk(object):
+    """
+    An update value that differs for each row: it compiles to
+    ``CASE pk WHEN <pk1> THEN <value1> ... ELSE column END`` so that a
+    single UPDATE can set a field to per-object values. Used by
+    QuerySet.bulk_update().
+    """
+    def __init__(self, field, cases):
+        self.field = field
+        # A list of (primary key, value) pairs.
+        self.cases = cases
+
+    def prepare_database_save(self, field):
+        return self
+
+    def as_sql(self, qn, connection):
+        field = self.field
+        pk = field.model._meta.pk
+        whens, params = [], []
+        for pk_value, value in self.cases:
+            params.append(pk.get_db_prep_save(pk_value, connection=connection))
+            value = field.get_db_prep_save(value, connection=connection)
+            if value is None:
+                whens.append('WHEN %s THEN NULL')
+                continue
+            if hasattr(field, 'get_placeholder'):
+                placeholder = field.get_placeholder(value, connection)
+            else:
+                placeholder = '%s'
+            whens.append('WHEN %%s THEN %s' % placeholder)
+            params.append(value)
+        sql = 'CASE %s %s ELSE %s END' % (
+            qn(pk.column), ' '.join(whens), qn(field.column))
+        if connection.features.requires_casted_case_in_updates:
+            sql = 'CAST(%s AS %s)' % (sql, field.db_type(connection))
+        return sql, params
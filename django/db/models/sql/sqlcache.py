@@ -0,0 +1,211 @@
+"""
+A cache of compiled SQL for queries of the same shape.
+
+Queries built by the same code path, such as
+``Task.objects.filter(project=p, done=False)``, differ only in their
+parameters. Once such a query has been compiled, its SQL is stored under a
+key describing the structure of the query (tables, joins, selected columns,
+the shape of the where-tree, ordering, limits...), and later queries with the
+same structure reuse it. Their parameters are extracted directly from the
+where-tree, without assembling the SQL again.
+
+The cache is opt-in, per database, through the ``SQL_CACHE_SIZE`` key of the
+:setting:`DATABASES` setting.
+"""
+from __future__ import absolute_import
+
+import threading
+
+from django.db.models.sql.aggregates import Aggregate
+from django.db.models.sql.where import (Constraint, EmptyShortCircuit,
+    EverythingNode, ExtraWhere, NothingNode, WhereNode)
+from django.utils.datastructures import LRUDict
+from django.utils import six
+
+
+class Uncacheable(Exception):
+    """
+    Raised when the SQL of a query can't be reused for other parameters.
+    """
+    pass
+
+
+def _freeze(value):
+    """
+    Turns the (possibly nested) dictionaries used by select_related() and
+    similar query attributes into hashable values.
+    """
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in six.iteritems(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def _where_shape(node, connection, params):
+    """
+    Returns a hashable description of a where-tree node, and adds the
+    parameters of its leaves to ``params`` in the order used by
+    WhereNode.as_sql().
+    """
+    children = []
+    for child in node.children:
+        if isinstance(child, WhereNode):
+            children.append(_where_shape(child, connection, params))
+        elif isinstance(child, (EverythingNode, NothingNode)):
+            children.append(child.__class__)
+        elif isinstance(child, ExtraWhere):
+            children.append((ExtraWhere, tuple(child.sqls)))
+            params.extend(child.params or ())
+        elif isinstance(child, (list, tuple)):
+            lvalue, lookup_type, value_annotation, value = child
+            if isinstance(lvalue, Aggregate) or not isinstance(lvalue, Constraint):
+                raise Uncacheable
+            try:
+                column, leaf_params = lvalue.process(lookup_type, value, connection)
+            except EmptyShortCircuit:
+                raise Uncacheable
+            if hasattr(leaf_params, 'as_sql'):
+                # Subqueries and expressions render their own SQL.
+                raise Uncacheable
+            leaf_params = list(leaf_params)
+            # The SQL of a leaf depends on the number of parameters (for "in"
+            # lookups), on the annotation (for "isnull" and datetimes) and on
+            # empty strings when the backend treats them as NULL.
+            children.append((column, lookup_type, value_annotation,
+                             len(leaf_params), leaf_params == ['']))
+            params.extend(leaf_params)
+        else:
+            raise Uncacheable
+    return (node.connector, node.negated, tuple(children))
+
+
+def query_shape(compiler, with_limits, with_col_aliases):
+    """
+    Returns a (key, params) pair for the query of ``compiler``, whose
+    pre_sql_setup() must already have run. ``key`` identifies every query
+    compiling to the same SQL, and ``params`` are the parameters of this
+    one. Raises Uncacheable if the query's SQL depends on more than its
+    structure.
+    """
+    query = compiler.query
+    if query.aggregates or query.having.children:
+        raise Uncacheable
+    for col in list(query.select) + list(query.group_by or []):
+        if not isinstance(col, (list, tuple)):
+            raise Uncacheable
+    for col in query.order_by:
+        if not isinstance(col, six.string_types):
+            raise Uncacheable
+
+    params = []
+    for sql, extra_params in six.itervalues(query.extra_select):
+        params.extend(extra_params)
+    where = _where_shape(query.where, compiler.connection, params)
+    key = (
+        compiler.__class__, query.__class__, query.model,
+        tuple((alias, query.alias_map.get(alias), query.alias_refcount.get(alias))
+              for alias in query.tables),
+        _freeze(query.select), query.default_cols,
+        _freeze(query.deferred_loading),
+        _freeze(query.included_inherited_models),
+        tuple(query.related_select_cols),
+        _freeze(query.select_related), query.max_depth,
+        tuple((alias, sql) for alias, (sql, extra_params)
+              in six.iteritems(query.extra_select)),
+        tuple(query.extra_tables), tuple(query.extra_order_by),
+        tuple(query.order_by), query.default_ordering,
+        query.standard_ordering,
+        query.distinct, tuple(query.distinct_fields),
+        _freeze(query.group_by),
+        where,
+        with_limits and (query.low_mark, query.high_mark),
+        with_col_aliases,
+        query.select_for_update, query.select_for_update_nowait,
+    )
+    return key, params
+
+
+class CompiledSQLCache(object):
+    """
+    A bounded, thread-safe LRU mapping query shapes to their compiled SQL.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = LRUDict(max_size)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.uncacheable = 0
+
+    def compile(self, compiler, with_limits, with_col_aliases):
+        """
+        Returns the SQL and parameters for the query of ``compiler``, from
+        the cache if a query of the same shape was compiled before.
+        """
+        try:
+            key, params = query_shape(compiler, with_limits, with_col_aliases)
+        except Uncacheable:
+            with self._lock:
+                self.uncacheable += 1
+            return compiler.compile_sql(with_limits, with_col_aliases)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is not None:
+            sql, ordering_aliases = entry
+            compiler.query.ordering_aliases = list(ordering_aliases)
+            return sql, tuple(params)
+
+        sql, compiled_params = compiler.compile_sql(with_limits, with_col_aliases)
+        # Only store the SQL if the parameters extracted from the where-tree
+        # are those of the compiled query, e.g. no clause was short-circuited.
+        if sql and tuple(params) == tuple(compiled_params):
+            with self._lock:
+                self._entries[key] = (sql, list(compiler.query.ordering_aliases))
+        return sql, compiled_params
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'uncacheable': self.uncacheable,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.uncacheable = 0
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_sql_cache(connection):
+    """
+    Returns the compiled SQL cache shared by all the connections of the same
+    alias as ``connection``, or None if it isn't enabled.
+    """
+    max_size = connection.settings_dict.get('SQL_CACHE_SIZE')
+    if not max_size:
+        return None
+    try:
+        return _caches[connection.alias]
+    except KeyError:
+        with _caches_lock:
+            if connection.alias not in _caches:
+                _caches[connection.alias] = CompiledSQLCache(max_size)
+            return _caches[connection.alias]
+
+def clear_sql_caches():
+    """
+    Forgets every compiled SQL cache.
+    """
+    with _caches_lock:
+        _caches.clear()
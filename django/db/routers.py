@@ -0,0 +1,211 @@
+"""
+Built-in database routers.
+
+``PrimaryReplicaRouter`` sends writes to a primary database and spreads reads
+across its replicas, e.g.::
+
+    DATABASES = {
+        'default': {...},
+        'replica1': {..., 'REPLICA_OF': 'default'},
+        'replica2': {..., 'REPLICA_OF': 'default', 'REPLICA_WEIGHT': 2},
+    }
+    DATABASE_ROUTERS = ['django.db.routers.PrimaryReplicaRouter']
+"""
+from __future__ import unicode_literals
+
+import bisect
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core import signals
+from django.db import connections, DatabaseError, DEFAULT_DB_ALIAS
+
+
+class PrimaryReplicaRouter(object):
+    """
+    Routes writes to the ``primary`` database and reads to its replicas.
+
+    ``replicas`` maps the aliases of the replicas to their weight: a replica
+    of weight 2 receives twice as many reads as a replica of weight 1. A list
+    of aliases gives them the same weight. By default, the replicas are the
+    databases whose ``REPLICA_OF`` setting is the primary, weighted by their
+    ``REPLICA_WEIGHT`` setting (1 by default).
+
+    Once a thread has been routed a write, its reads go to the primary until
+    the end of the current request, so that a request always reads its own
+    writes.
+
+    Every ``check_interval`` seconds, replicas are probed. Those that can't
+    be reached, or lag behind the primary by more than ``max_lag`` seconds
+    (when the backend can tell), stop receiving reads until they pass a later
+    probe. When no replica is available, reads go to the primary.
+    """
+    max_lag = None
+    check_interval = 30
+
+    def __init__(self, primary=DEFAULT_DB_ALIAS, replicas=None, max_lag=None,
+                 check_interval=None):
+        self.primary = primary
+        if replicas is None:
+            replicas = dict(
+                (alias, settings_dict.get('REPLICA_WEIGHT', 1))
+                for alias, settings_dict in settings.DATABASES.items()
+                if settings_dict.get('REPLICA_OF') == primary)
+        elif not isinstance(replicas, dict):
+            replicas = dict((alias, 1) for alias in replicas)
+        self.replicas = replicas
+        if max_lag is not None:
+            self.max_lag = max_lag
+        if check_interval is not None:
+            self.check_interval = check_interval
+        self.random = random.Random()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._next_check = 0
+        self._stats = dict((alias, self._initial_stats(alias))
+                           for alias in [primary] + list(replicas))
+        self._update_choices()
+        signals.request_started.connect(self._request_started)
+        signals.request_finished.connect(self._request_finished)
+
+    def _initial_stats(self, alias):
+        return {
+            'reads': 0,
+            'writes': 0,
+            'healthy': True,
+            'lag': None,
+            'ejections': 0,
+        }
+
+    def _update_choices(self):
+        """
+        Computes the cumulative weights of the healthy replicas.
+        """
+        aliases, totals, total = [], [], 0
+        for alias, weight in sorted(self.replicas.items()):
+            if weight > 0 and self._stats[alias]['healthy']:
+                total += weight
+                aliases.append(alias)
+                totals.append(total)
+        self._choices = (aliases, totals, total)
+
+    def _request_started(self, **kwargs):
+        self.unpin()
+
+    def _request_finished(self, **kwargs):
+        self.unpin()
+
+    def pin(self):
+        """
+        Sends the reads of the current thread to the primary.
+        """
+        self._local.pinned = True
+
+    def unpin(self):
+        """
+        Lets the reads of the current thread go to the replicas again.
+        """
+        self._local.pinned = False
+
+    def is_pinned(self):
+        return getattr(self._local, 'pinned', False)
+
+    def probe(self, alias):
+        """
+        Returns the replication lag of the database ``alias`` in seconds, or
+        None if it's unknown. Raises an exception if the database can't be
+        used.
+        """
+        connection = connections[alias]
+        connection.cursor()
+        if not connection.is_usable():
+            raise DatabaseError("The connection to '%s' isn't usable." % alias)
+        return connection.ops.replication_lag()
+
+    def check_replicas(self):
+        """
+        Probes every replica and updates the set of replicas receiving reads.
+        """
+        results = {}
+        for alias in self.replicas:
+            try:
+                lag = self.probe(alias)
+            except Exception:
+                # Let the next request reconnect from scratch.
+                try:
+                    connections[alias].close()
+                except Exception:
+                    pass
+                results[alias] = (False, None)
+            else:
+                healthy = self.max_lag is None or lag is None or lag <= self.max_lag
+                results[alias] = (healthy, lag)
+        with self._lock:
+            for alias, (healthy, lag) in results.items():
+                stats = self._stats[alias]
+                if stats['healthy'] and not healthy:
+                    stats['ejections'] += 1
+                stats['healthy'] = healthy
+                stats['lag'] = lag
+            self._update_choices()
+            self._next_check = time.time() + self.check_interval
+
+    def _maybe_check_replicas(self):
+        if time.time() < self._next_check:
+            return
+        # Only one thread probes the replicas; the others carry on with the
+        # current state.
+        if not self._check_lock.acquire(False):
+            return
+        try:
+            if time.time() >= self._next_check:
+                self.check_replicas()
+        finally:
+            self._check_lock.release()
+
+    def db_for_read(self, model, **hints):
+        if self.replicas and not self.is_pinned():
+            self._maybe_check_replicas()
+        aliases, totals, total = self._choices
+        if not aliases or self.is_pinned():
+            alias = self.primary
+        else:
+            index = bisect.bisect_right(totals, self.random.random() * total)
+            alias = aliases[min(index, len(aliases) - 1)]
+        with self._lock:
+            self._stats[alias]['reads'] += 1
+        return alias
+
+    def db_for_write(self, model, **hints):
+        self.pin()
+        with self._lock:
+            self._stats[self.primary]['writes'] += 1
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._state.db in self._stats and obj2._state.db in self._stats:
+            return True
+        return None
+
+    def allow_syncdb(self, db, model):
+        if db in self.replicas:
+            return False
+        return None
+
+    def stats(self):
+        """
+        Returns a dictionary mapping the alias of the primary and of every
+        replica to counters of the reads and writes routed to it, along with
+        its health, last measured replication lag and number of ejections.
+        """
+        with self._lock:
+            return dict((alias, dict(stats))
+                        for alias, stats in self._stats.items())
+
+    def reset_stats(self):
+        with self._lock:
+            for stats in self._stats.values():
+                stats['reads'] = stats['writes'] = stats['ejections'] = 0
@@ -75,6 +75,8 @@ class ConnectionHandler(object):
             conn.setdefault(setting, '')
         for setting in ['TEST_CHARSET', 'TEST_COLLATION', 'TEST_NAME', 'TEST_MIRROR']:
             conn.setdefault(setting, None)
+        conn.setdefault('POOL', None)
+        conn.setdefault('SQL_CACHE_SIZE', 0)
 
     def __getitem__(self, alias):
         if hasattr(self._connections, alias):
@@ -11,6 +11,9 @@ def _make_id(target):
         return (id(target.__self__), id(target.__func__))
     return id(target)
 
+# Cached when no receiver is connected to a sender.
+NO_RECEIVERS = object()
+
 class Signal(object):
     """
     Base class for all signals
@@ -19,20 +22,32 @@ class Signal(object):
 
         receivers
             { receriverkey (id) : weakref(receiver) }
+
+        sender_receivers_cache
+            { senderkey (id) : [weakref(receiver), ...] or NO_RECEIVERS }
     """
 
-    def __init__(self, providing_args=None):
+    def __init__(self, providing_args=None, use_caching=False):
         """
         Create a new signal.
 
         providing_args
             A list of the arguments this signal can pass along in a send() call.
+
+        use_caching
+            Whether to remember the receivers connected to each sender until
+            a receiver is connected, disconnected or garbage collected. This
+            makes sending the signal cheaper, especially from senders without
+            receivers, and suits signals sent by a limited set of senders,
+            such as model classes.
         """
         self.receivers = []
         if providing_args is None:
             providing_args = []
         self.providing_args = set(providing_args)
         self.lock = threading.Lock()
+        self.use_caching = use_caching
+        self.sender_receivers_cache = {}
 
     def connect(self, receiver, sender=None, weak=True, dispatch_uid=None):
         """
@@ -106,6 +121,7 @@ class Signal(object):
                     break
             else:
                 self.receivers.append((lookup_key, receiver))
+            self._clear_cache()
 
     def disconnect(self, receiver=None, sender=None, weak=True, dispatch_uid=None):
         """
@@ -140,6 +156,7 @@ class Signal(object):
                 if r_key == lookup_key:
                     del self.receivers[index]
                     break
+            self._clear_cache()
 
     def has_listeners(self, sender=None):
         return bool(self._live_receivers(_make_id(sender)))
@@ -165,6 +182,9 @@ class Signal(object):
         responses = []
         if not self.receivers:
             return responses
+        if (self.use_caching and
+                self.sender_receivers_cache.get(_make_id(sender)) is NO_RECEIVERS):
+            return responses
 
         for receiver in self._live_receivers(_make_id(sender)):
             response = receiver(signal=self, sender=sender, **named)
@@ -197,6 +217,9 @@ class Signal(object):
         responses = []
         if not self.receivers:
             return responses
+        if (self.use_caching and
+                self.sender_receivers_cache.get(_make_id(sender)) is NO_RECEIVERS):
+            return responses
 
         # Call each receiver with whatever arguments it can accept.
         # Return a list of tuple pairs [(receiver, response), ... ].
@@ -209,6 +232,14 @@ class Signal(object):
                 responses.append((receiver, response))
         return responses
 
+    def _clear_cache(self):
+        """
+        Forget the receivers cached for each sender.
+        """
+        # A new dictionary is used, so that receivers looked up concurrently
+        # from the former list of receivers are stored in the former cache.
+        self.sender_receivers_cache = {}
+
     def _live_receivers(self, senderkey):
         """
         Filter sequence of receivers to get resolved, live receivers.
@@ -216,19 +247,30 @@ class Signal(object):
         This checks for weak references and resolves them, then returning only
         live receivers.
         """
-        none_senderkey = _make_id(None)
-        receivers = []
-
-        for (receiverkey, r_senderkey), receiver in self.receivers:
-            if r_senderkey == none_senderkey or r_senderkey == senderkey:
-                if isinstance(receiver, WEAKREF_TYPES):
-                    # Dereference the weak reference.
-                    receiver = receiver()
-                    if receiver is not None:
-                        receivers.append(receiver)
-                else:
-                    receivers.append(receiver)
-        return receivers
+        receivers = None
+        if self.use_caching:
+            cache = self.sender_receivers_cache
+            receivers = cache.get(senderkey)
+            if receivers is NO_RECEIVERS:
+                return []
+        if receivers is None:
+            none_senderkey = _make_id(None)
+            receivers = [receiver
+                for (receiverkey, r_senderkey), receiver in self.receivers
+                if r_senderkey == none_senderkey or r_senderkey == senderkey]
+            if self.use_caching:
+                cache[senderkey] = receivers or NO_RECEIVERS
+
+        live_receivers = []
+        for receiver in receivers:
+            if isinstance(receiver, WEAKREF_TYPES):
+                # Dereference the weak reference.
+                receiver = receiver()
+                if receiver is not None:
+                    live_receivers.append(receiver)
+            else:
+                live_receivers.append(receiver)
+        return live_receivers
 
     def _remove_receiver(self, receiver):
         """
@@ -247,6 +289,7 @@ class Signal(object):
                 for idx, (r_key, _) in enumerate(reversed(self.receivers)):
                     if r_key == key:
                         del self.receivers[last_idx-idx]
+            self._clear_cache()
 
 
 def receiver(signal, **kwargs):
@@ -26,12 +26,18 @@ def conditional_content_removal(request, response):
     responses. Ensures compliance with RFC 2616, section 4.3.
     """
     if 100 <= response.status_code < 200 or response.status_code in (204, 304):
-       response.content = ''
-       response['Content-Length'] = 0
+        _remove_content(response)
+        response['Content-Length'] = 0
     if request.method == 'HEAD':
-        response.content = ''
+        _remove_content(response)
     return response
 
+def _remove_content(response):
+    if response.streaming:
+        response.streaming_content = []
+    else:
+        response.content = ''
+
 def fix_IE_for_attach(request, response):
     """
     This function will prevent Django from serving a Content-Disposition header
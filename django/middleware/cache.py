@@ -46,8 +46,21 @@ More details about how the caching works:
 * This middleware also sets ETag, Last-Modified, Expires and Cache-Control
   headers on the response object.
 
+* If CACHE_MIDDLEWARE_STALE_SECONDS is set, pages are kept that many seconds
+  after they expire. The first request for an expired page takes a lock in the
+  cache, for at most CACHE_MIDDLEWARE_LOCK_SECONDS, and regenerates it, while
+  the other requests get the expired page until it's replaced.
+
+* If CACHE_MIDDLEWARE_EARLY_REFRESH is set, pages are regenerated before they
+  expire with a probability increasing as their expiry time approaches, and
+  with the time they took to generate, multiplied by that setting.
+
 """
 
+import math
+import random
+import time
+
 from django.conf import settings
 from django.core.cache import get_cache, DEFAULT_CACHE_ALIAS
 from django.utils.cache import get_cache_key, learn_cache_key, patch_response_headers, get_max_age
@@ -68,6 +81,9 @@ class UpdateCacheMiddleware(object):
         self.cache_anonymous_only = getattr(settings, 'CACHE_MIDDLEWARE_ANONYMOUS_ONLY', False)
         self.cache_alias = settings.CACHE_MIDDLEWARE_ALIAS
         self.cache = get_cache(self.cache_alias)
+        self.stale_seconds = settings.CACHE_MIDDLEWARE_STALE_SECONDS
+        self.lock_seconds = settings.CACHE_MIDDLEWARE_LOCK_SECONDS
+        self.early_refresh = settings.CACHE_MIDDLEWARE_EARLY_REFRESH
 
     def _session_accessed(self, request):
         try:
@@ -95,6 +111,9 @@ class UpdateCacheMiddleware(object):
             return response
         if not response.status_code == 200:
             return response
+        if response.streaming:
+            # Caching the response would consume its content.
+            return response
         # Try to get the timeout from the "max-age" section of the "Cache-
         # Control" header before reverting to using the default cache_timeout
         # length.
@@ -106,15 +125,28 @@ class UpdateCacheMiddleware(object):
             return response
         patch_response_headers(response, timeout)
         if timeout:
-            cache_key = learn_cache_key(request, response, timeout, self.key_prefix, cache=self.cache)
+            # Expired pages are kept for stale_seconds, as well as the list
+            # of headers to build their cache key from.
+            cache_key = learn_cache_key(request, response, timeout + self.stale_seconds,
+                                        self.key_prefix, cache=self.cache)
             if hasattr(response, 'render') and callable(response.render):
                 response.add_post_render_callback(
-                    lambda r: self.cache.set(cache_key, r, timeout)
+                    lambda r: self._cache_response(request, r, cache_key, timeout)
                 )
             else:
-                self.cache.set(cache_key, response, timeout)
+                self._cache_response(request, response, cache_key, timeout)
         return response
 
+    def _cache_response(self, request, response, cache_key, timeout):
+        now = time.time()
+        response._cache_expires = now + timeout
+        started = getattr(request, '_cache_regeneration_started', None)
+        response._cache_regeneration_time = now - started if started else 0
+        self.cache.set(cache_key, response, timeout + self.stale_seconds)
+        lock_key = getattr(request, '_cache_lock_key', None)
+        if lock_key is not None:
+            self.cache.delete(lock_key)
+
 class FetchFromCacheMiddleware(object):
     """
     Request-phase cache middleware that fetches a page from the cache.
@@ -129,6 +161,9 @@ class FetchFromCacheMiddleware(object):
         self.cache_anonymous_only = getattr(settings, 'CACHE_MIDDLEWARE_ANONYMOUS_ONLY', False)
         self.cache_alias = settings.CACHE_MIDDLEWARE_ALIAS
         self.cache = get_cache(self.cache_alias)
+        self.stale_seconds = settings.CACHE_MIDDLEWARE_STALE_SECONDS
+        self.lock_seconds = settings.CACHE_MIDDLEWARE_LOCK_SECONDS
+        self.early_refresh = settings.CACHE_MIDDLEWARE_EARLY_REFRESH
 
     def process_request(self, request):
         """
@@ -143,6 +178,7 @@ class FetchFromCacheMiddleware(object):
         cache_key = get_cache_key(request, self.key_prefix, 'GET', cache=self.cache)
         if cache_key is None:
             request._cache_update_cache = True
+            request._cache_regeneration_started = time.time()
             return None # No cache information available, need to rebuild.
         response = self.cache.get(cache_key, None)
         # if it wasn't found and we are looking for a HEAD, try looking just for that
@@ -152,12 +188,39 @@ class FetchFromCacheMiddleware(object):
 
         if response is None:
             request._cache_update_cache = True
+            request._cache_regeneration_started = time.time()
             return None # No cache information available, need to rebuild.
 
+        if self._needs_refresh(response):
+            # Only one request at a time regenerates the page. The others get
+            # the cached page until it's replaced.
+            lock_key = '%s.lock' % cache_key
+            if self.cache.add(lock_key, True, self.lock_seconds):
+                request._cache_update_cache = True
+                request._cache_regeneration_started = time.time()
+                request._cache_lock_key = lock_key
+                return None
+
         # hit, return cached response
         request._cache_update_cache = False
         return response
 
+    def _needs_refresh(self, response):
+        """
+        Returns whether a cached page has expired, or should be regenerated
+        early according to early_refresh.
+        """
+        expires = getattr(response, '_cache_expires', None)
+        if expires is None:
+            return False
+        now = time.time()
+        if self.early_refresh:
+            # -log(u) for u uniform in (0, 1] is exponentially distributed:
+            # the page is usually regenerated shortly before it expires.
+            now -= (response._cache_regeneration_time * self.early_refresh *
+                    math.log(1 - random.random()))
+        return now >= expires
+
 class CacheMiddleware(UpdateCacheMiddleware, FetchFromCacheMiddleware):
     """
     Cache middleware that provides basic behavior for many simple sites.
@@ -203,3 +266,6 @@ class CacheMiddleware(UpdateCacheMiddleware, FetchFromCacheMiddleware):
 
         self.cache = get_cache(self.cache_alias, **cache_kwargs)
         self.cache_timeout = self.cache.default_timeout
+        self.stale_seconds = settings.CACHE_MIDDLEWARE_STALE_SECONDS
+        self.lock_seconds = settings.CACHE_MIDDLEWARE_LOCK_SECONDS
+        self.early_refresh = settings.CACHE_MIDDLEWARE_EARLY_REFRESH
@@ -7,6 +7,7 @@ from inspect import getargspec
 from django.conf import settings
 from django.template.context import (Context, RequestContext,
     ContextPopException)
+from django.template.smartif import TokenBase
 from django.utils.importlib import import_module
 from django.utils.itercompat import is_iterable
 from django.utils.text import (smart_split, unescape_string_literal,
@@ -55,6 +56,9 @@ ALLOWED_VARIABLE_CHARS = ('abcdefghijklmnopqrstuvwxyz'
 # (e.g. strings)
 UNKNOWN_SOURCE = '<unknown source>'
 
+# minimum number of characters yielded at once by Template.stream()
+STREAM_CHUNK_SIZE = 8192
+
 # match a variable or block tag and capture the entire tag, including start/end
 # delimiters
 tag_re = (re.compile('(%s.*?%s|%s.*?%s|%s.*?%s)' %
@@ -124,15 +128,47 @@ class Template(object):
             origin = StringOrigin(template_string)
         self.nodelist = compile_string(template_string, origin)
         self.name = name
+        if settings.TEMPLATE_COMPILE and not settings.TEMPLATE_DEBUG:
+            self.compile()
 
     def __iter__(self):
         for node in self.nodelist:
             for subnode in node:
                 yield subnode
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if settings.TEMPLATE_COMPILE and not settings.TEMPLATE_DEBUG:
+            self.compile()
+
+    def compile(self):
+        """
+        Compiles the nodes of the template to Python functions, which render
+        them faster. See django.template.compiler.
+        """
+        from django.template.compiler import compile_nodelist
+        compile_nodelist(self.nodelist, self.name)
+
     def _render(self, context):
         return self.nodelist.render(context)
 
+    def lookup_cache_stats(self):
+        """
+        Returns the number of lookups of the template's variables which found
+        the type of the object they were looked up in in their inline cache
+        (hits), the number which didn't (misses), and the hit ratio.
+        """
+        hits = misses = 0
+        for variable in _variables(self.nodelist.get_nodes_by_type(Node)):
+            hits += variable.cache_hits
+            misses += variable.cache_misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': float(hits) / total if total else None,
+        }
+
     def render(self, context):
         "Display stage -- can be called many times"
         context.render_context.push()
@@ -141,6 +177,55 @@ class Template(object):
         finally:
             context.render_context.pop()
 
+    def stream(self, context, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Renders the template like render(), but yields the output while it's
+        rendered, in strings of at least ``chunk_size`` characters (except
+        for the last one), so that the whole output never sits in memory.
+        {% for %}, {% if %}, {% block %}, {% extends %} and {% include %}
+        stream their content; other tags are rendered whole.
+        """
+        context.render_context.push()
+        try:
+            bits = []
+            size = 0
+            for bit in self.nodelist.stream(context):
+                bits.append(bit)
+                size += len(bit)
+                if size >= chunk_size:
+                    yield ''.join(bits)
+                    bits = []
+                    size = 0
+            if bits:
+                yield ''.join(bits)
+        finally:
+            context.render_context.pop()
+
+def _variables(nodes):
+    """
+    Yields the Variables used by ``nodes``, found in the attributes of the
+    nodes, filter expressions and 'if' conditions.
+    """
+    seen = set()
+    pending = [vars(node) for node in nodes]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, Variable):
+            if obj.lookups is not None:
+                yield obj
+        elif isinstance(obj, FilterExpression):
+            pending.append(obj.var)
+            pending.extend(arg for func, args in obj.filters for _, arg in args)
+        elif isinstance(obj, TokenBase):
+            pending.extend([obj.value, obj.first, obj.second])
+        elif isinstance(obj, dict):
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple)) and not isinstance(obj, NodeList):
+            pending.extend(obj)
+
 def compile_string(template_string, origin):
     "Compiles template_string into NodeList ready for rendering"
     if settings.TEMPLATE_DEBUG:
@@ -683,6 +768,11 @@ class Variable(object):
         self.lookups = None
         self.translate = False
         self.message_context = None
+        # The inline cache of the lookups: for each bit, the type of the
+        # object it was last looked up in, and whether that type supports
+        # item access. Objects which don't are only looked up by attribute.
+        self.lookup_cache = None
+        self.cache_hits = self.cache_misses = 0
 
         try:
             # First try to treat this variable as a number.
@@ -720,6 +810,7 @@ class Variable(object):
                                               "not begin with underscores: '%s'" %
                                               var)
                 self.lookups = tuple(var.split(VARIABLE_ATTRIBUTE_SEPARATOR))
+                self.lookup_cache = [(None, True)] * len(self.lookups)
 
     def resolve(self, context):
         """Resolve this variable against a given context."""
@@ -753,22 +844,8 @@ class Variable(object):
         """
         current = context
         try:  # catch-all for silent variable failures
-            for bit in self.lookups:
-                try:  # dictionary lookup
-                    current = current[bit]
-                except (TypeError, AttributeError, KeyError):
-                    try:  # attribute lookup
-                        current = getattr(current, bit)
-                    except (TypeError, AttributeError):
-                        try:  # list-index lookup
-                            current = current[int(bit)]
-                        except (IndexError,  # list index out of range
-                                ValueError,  # invalid literal for int()
-                                KeyError,    # current is a dict without `int(bit)` key
-                                TypeError):  # unsubscriptable object
-                            raise VariableDoesNotExist("Failed lookup for key "
-                                                       "[%s] in %r",
-                                                       (bit, current))  # missing attribute
+            for index, bit in enumerate(self.lookups):
+                current = self._lookup_bit(index, bit, current)
                 if callable(current):
                     if getattr(current, 'do_not_call_in_templates', False):
                         pass
@@ -789,6 +866,49 @@ class Variable(object):
 
         return current
 
+    def _lookup_bit(self, index, bit, current):
+        """
+        Looks up the bit at position ``index`` of the variable in ``current``,
+        trying a dictionary lookup, an attribute lookup and a list-index
+        lookup in turn. The first and last are skipped when the type of
+        ``current`` doesn't support item access, which is remembered for the
+        last type seen, so that e.g. the attributes of model instances are
+        looked up without raising and catching a TypeError first.
+        """
+        cls = type(current)
+        cached_cls, subscriptable = self.lookup_cache[index]
+        if cls is cached_cls:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            subscriptable = hasattr(cls, '__getitem__')
+            self.lookup_cache[index] = (cls, subscriptable)
+        if subscriptable:
+            try:  # dictionary lookup
+                return current[bit]
+            except (TypeError, AttributeError, KeyError):
+                pass
+        try:  # attribute lookup
+            return getattr(current, bit)
+        except (TypeError, AttributeError):
+            if subscriptable:
+                try:  # list-index lookup
+                    return current[int(bit)]
+                except (IndexError,  # list index out of range
+                        ValueError,  # invalid literal for int()
+                        KeyError,    # current is a dict without `int(bit)` key
+                        TypeError):  # unsubscriptable object
+                    pass
+        raise VariableDoesNotExist("Failed lookup for key [%s] in %r",
+                                   (bit, current))  # missing attribute
+
+    def __getstate__(self):
+        # The types in the lookup cache may not be picklable.
+        state = self.__dict__.copy()
+        if self.lookups is not None:
+            state['lookup_cache'] = [(None, True)] * len(self.lookups)
+        return state
+
 class Node(object):
     # Set this to True for nodes that must be first in the template (although
     # they can be preceded by text nodes.
@@ -801,6 +921,13 @@ class Node(object):
         """
         pass
 
+    def stream(self, context):
+        """
+        Yield the node rendered as a sequence of strings. Nodes containing
+        other nodes override this to stream their content as it's rendered.
+        """
+        yield self.render(context)
+
     def __iter__(self):
         yield self
 
@@ -822,8 +949,19 @@ class NodeList(list):
     # Set to True the first time a non-TextNode is inserted by
     # extend_nodelist().
     contains_nontext = False
+    # The function rendering the node list, when it has been compiled.
+    compiled = None
+
+    def __getstate__(self):
+        # Compiled functions can't be pickled; Template.__setstate__()
+        # compiles the node lists again.
+        state = self.__dict__.copy()
+        state.pop('compiled', None)
+        return state
 
     def render(self, context):
+        if self.compiled is not None:
+            return self.compiled(context)
         bits = []
         for node in self:
             if isinstance(node, Node):
@@ -840,6 +978,21 @@ class NodeList(list):
             nodes.extend(node.get_nodes_by_type(nodetype))
         return nodes
 
+    def stream(self, context):
+        """
+        Yields the output of the nodes as it's rendered, like render().
+        Compiled functions render whole node lists, so they aren't used.
+        """
+        for node in self:
+            if isinstance(node, Node):
+                for bit in self.stream_node(node, context):
+                    yield force_text(bit)
+            else:
+                yield force_text(node)
+
+    def stream_node(self, node, context):
+        return node.stream(context)
+
     def render_node(self, node, context):
         return node.render(context)
 
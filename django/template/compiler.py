@@ -0,0 +1,363 @@
+"""
+Compilation of templates to Python functions.
+
+Rendering a template normally walks its tree of nodes, and resolves each
+variable through a generic loop over its lookups, then over its filters,
+inspecting the flags of each filter. The compiler turns the nodes of a
+template into the source code of Python functions instead, with the lookups
+and filter calls written out for each variable, and compiles it. The output
+of the functions is identical to that of the nodes.
+
+Text, variables, ``{% for %}``, ``{% if %}``, ``{% with %}`` and comments are
+compiled, except for loops containing nodes which prefetch data for all their
+iterations, such as ``{% cache %}``. Other nodes, including custom tags, are
+rendered by calling their ``render()`` method, but the node lists they contain
+are compiled too, so that e.g. the content of ``{% block %}`` tags benefits
+from compilation.
+
+Compilation is enabled by the ``TEMPLATE_COMPILE`` setting, or by calling
+``Template.compile()``. It's never used when ``TEMPLATE_DEBUG`` is True, since
+the node lists created in that mode annotate exceptions with the location of
+the node which raised them.
+"""
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.template import base
+from django.template.base import (Node, NodeList, TextNode, Variable,
+    VariableDoesNotExist, VariableNode, _render_value_in_context)
+from django.template.defaulttags import (CommentNode, ForNode, IfNode,
+    TemplateLiteral, WithNode)
+from django.utils.encoding import force_str, force_text
+from django.utils.html import escape
+from django.utils.safestring import (EscapeData, SafeData, SafeText,
+    mark_safe, mark_for_escaping)
+from django.utils import six
+from django.utils.timezone import template_localtime
+
+
+def _call(current):
+    """
+    Calls a callable found by a lookup, like Variable._resolve_lookup().
+    """
+    if getattr(current, 'do_not_call_in_templates', False):
+        return current
+    if getattr(current, 'alters_data', False):
+        return settings.TEMPLATE_STRING_IF_INVALID
+    try:
+        return current()
+    except TypeError:
+        return settings.TEMPLATE_STRING_IF_INVALID
+
+def _string_if_invalid(var):
+    """
+    The value of a missing variable when TEMPLATE_STRING_IF_INVALID is set,
+    like FilterExpression.resolve().
+    """
+    if base.invalid_var_format_string is None:
+        base.invalid_var_format_string = '%s' in settings.TEMPLATE_STRING_IF_INVALID
+    if base.invalid_var_format_string:
+        return settings.TEMPLATE_STRING_IF_INVALID % var
+    return settings.TEMPLATE_STRING_IF_INVALID
+
+def _render_value(value, context):
+    """
+    _render_value_in_context(), with shortcuts for strings.
+    """
+    if type(value) is SafeText:
+        return value
+    if type(value) is six.text_type:
+        return escape(value) if context.autoescape else value
+    return _render_value_in_context(value, context)
+
+
+class TemplateCompiler(object):
+    """
+    Generates the source code of a function rendering each node list of a
+    template, and compiles it.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.namespace = {
+            'settings': settings,
+            'VariableDoesNotExist': VariableDoesNotExist,
+            'SafeData': SafeData,
+            'EscapeData': EscapeData,
+            'mark_safe': mark_safe,
+            'mark_for_escaping': mark_for_escaping,
+            'force_text': force_text,
+            'template_localtime': template_localtime,
+            '_call': _call,
+            '_string_if_invalid': _string_if_invalid,
+            '_render_value': _render_value,
+        }
+        self.source = []
+        self.counter = 0
+        # (node list, name of its function) pairs.
+        self.nodelists = []
+        self.seen = set()
+
+    def name_for(self, prefix):
+        self.counter += 1
+        return '_%s%d' % (prefix, self.counter)
+
+    def constant(self, value):
+        """
+        Returns a name under which ``value`` is available to the functions.
+        """
+        name = self.name_for('k')
+        self.namespace[name] = value
+        return name
+
+    def function(self, prefix, body):
+        """
+        Adds a function of the context whose body is the list of lines
+        ``body``, and returns its name.
+        """
+        name = self.name_for(prefix)
+        self.source.append('def %s(context):' % name)
+        self.source.extend('    ' + line for line in body)
+        self.source.append('')
+        return name
+
+    def compile(self, nodelist):
+        """
+        Compiles ``nodelist`` and the node lists it contains, and makes them
+        render with the compiled functions.
+        """
+        self.nodelist(nodelist)
+        code = compile('\n'.join(self.source),
+                       force_str('<template: %s>' % self.name), 'exec')
+        six.exec_(code, self.namespace)
+        for nodelist, name in self.nodelists:
+            nodelist.compiled = self.namespace[name]
+
+    def nodelist(self, nodelist):
+        """
+        Returns the name of the function rendering ``nodelist``.
+        """
+        body = ['bits = []', 'append = bits.append']
+        for node in nodelist:
+            if not isinstance(node, Node):
+                body.append('append(force_text(%s))' % self.constant(node))
+            elif type(node) is TextNode:
+                body.append('append(%s)' % self.constant(force_text(node.s)))
+            elif type(node) is VariableNode:
+                body.extend([
+                    'try:',
+                    '    value = %s(context)' % self.filter_expression(node.filter_expression),
+                    'except UnicodeDecodeError:',
+                    "    append('')",
+                    'else:',
+                    '    append(_render_value(value, context))',
+                ])
+            elif type(node) is CommentNode:
+                pass
+            elif type(node) is ForNode and not node.prefetch_nodes:
+                body.append('append(%s(context))' % self.for_node(node))
+            elif type(node) is IfNode:
+                body.append('append(%s(context))' % self.if_node(node))
+            elif type(node) is WithNode:
+                body.append('append(%s(context))' % self.with_node(node))
+            else:
+                body.append('append(force_text(%s.render(context)))' % self.constant(node))
+                self.child_nodelists(node)
+        body.append("return mark_safe(''.join(bits))")
+        name = self.function('nodelist', body)
+        # Only plain node lists are replaced: subclasses, such as the one
+        # used in TEMPLATE_DEBUG mode, may render their nodes differently.
+        if type(nodelist) is NodeList and id(nodelist) not in self.seen:
+            self.seen.add(id(nodelist))
+            self.nodelists.append((nodelist, name))
+        return name
+
+    def child_nodelists(self, node):
+        """
+        Compiles the node lists of a node which isn't compiled itself.
+        """
+        conditions_nodelists = getattr(node, 'conditions_nodelists', None)
+        if conditions_nodelists is not None:
+            nodelists = [nodelist for _, nodelist in conditions_nodelists]
+        else:
+            nodelists = [getattr(node, attr, None) for attr in node.child_nodelists]
+        for nodelist in nodelists:
+            if isinstance(nodelist, NodeList) and id(nodelist) not in self.seen:
+                self.nodelist(nodelist)
+
+    def variable(self, var, body):
+        """
+        Adds to ``body`` the lines setting ``obj`` to the value of the
+        Variable ``var``.
+        """
+        if var.lookups is None or var.translate:
+            body.append('obj = %s.resolve(context)' % self.constant(var))
+            return
+        # The lookups go through the inline cache of the variable.
+        lookup_bit = self.constant(var._lookup_bit)
+        current = 'context'
+        for index, bit in enumerate(var.lookups):
+            body.extend([
+                'obj = %s(%d, %r, %s)' % (lookup_bit, index, bit, current),
+                'if callable(obj):',
+                '    obj = _call(obj)',
+            ])
+            current = 'obj'
+
+    def filter_expression(self, expression, ignore_failures=False):
+        """
+        Returns the name of a function resolving the FilterExpression
+        ``expression``.
+        """
+        body = []
+        if isinstance(expression.var, Variable):
+            lookup = []
+            self.variable(expression.var, lookup)
+            body.append('try:')
+            body.extend('    ' + line for line in lookup)
+            body.extend([
+                'except Exception as e:',
+                "    if getattr(e, 'silent_variable_failure', False):",
+                '        obj = settings.TEMPLATE_STRING_IF_INVALID',
+                '    elif not isinstance(e, VariableDoesNotExist):',
+                '        raise',
+            ])
+            if ignore_failures:
+                body.append('    else:')
+                body.append('        obj = None')
+            else:
+                body.extend([
+                    '    elif settings.TEMPLATE_STRING_IF_INVALID:',
+                    '        return _string_if_invalid(%s)' % self.constant(expression.var),
+                    '    else:',
+                    '        obj = settings.TEMPLATE_STRING_IF_INVALID',
+                ])
+        else:
+            body.append('obj = %s' % self.constant(expression.var))
+
+        for func, args in expression.filters:
+            arg_names = []
+            for lookup, arg in args:
+                arg_name = 'arg%d' % len(arg_names)
+                if not lookup:
+                    body.append('%s = mark_safe(%s)' % (arg_name, self.constant(arg)))
+                else:
+                    body.append('%s = %s.resolve(context)' % (arg_name, self.constant(arg)))
+                arg_names.append(arg_name)
+            if getattr(func, 'needs_autoescape', False):
+                arg_names.append('autoescape=context.autoescape')
+            if getattr(func, 'expects_localtime', False):
+                body.append('obj = template_localtime(obj, context.use_tz)')
+            body.append('new_obj = %s(%s)' % (self.constant(func),
+                                               ', '.join(['obj'] + arg_names)))
+            if getattr(func, 'is_safe', False):
+                body.extend([
+                    'if isinstance(obj, SafeData):',
+                    '    obj = mark_safe(new_obj)',
+                    'elif isinstance(obj, EscapeData):',
+                ])
+            else:
+                body.append('if isinstance(obj, EscapeData):')
+            body.extend([
+                '    obj = mark_for_escaping(new_obj)',
+                'else:',
+                '    obj = new_obj',
+            ])
+        body.append('return obj')
+        return self.function('expression', body)
+
+    def for_node(self, node):
+        body = [
+            "if 'forloop' in context:",
+            "    parentloop = context['forloop']",
+            'else:',
+            '    parentloop = {}',
+            'context.push()',
+            'try:',
+            '    values = %s(context)' % self.filter_expression(node.sequence, True),
+            'except VariableDoesNotExist:',
+            '    values = []',
+            'if values is None:',
+            '    values = []',
+            "if not hasattr(values, '__len__'):",
+            '    values = list(values)',
+            'len_values = len(values)',
+            'if len_values < 1:',
+            '    context.pop()',
+            '    return %s(context)' % self.nodelist(node.nodelist_empty),
+            'bits = []',
+            'append = bits.append',
+        ]
+        if node.is_reversed:
+            body.append('values = reversed(values)')
+        loop = self.nodelist(node.nodelist_loop)
+        body.extend([
+            "loop_dict = context['forloop'] = {'parentloop': parentloop}",
+            'for i, item in enumerate(values):',
+            "    loop_dict['counter0'] = i",
+            "    loop_dict['counter'] = i + 1",
+            "    loop_dict['revcounter'] = len_values - i",
+            "    loop_dict['revcounter0'] = len_values - i - 1",
+            "    loop_dict['first'] = (i == 0)",
+            "    loop_dict['last'] = (i == len_values - 1)",
+        ])
+        if len(node.loopvars) > 1:
+            body.extend([
+                '    try:',
+                '        unpacked_vars = dict(zip(%s, item))' % self.constant(node.loopvars),
+                '    except TypeError:',
+                '        append(%s(context))' % loop,
+                '    else:',
+                '        context.update(unpacked_vars)',
+                '        append(%s(context))' % loop,
+                '        context.pop()',
+            ])
+        else:
+            body.extend([
+                '    context[%r] = item' % node.loopvars[0],
+                '    append(%s(context))' % loop,
+            ])
+        body.extend([
+            'context.pop()',
+            "return mark_safe(''.join(bits))",
+        ])
+        return self.function('for', body)
+
+    def if_node(self, node):
+        body = []
+        for condition, nodelist in node.conditions_nodelists:
+            if condition is None:
+                body.append('return %s(context)' % self.nodelist(nodelist))
+                break
+            if type(condition) is TemplateLiteral:
+                value = '%s(context)' % self.filter_expression(condition.value, True)
+            else:
+                value = '%s.eval(context)' % self.constant(condition)
+            body.extend([
+                'try:',
+                '    match = %s' % value,
+                'except VariableDoesNotExist:',
+                '    match = None',
+                'if match:',
+                '    return %s(context)' % self.nodelist(nodelist),
+            ])
+        else:
+            body.append("return ''")
+        return self.function('if', body)
+
+    def with_node(self, node):
+        values = ', '.join('%r: %s(context)' % (key, self.filter_expression(value))
+                           for key, value in six.iteritems(node.extra_context))
+        return self.function('with', [
+            'context.update({%s})' % values,
+            'output = %s(context)' % self.nodelist(node.nodelist),
+            'context.pop()',
+            'return output',
+        ])
+
+
+def compile_nodelist(nodelist, name='<Unknown Template>'):
+    """
+    Compiles ``nodelist``, so that rendering it and the node lists it
+    contains runs compiled functions rather than walking the nodes.
+    """
+    TemplateCompiler(name).compile(nodelist)
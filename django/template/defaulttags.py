@@ -131,7 +131,70 @@ class ForNode(Node):
         for node in self.nodelist_empty:
             yield node
 
-    def render(self, context):
+    _prefetch_nodes = None
+
+    @property
+    def prefetch_nodes(self):
+        """
+        The nodes of the loop body, outside of nested loops, which fetch data
+        for all the iterations at once before the loop starts. Such nodes have
+        a prefetch_key(context) method returning a key needed to render them
+        for the current iteration (or None), a prefetch(context, keys) method
+        called with the keys of every iteration before the loop, and an
+        end_prefetch(context) method called after it.
+        """
+        if self._prefetch_nodes is None:
+            nodes = []
+            pending = [self.nodelist_loop]
+            while pending:
+                for node in pending.pop():
+                    if not isinstance(node, Node):
+                        continue
+                    if hasattr(node, 'prefetch_key'):
+                        nodes.append(node)
+                    if isinstance(node, ForNode):
+                        continue
+                    conditions_nodelists = getattr(node, 'conditions_nodelists', None)
+                    if conditions_nodelists is not None:
+                        pending.extend(nodelist for _, nodelist in conditions_nodelists)
+                    else:
+                        pending.extend(getattr(node, attr, None) or []
+                                       for attr in node.child_nodelists)
+            self._prefetch_nodes = nodes
+        return self._prefetch_nodes
+
+    def set_loop_vars(self, context, loop_dict, i, item, len_values):
+        """
+        Sets the loop variables for the item ``item`` of index ``i``, and
+        returns True if they were pushed on the context.
+        """
+        # Shortcuts for current loop iteration number.
+        loop_dict['counter0'] = i
+        loop_dict['counter'] = i+1
+        # Reverse counter iteration numbers.
+        loop_dict['revcounter'] = len_values - i
+        loop_dict['revcounter0'] = len_values - i - 1
+        # Boolean values designating first and last times through loop.
+        loop_dict['first'] = (i == 0)
+        loop_dict['last'] = (i == len_values - 1)
+
+        if len(self.loopvars) > 1:
+            # If there are multiple loop variables, unpack the item into
+            # them.
+            try:
+                unpacked_vars = dict(zip(self.loopvars, item))
+            except TypeError:
+                return False
+            context.update(unpacked_vars)
+            return True
+        context[self.loopvars[0]] = item
+        return False
+
+    def iterate(self, context):
+        """
+        Sets the loop variables in ``context`` for each item of the sequence,
+        yielding once per item, and returns without yielding if it's empty.
+        """
         if 'forloop' in context:
             parentloop = context['forloop']
         else:
@@ -148,38 +211,46 @@ class ForNode(Node):
         len_values = len(values)
         if len_values < 1:
             context.pop()
-            return self.nodelist_empty.render(context)
-        nodelist = NodeList()
+            return
         if self.is_reversed:
             values = reversed(values)
-        unpack = len(self.loopvars) > 1
         # Create a forloop value in the context.  We'll update counters on each
         # iteration just below.
         loop_dict = context['forloop'] = {'parentloop': parentloop}
+        prefetch_nodes = self.prefetch_nodes
+        if prefetch_nodes:
+            # Collect the keys of every iteration first.
+            values = list(values)
+            keys = [[] for node in prefetch_nodes]
+            for i, item in enumerate(values):
+                pop_context = self.set_loop_vars(context, loop_dict, i, item, len_values)
+                for node, node_keys in zip(prefetch_nodes, keys):
+                    key = node.prefetch_key(context)
+                    if key is not None:
+                        node_keys.append(key)
+                if pop_context:
+                    context.pop()
+            for node, node_keys in zip(prefetch_nodes, keys):
+                node.prefetch(context, node_keys)
         for i, item in enumerate(values):
-            # Shortcuts for current loop iteration number.
-            loop_dict['counter0'] = i
-            loop_dict['counter'] = i+1
-            # Reverse counter iteration numbers.
-            loop_dict['revcounter'] = len_values - i
-            loop_dict['revcounter0'] = len_values - i - 1
-            # Boolean values designating first and last times through loop.
-            loop_dict['first'] = (i == 0)
-            loop_dict['last'] = (i == len_values - 1)
-
-            pop_context = False
-            if unpack:
-                # If there are multiple loop variables, unpack the item into
-                # them.
-                try:
-                    unpacked_vars = dict(zip(self.loopvars, item))
-                except TypeError:
-                    pass
-                else:
-                    pop_context = True
-                    context.update(unpacked_vars)
-            else:
-                context[self.loopvars[0]] = item
+            pop_context = self.set_loop_vars(context, loop_dict, i, item, len_values)
+            yield
+            if pop_context:
+                # The loop variables were pushed on to the context so pop them
+                # off again. This is necessary because the tag lets the length
+                # of loopvars differ to the length of each set of items and we
+                # don't want to leave any vars from the previous loop on the
+                # context.
+                context.pop()
+        for node in prefetch_nodes:
+            node.end_prefetch(context)
+        context.pop()
+
+    def render(self, context):
+        nodelist = NodeList()
+        empty = True
+        for _ in self.iterate(context):
+            empty = False
             # In TEMPLATE_DEBUG mode provide source of the node which
             # actually raised the exception
             if settings.TEMPLATE_DEBUG:
@@ -193,16 +264,20 @@ class ForNode(Node):
             else:
                 for node in self.nodelist_loop:
                     nodelist.append(node.render(context))
-            if pop_context:
-                # The loop variables were pushed on to the context so pop them
-                # off again. This is necessary because the tag lets the length
-                # of loopvars differ to the length of each set of items and we
-                # don't want to leave any vars from the previous loop on the
-                # context.
-                context.pop()
-        context.pop()
+        if empty:
+            return self.nodelist_empty.render(context)
         return nodelist.render(context)
 
+    def stream(self, context):
+        empty = True
+        for _ in self.iterate(context):
+            empty = False
+            for bit in self.nodelist_loop.stream(context):
+                yield bit
+        if empty:
+            for bit in self.nodelist_empty.stream(context):
+                yield bit
+
 class IfChangedNode(Node):
     child_nodelists = ('nodelist_true', 'nodelist_false')
 
@@ -285,6 +360,20 @@ class IfNode(Node):
 
         return ''
 
+    def stream(self, context):
+        for condition, nodelist in self.conditions_nodelists:
+            if condition is not None:
+                try:
+                    match = condition.eval(context)
+                except VariableDoesNotExist:
+                    match = None
+            else:
+                match = True
+
+            if match:
+                return nodelist.stream(context)
+        return iter([])
+
 class RegroupNode(Node):
     def __init__(self, target, expression, var_name):
         self.target, self.expression = target, expression
@@ -480,6 +569,14 @@ class WithNode(Node):
         context.pop()
         return output
 
+    def stream(self, context):
+        values = dict([(key, val.resolve(context)) for key, val in
+                       six.iteritems(self.extra_context)])
+        context.update(values)
+        for bit in self.nodelist.stream(context):
+            yield bit
+        context.pop()
+
 @register.tag
 def autoescape(parser, token):
     """
@@ -66,6 +66,27 @@ class BlockNode(Node):
         context.pop()
         return result
 
+    def stream(self, context):
+        block_context = context.render_context.get(BLOCK_CONTEXT_KEY)
+        context.push()
+        if block_context is None:
+            context['block'] = self
+            for bit in self.nodelist.stream(context):
+                yield bit
+        else:
+            push = block = block_context.pop(self.name)
+            if block is None:
+                block = self
+            # Create new block so we can store context without thread-safety issues.
+            block = BlockNode(block.name, block.nodelist)
+            block.context = context
+            context['block'] = block
+            for bit in block.nodelist.stream(context):
+                yield bit
+            if push is not None:
+                block_context.push(self.name, push)
+        context.pop()
+
     def super(self):
         render_context = self.context.render_context
         if (BLOCK_CONTEXT_KEY in render_context and
@@ -99,6 +120,19 @@ class ExtendsNode(Node):
         return get_template(parent)
 
     def render(self, context):
+        compiled_parent = self.prepare_parent(context)
+        # Call Template._render explicitly so the parser context stays
+        # the same.
+        return compiled_parent._render(context)
+
+    def stream(self, context):
+        return self.prepare_parent(context).nodelist.stream(context)
+
+    def prepare_parent(self, context):
+        """
+        Returns the parent template, after adding the blocks of this
+        template, and of the parent if it's the root, to the block context.
+        """
         compiled_parent = self.get_parent(context)
 
         if BLOCK_CONTEXT_KEY not in context.render_context:
@@ -118,10 +152,7 @@ class ExtendsNode(Node):
                                    compiled_parent.nodelist.get_nodes_by_type(BlockNode)])
                     block_context.add_blocks(blocks)
                 break
-
-        # Call Template._render explicitly so the parser context stays
-        # the same.
-        return compiled_parent._render(context)
+        return compiled_parent
 
 class BaseIncludeNode(Node):
     def __init__(self, *args, **kwargs):
@@ -139,6 +170,18 @@ class BaseIncludeNode(Node):
         context.pop()
         return output
 
+    def stream_template(self, template, context):
+        values = dict([(name, var.resolve(context)) for name, var
+                       in six.iteritems(self.extra_context)])
+        if self.isolated_context:
+            for bit in template.stream(context.new(values), chunk_size=0):
+                yield bit
+            return
+        context.update(values)
+        for bit in template.stream(context, chunk_size=0):
+            yield bit
+        context.pop()
+
 class ConstantIncludeNode(BaseIncludeNode):
     def __init__(self, template_path, *args, **kwargs):
         super(ConstantIncludeNode, self).__init__(*args, **kwargs)
@@ -155,6 +198,11 @@ class ConstantIncludeNode(BaseIncludeNode):
             return ''
         return self.render_template(self.template, context)
 
+    def stream(self, context):
+        if not self.template:
+            return iter([])
+        return self.stream_template(self.template, context)
+
 class IncludeNode(BaseIncludeNode):
     def __init__(self, template_name, *args, **kwargs):
         super(IncludeNode, self).__init__(*args, **kwargs)
@@ -170,6 +218,18 @@ class IncludeNode(BaseIncludeNode):
                 raise
             return ''
 
+    def stream(self, context):
+        try:
+            template_name = self.template_name.resolve(context)
+            template = get_template(template_name)
+            for bit in self.stream_template(template, context):
+                yield bit
+        except Exception:
+            # Unlike render(), the output yielded before the error can't be
+            # taken back.
+            if settings.TEMPLATE_DEBUG:
+                raise
+
 @register.tag('block')
 def do_block(parser, token):
     """
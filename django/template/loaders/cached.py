@@ -1,19 +1,107 @@
 """
 Wrapper class that takes a list of template loaders as an argument and attempts
 to load templates from them in order, caching the result.
+
+When ``check_interval`` (the ``TEMPLATE_CACHE_CHECK_INTERVAL`` setting by
+default) is a number of seconds, the loader checks at most that often whether
+the files of a cached template, and of the templates it includes, have been
+modified, moved or deleted, and loads them again if they have.
+
+When ``cache_dir`` (the ``TEMPLATE_CACHE_DIR`` setting by default) is set,
+parsed templates are also pickled to files in that directory, keyed by their
+source, so that other processes using the same directory can load them
+without parsing them again. Loading them executes code, like any unpickling,
+so the directory must only be writable by the user running the site.
 """
 
 import hashlib
-from django.template.base import TemplateDoesNotExist
+import os
+import sys
+import tempfile
+import time
+
+try:
+    from django.utils.six.moves import cPickle as pickle
+except ImportError:
+    import pickle
+
+import django
+from django.conf import settings
+from django.template.base import TemplateDoesNotExist, get_templatetags_modules
 from django.template.loader import BaseLoader, get_template_from_string, find_template_loader, make_origin
+from django.template.loader_tags import ConstantIncludeNode
+from django.utils.encoding import force_bytes
+
+
+def _uses_default_load_template(loader):
+    """
+    Returns True if ``loader`` builds templates from the source returned by
+    its load_template_source() method, like BaseLoader.
+    """
+    method = getattr(type(loader), 'load_template', None)
+    return getattr(method, '__func__', method) is getattr(
+        BaseLoader.load_template, '__func__', BaseLoader.load_template)
+
+
+def _file_signature(path):
+    """
+    Returns a value which changes when the file at ``path`` is modified or
+    replaced, or None if it doesn't exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime, stat.st_ino, stat.st_size)
+
+
+def _templatetags_signature():
+    """
+    Returns a digest of the signatures of the files of the template tag
+    libraries of the installed applications, which changes when their code
+    is deployed again.
+    """
+    digest = hashlib.sha1()
+    for package in get_templatetags_modules():
+        directory = os.path.dirname(sys.modules[package].__file__)
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith('.py'):
+                path = os.path.join(directory, name)
+                digest.update(force_bytes('%s|%r|' % (path, _file_signature(path))))
+    return digest.hexdigest()
+
+
+class TemplateWatch(object):
+    """
+    The files a cached template was loaded from: its own and those of the
+    templates it includes, with their signatures.
+    """
+    def __init__(self, files, next_check):
+        # (name, dirs, path, signature) tuples.
+        self.files = files
+        self.next_check = next_check
+
 
 class Loader(BaseLoader):
     is_usable = True
 
-    def __init__(self, loaders):
+    def __init__(self, loaders, check_interval=None, cache_dir=None):
         self.template_cache = {}
+        # Maps the keys of template_cache to TemplateWatch instances.
+        self.watches = {}
         self._loaders = loaders
         self._cached_loaders = []
+        if check_interval is None:
+            check_interval = settings.TEMPLATE_CACHE_CHECK_INTERVAL
+        self.check_interval = check_interval
+        if cache_dir is None:
+            cache_dir = settings.TEMPLATE_CACHE_DIR
+        self.cache_dir = cache_dir
+        self._code_signature = None
 
     @property
     def loaders(self):
@@ -30,18 +118,150 @@ class Loader(BaseLoader):
     def find_template(self, name, dirs=None):
         for loader in self.loaders:
             try:
-                template, display_name = loader(name, dirs)
+                template, display_name = self._load(loader, name, dirs)
                 return (template, make_origin(display_name, loader, name, dirs))
             except TemplateDoesNotExist:
                 pass
         raise TemplateDoesNotExist(name)
 
+    def _load(self, loader, name, dirs):
+        if (self.cache_dir is None or settings.TEMPLATE_DEBUG or
+                not _uses_default_load_template(loader)):
+            return loader(name, dirs)
+        # Same as BaseLoader.load_template(), parsing through the disk cache.
+        source, display_name = loader.load_template_source(name, dirs)
+        origin = make_origin(display_name, loader.load_template_source, name, dirs)
+        try:
+            return self.parse(source, origin, name), None
+        except TemplateDoesNotExist:
+            return source, display_name
+
+    def cache_path(self, source, name):
+        """
+        Returns the path of the file of the disk cache holding the template
+        ``name`` parsed from ``source``.
+        """
+        # Parse trees depend on the version of Django and of pickle's
+        # protocol, and on the code of the tags and filters, which is
+        # identified by the files of the template tag libraries and by the
+        # TEMPLATE_CACHE_VERSION setting, for code living elsewhere.
+        if self._code_signature is None:
+            self._code_signature = _templatetags_signature()
+        key = hashlib.sha1(force_bytes('|'.join([
+            name, django.get_version(), '%d.%d' % sys.version_info[:2],
+            str(pickle.HIGHEST_PROTOCOL), self._code_signature,
+            str(settings.TEMPLATE_CACHE_VERSION),
+        ])))
+        key.update(force_bytes(source))
+        return os.path.join(self.cache_dir, '%s.djtpl' % key.hexdigest())
+
+    def parse(self, source, origin, name):
+        """
+        Returns the template parsed from ``source``, from the disk cache if
+        another process has already parsed it.
+        """
+        path = self.cache_path(source, name)
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            # The file is missing, truncated, or refers to code which has
+            # changed since it was written. Parse the template again.
+            pass
+        template = get_template_from_string(source, origin, name)
+        self.store(path, template)
+        return template
+
+    def store(self, path, template):
+        """
+        Writes ``template`` to the disk cache. Templates which can't be
+        pickled, e.g. because they use tags defined by simple_tag(), are only
+        cached in memory.
+        """
+        try:
+            data = pickle.dumps(template, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        except (IOError, OSError):
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            # Other processes never see a partially written file.
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def template_path(self, name, dirs):
+        """
+        Returns the path of the file the template ``name`` is loaded from, or
+        None if none of the loaders locates it in a file.
+        """
+        for loader in self.loaders:
+            get_template_sources = getattr(loader, 'get_template_sources', None)
+            if get_template_sources is None:
+                continue
+            for path in get_template_sources(name, dirs):
+                if os.path.isfile(path):
+                    return path
+        return None
+
+    def watch(self, name, dirs, template):
+        """
+        Returns a TemplateWatch for the files of ``template`` and of the
+        templates included by it.
+        """
+        files = []
+        seen = set()
+        pending = [(name, dirs, template)]
+        while pending:
+            name, dirs, template = pending.pop()
+            if (name, tuple(dirs or ())) in seen:
+                continue
+            seen.add((name, tuple(dirs or ())))
+            path = self.template_path(name, dirs)
+            files.append((name, dirs, path, path and _file_signature(path)))
+            for node in template.nodelist.get_nodes_by_type(ConstantIncludeNode):
+                if node.template is not None:
+                    pending.append((node.template.name, None, node.template))
+        return TemplateWatch(files, time.time() + self.check_interval)
+
+    def is_fresh(self, key):
+        """
+        Returns False if the file of the cached template ``key``, or of one
+        of the templates it includes, has been modified, replaced or deleted
+        since it was loaded. Files are checked at most every
+        ``check_interval`` seconds.
+        """
+        watch = self.watches.get(key)
+        if watch is None:
+            return True
+        now = time.time()
+        if now < watch.next_check:
+            return True
+        watch.next_check = now + self.check_interval
+        for name, dirs, path, signature in watch.files:
+            new_path = self.template_path(name, dirs)
+            if new_path != path or (path and _file_signature(path) != signature):
+                return False
+        return True
+
     def load_template(self, template_name, template_dirs=None):
         key = template_name
         if template_dirs:
             # If template directories were specified, use a hash to differentiate
             key = '-'.join([template_name, hashlib.sha1('|'.join(template_dirs)).hexdigest()])
 
+        if (key in self.template_cache and self.check_interval is not None and
+                not self.is_fresh(key)):
+            self.template_cache.pop(key, None)
+            self.watches.pop(key, None)
+
         if key not in self.template_cache:
             template, origin = self.find_template(template_name, template_dirs)
             if not hasattr(template, 'render'):
@@ -53,9 +273,12 @@ class Loader(BaseLoader):
                     # we were asked to load. This allows for correct identification (later)
                     # of the actual template that does not exist.
                     return template, origin
+            if self.check_interval is not None:
+                self.watches[key] = self.watch(template_name, template_dirs, template)
             self.template_cache[key] = template
         return self.template_cache[key], None
 
     def reset(self):
         "Empty the template cache."
         self.template_cache.clear()
+        self.watches.clear()
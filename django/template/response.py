@@ -11,13 +11,17 @@ class SimpleTemplateResponse(HttpResponse):
     rendering_attrs = ['template_name', 'context_data', '_post_render_callbacks']
 
     def __init__(self, template, context=None, content_type=None, status=None,
-            mimetype=None):
+            mimetype=None, streaming=False):
         # It would seem obvious to call these next two members 'template' and
         # 'context', but those names are reserved as part of the test Client
         # API. To avoid the name collision, we use tricky-to-debug problems
         self.template_name = template
         self.context_data = context
 
+        # When streaming is True, the template is rendered as the content of
+        # the response is iterated over, instead of by render().
+        self.streaming = streaming
+
         self._post_render_callbacks = []
 
         # content argument doesn't make sense here because it will be replaced
@@ -82,6 +86,18 @@ class SimpleTemplateResponse(HttpResponse):
         content = template.render(context)
         return content
 
+    @property
+    def streamed_content(self):
+        """Returns an iterator over the content for the template and context
+        described by the TemplateResponse, rendered as it's consumed.
+
+        Like rendered_content, this *does not* set the final content of the
+        response.
+        """
+        template = self.resolve_template(self.template_name)
+        context = self.resolve_context(self.context_data)
+        return template.stream(context)
+
     def add_post_render_callback(self, callback):
         """Adds a new post-rendering callback.
 
@@ -102,7 +118,10 @@ class SimpleTemplateResponse(HttpResponse):
         """
         retval = self
         if not self._is_rendered:
-            self.content = self.rendered_content
+            if self.streaming:
+                self.content = self.streamed_content
+            else:
+                self.content = self.rendered_content
             for post_callback in self._post_render_callbacks:
                 newretval = post_callback(retval)
                 if newretval is not None:
@@ -119,6 +138,20 @@ class SimpleTemplateResponse(HttpResponse):
                                           'rendered before it can be iterated over.')
         return super(SimpleTemplateResponse, self).__iter__()
 
+    @property
+    def streaming_content(self):
+        """Like StreamingHttpResponse.streaming_content, for middleware
+        handling responses whose streaming attribute is True.
+        """
+        if not self._is_rendered:
+            raise ContentNotRenderedError('The response content must be '
+                                          'rendered before it can be iterated over.')
+        return self.iter_bytes(self._container)
+
+    @streaming_content.setter
+    def streaming_content(self, value):
+        self.content = value
+
     @property
     def content(self):
         if not self._is_rendered:
@@ -139,7 +172,7 @@ class TemplateResponse(SimpleTemplateResponse):
         ['_request', '_current_app']
 
     def __init__(self, request, template, context=None, content_type=None,
-            status=None, mimetype=None, current_app=None):
+            status=None, mimetype=None, current_app=None, streaming=False):
         # self.request gets over-written by django.test.client.Client - and
         # unlike context_data and template_name the _request should not
         # be considered part of the public API.
@@ -148,7 +181,7 @@ class TemplateResponse(SimpleTemplateResponse):
         # having to avoid needing to create the RequestContext directly
         self._current_app = current_app
         super(TemplateResponse, self).__init__(
-            template, context, content_type, status, mimetype)
+            template, context, content_type, status, mimetype, streaming)
 
     def resolve_context(self, context):
         """Convert context data into a full RequestContext object
@@ -39,6 +39,20 @@ class TokenBase(object):
         out = [str(x) for x in [self.id, self.first, self.second] if x is not None]
         return "(" + " ".join(out) + ")"
 
+    def __reduce__(self):
+        # Operator classes are created by infix() and prefix(), and can't be
+        # found by name when unpickling; look them up in OPERATORS instead.
+        if OPERATORS.get(self.id) is type(self):
+            return (_operator, (self.id,), self.__dict__)
+        return super(TokenBase, self).__reduce__()
+
+
+def _operator(id):
+    """
+    Returns a new instance of the operator ``id``.
+    """
+    return OPERATORS[id]()
+
 
 def infix(bp, func):
     """
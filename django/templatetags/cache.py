@@ -10,31 +10,114 @@ from django.utils.http import urlquote
 register = Library()
 
 class CacheNode(Node):
+    """
+    Caches the output of its content.
+
+    Inside a {% for %} loop, the fragments of all the iterations are fetched
+    from the cache with a single get_many() before the loop starts, and those
+    that were missing are stored with a single set_many() after it.
+    """
     def __init__(self, nodelist, expire_time_var, fragment_name, vary_on):
         self.nodelist = nodelist
         self.expire_time_var = Variable(expire_time_var)
         self.fragment_name = fragment_name
         self.vary_on = vary_on
+        self.hits = self.misses = 0
 
-    def render(self, context):
+    def get_expire_time(self, context):
         try:
             expire_time = self.expire_time_var.resolve(context)
         except VariableDoesNotExist:
             raise TemplateSyntaxError('"cache" tag got an unknown variable: %r' % self.expire_time_var.var)
         try:
-            expire_time = int(expire_time)
+            return int(expire_time)
         except (ValueError, TypeError):
             raise TemplateSyntaxError('"cache" tag got a non-integer timeout value: %r' % expire_time)
+
+    def get_cache_key(self, context):
         # Build a key for this fragment and all vary-on's.
         key = ':'.join([urlquote(resolve_variable(var, context)) for var in self.vary_on])
         args = hashlib.md5(force_bytes(key))
-        cache_key = 'template.cache.%s.%s' % (self.fragment_name, args.hexdigest())
+        return 'template.cache.%s.%s' % (self.fragment_name, args.hexdigest())
+
+    def prefetch_key(self, context):
+        try:
+            return self.get_cache_key(context)
+        except Exception:
+            # The fragment may not be rendered for this iteration; if it is,
+            # render() raises the error.
+            return None
+
+    def prefetch(self, context, keys):
+        """
+        Fetches the fragments of all the iterations of the enclosing loop.
+        """
+        context.render_context[self] = {
+            'keys': set(keys),
+            'values': cache.get_many(keys) if keys else {},
+            # Fragments to store after the loop, by expiry time.
+            'pending': {},
+        }
+
+    def end_prefetch(self, context):
+        prefetched = context.render_context.get(self)
+        if prefetched is None:
+            return
+        del context.render_context[self]
+        for expire_time, values in prefetched['pending'].items():
+            cache.set_many(values, expire_time)
+
+    def render(self, context):
+        expire_time = self.get_expire_time(context)
+        cache_key = self.get_cache_key(context)
+        prefetched = context.render_context.get(self)
+        if prefetched is not None and cache_key in prefetched['keys']:
+            value = prefetched['values'].get(cache_key)
+            if value is None:
+                self.misses += 1
+                value = self.nodelist.render(context)
+                prefetched['values'][cache_key] = value
+                prefetched['pending'].setdefault(expire_time, {})[cache_key] = value
+            else:
+                self.hits += 1
+            return value
         value = cache.get(cache_key)
         if value is None:
+            self.misses += 1
             value = self.nodelist.render(context)
             cache.set(cache_key, value, expire_time)
+        else:
+            self.hits += 1
         return value
 
+def _hit_ratio(hits, misses):
+    if hits + misses:
+        return float(hits) / (hits + misses)
+    return None
+
+def fragment_cache_stats(template):
+    """
+    Returns the number of fragments of ``template`` found in the cache
+    (hits), the number which had to be rendered (misses) and the hit ratio,
+    in total and by fragment name.
+    """
+    hits = misses = 0
+    fragments = {}
+    for node in template.nodelist.get_nodes_by_type(CacheNode):
+        stats = fragments.setdefault(node.fragment_name, {'hits': 0, 'misses': 0})
+        stats['hits'] += node.hits
+        stats['misses'] += node.misses
+        hits += node.hits
+        misses += node.misses
+    for stats in fragments.values():
+        stats['hit_ratio'] = _hit_ratio(stats['hits'], stats['misses'])
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': _hit_ratio(hits, misses),
+        'fragments': fragments,
+    }
+
 @register.tag('cache')
 def do_cache(parser, token):
     """
@@ -254,6 +254,114 @@ class SortedDict(dict):
         super(SortedDict, self).clear()
         self.keyOrder = []
 
+class LRUDict(object):
+    """
+    A dictionary holding at most ``max_size`` items. When it's full, setting
+    a new key evicts the least recently used item. Reading or setting a key
+    marks it as the most recently used one. All operations are O(1).
+
+    Not thread-safe: callers sharing an instance between threads must lock.
+    """
+    # Indexes in the [prev, next, key, value] links of the circular doubly
+    # linked list ordering keys from least to most recently used.
+    PREV, NEXT, KEY, VALUE = 0, 1, 2, 3
+
+    def __init__(self, max_size):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.max_size = max_size
+        self.clear()
+
+    def clear(self):
+        self._map = {}
+        self._root = root = []
+        root[:] = [root, root, None, None]
+
+    def _unlink(self, link):
+        link_prev, link_next = link[self.PREV], link[self.NEXT]
+        link_prev[self.NEXT] = link_next
+        link_next[self.PREV] = link_prev
+
+    def _append(self, link):
+        # Inserts the link just before the root, i.e. as most recently used.
+        root = self._root
+        last = root[self.PREV]
+        link[self.PREV], link[self.NEXT] = last, root
+        last[self.NEXT] = root[self.PREV] = link
+
+    def __len__(self):
+        return len(self._map)
+
+    def __contains__(self, key):
+        # Doesn't count as a use of the key.
+        return key in self._map
+
+    def __getitem__(self, key):
+        link = self._map[key]
+        self._unlink(link)
+        self._append(link)
+        return link[self.VALUE]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        link = self._map.get(key)
+        if link is not None:
+            self._unlink(link)
+            link[self.VALUE] = value
+        else:
+            if len(self._map) >= self.max_size:
+                self.popitem()
+            link = [None, None, key, value]
+            self._map[key] = link
+        self._append(link)
+
+    def __delitem__(self, key):
+        self._unlink(self._map.pop(key))
+
+    def pop(self, key, *default):
+        try:
+            link = self._map.pop(key)
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        self._unlink(link)
+        return link[self.VALUE]
+
+    def popitem(self):
+        """
+        Removes and returns the least recently used (key, value) pair.
+        """
+        link = self._root[self.NEXT]
+        if link is self._root:
+            raise KeyError('popitem(): LRUDict is empty')
+        self._unlink(link)
+        del self._map[link[self.KEY]]
+        return link[self.KEY], link[self.VALUE]
+
+    def keys(self):
+        """
+        Returns the keys from the least to the most recently used.
+        """
+        result = []
+        link = self._root[self.NEXT]
+        while link is not self._root:
+            result.append(link[self.KEY])
+            link = link[self.NEXT]
+        return result
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __repr__(self):
+        return '<LRUDict: %d/%d items>' % (len(self), self.max_size)
+
+
 class MultiValueDictKeyError(KeyError):
     pass
 
@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 import re
 import unicodedata
 import warnings
+import zlib
 from gzip import GzipFile
 from io import BytesIO
 
@@ -288,6 +289,21 @@ def compress_string(s):
     zfile.close()
     return zbuf.getvalue()
 
+def compress_sequence(sequence):
+    """
+    Like compress_string(), for an iterable of bytestrings: yields the gzipped
+    data as the items of ``sequence`` are compressed, so that it never holds
+    more than one of them in memory.
+    """
+    # The gzip container, rather than a raw zlib stream.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for item in sequence:
+        if item:
+            # Flush each item, so that it reaches the client without waiting
+            # for the following ones.
+            yield compressor.compress(item) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
 ustring_re = re.compile("([\u0080-\uffff])")
 
 def javascript_quote(s, quote_double_quotes=False):
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Times URL resolution over synthetic URLconfs with thousands of routes, with
+and without the index of the patterns by literal prefix of RegexURLResolver,
+and the reversing of their names, with and without the memoization of
+reverse().
+
+Usage: python urlresolvers_benchmark.py [--routes=1000,2000,5000] [--number=N]
+
+Run it from a checkout of Django, or with Django on the Python path.
+"""
+import os
+import sys
+import timeit
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure(USE_I18N=False)
+
+from django.core.urlresolvers import (RegexURLPattern, RegexURLResolver,
+    clear_url_caches, reverse)
+from django.http import HttpResponse
+
+
+def view(request, **kwargs):
+    return HttpResponse()
+
+
+class LinearResolver(RegexURLResolver):
+    """
+    Tries every pattern in order, like resolvers did before they were indexed.
+    """
+    def _candidates(self, patterns, path):
+        return list(range(len(patterns)))
+
+
+def make_patterns(num_routes):
+    """
+    Returns a flat URLconf of ``num_routes`` routes, in groups of five
+    patterns per section, like a large site with many applications.
+    """
+    patterns = []
+    for section in range(num_routes // 5):
+        prefix = 'section%d/' % section
+        patterns.extend([
+            RegexURLPattern(r'^%s$' % prefix, view, name='section%d-list' % section),
+            RegexURLPattern(r'^%sadd/$' % prefix, view, name='section%d-add' % section),
+            RegexURLPattern(r'^%s(?P<pk>\d+)/$' % prefix, view, name='section%d-detail' % section),
+            RegexURLPattern(r'^%s(?P<pk>\d+)/edit/$' % prefix, view, name='section%d-edit' % section),
+            RegexURLPattern(r'^%s(?P<slug>[-\w]+)/$' % prefix, view, name='section%d-slug' % section),
+        ])
+    return patterns
+
+
+def make_urlconf(patterns):
+    """
+    Returns a hashable URLconf holding ``patterns``, for reverse().
+    """
+    class URLconf(object):
+        urlpatterns = patterns
+    return URLconf
+
+
+def time_resolve(resolver, path, number):
+    resolver.resolve(path)
+    seconds = timeit.Timer(lambda: resolver.resolve(path)).timeit(number)
+    return seconds / number * 1e6
+
+
+def time_reverse(urlconf, name, number, memoized):
+    """
+    Times reversing ``name`` with a keyword argument. Without memoization,
+    each call gets an argument it wasn't called with before; the cache of
+    the reverse templates of the resolver is still used.
+    """
+    clear_url_caches()
+    reverse(name, urlconf, kwargs={'pk': 0})
+    if memoized:
+        stmt = lambda: reverse(name, urlconf, kwargs={'pk': 42})
+    else:
+        pks = iter(range(1, number + 1))
+        stmt = lambda: reverse(name, urlconf, kwargs={'pk': next(pks)})
+    seconds = timeit.Timer(stmt).timeit(number)
+    return seconds / number * 1e6
+
+
+def main():
+    parser = OptionParser(usage='%prog [--routes=1000,2000,5000] [--number=N]')
+    parser.add_option('--routes', default='1000,2000,5000',
+                      help='comma-separated numbers of routes')
+    parser.add_option('--number', type='int', default=200,
+                      help='number of calls timed per case')
+    options, args = parser.parse_args()
+
+    print('%8s  %-12s %12s %12s' % ('routes', 'path', 'linear (us)', 'indexed (us)'))
+    for num_routes in [int(n) for n in options.routes.split(',')]:
+        patterns = make_patterns(num_routes)
+        last = num_routes // 5 - 1
+        for label, path in [('first', '/section0/42/edit/'),
+                            ('middle', '/section%d/42/edit/' % (last // 2)),
+                            ('last', '/section%d/42/edit/' % last)]:
+            linear = time_resolve(LinearResolver(r'^/', patterns), path, options.number)
+            indexed = time_resolve(RegexURLResolver(r'^/', patterns), path, options.number)
+            print('%8d  %-12s %12.1f %12.1f' % (num_routes, label, linear, indexed))
+
+    print('')
+    print('%8s  %-12s %12s %12s' % ('routes', 'name', 'unique (us)', 'repeated (us)'))
+    for num_routes in [int(n) for n in options.routes.split(',')]:
+        urlconf = make_urlconf(make_patterns(num_routes))
+        last = num_routes // 5 - 1
+        for label, name in [('first', 'section0-edit'),
+                            ('middle', 'section%d-edit' % (last // 2)),
+                            ('last', 'section%d-edit' % last)]:
+            unique = time_reverse(urlconf, name, options.number, memoized=False)
+            repeated = time_reverse(urlconf, name, options.number, memoized=True)
+            print('%8d  %-12s %12.1f %12.1f' % (num_routes, label, unique, repeated))
+
+
+if __name__ == '__main__':
+    main()
@@ -351,3 +351,94 @@ class FastDeleteTests(TestCase):
         self.assertNumQueries(2, p.delete)
         self.assertFalse(Parent.objects.exists())
         self.assertFalse(Child.objects.exists())
+
+
+class ChunkedDeleteTests(TestCase):
+    def setUp(self):
+        self.DEFAULT = get_default_r()
+        self.chunks = []
+
+    def progress(self, model, count, elapsed):
+        self.assertTrue(elapsed >= 0)
+        self.chunks.append((model, count))
+
+    def create_tree(self, n):
+        for i in xrange(n):
+            r = R.objects.create()
+            for j in xrange(3):
+                s = S.objects.create(r=r)
+                T.objects.create(s=s)
+        return R.objects.exclude(pk=self.DEFAULT.pk)
+
+    def test_cascade(self):
+        deleted = []
+        def log_delete(sender, instance, **kwargs):
+            deleted.append(sender)
+        # The receiver prevents fast-deletes of S and T.
+        models.signals.pre_delete.connect(log_delete)
+        try:
+            self.create_tree(5)
+            R.objects.exclude(pk=self.DEFAULT.pk).delete(chunk_size=2,
+                                                         progress=self.progress)
+        finally:
+            models.signals.pre_delete.disconnect(log_delete)
+        self.assertEqual(R.objects.count(), 1)
+        self.assertFalse(S.objects.exists())
+        self.assertFalse(T.objects.exists())
+        self.assertEqual(deleted.count(R), 5)
+        self.assertEqual(deleted.count(S), 15)
+        self.assertEqual(deleted.count(T), 15)
+        for model, count in self.chunks:
+            self.assertTrue(count <= 2)
+        self.assertEqual([count for model, count in self.chunks if model is R],
+                         [2, 2, 1])
+        self.assertEqual(sum(count for model, count in self.chunks if model is S), 15)
+        # The objects cascading from a chunk are deleted first.
+        self.assertEqual(self.chunks[-1], (R, 1))
+        self.assertEqual(self.chunks[0][0], T)
+
+    def test_fast_delete(self):
+        self.create_tree(3)
+        for i in xrange(5):
+            User.objects.create()
+        User.objects.all().delete(chunk_size=2, progress=self.progress)
+        self.assertFalse(User.objects.exists())
+        self.assertEqual(self.chunks, [(User, 2), (User, 2), (User, 1)])
+
+        self.chunks = []
+        R.objects.exclude(pk=self.DEFAULT.pk).delete(chunk_size=2,
+                                                     progress=self.progress)
+        self.assertFalse(T.objects.exists())
+        self.assertEqual(R.objects.count(), 1)
+        self.assertEqual([count for model, count in self.chunks if model is R],
+                         [2, 1])
+
+    def test_on_delete(self):
+        a = create_a('on_delete')
+        pks = [a.auto_id, a.setvalue_id, a.setnull_id, a.setdefault_id,
+               a.setdefault_none_id, a.donothing_id, a.o2o_setnull_id,
+               a.child_setnull_id]
+        R.objects.filter(pk__in=pks).exclude(pk=a.auto_id).delete(chunk_size=3)
+        a = A.objects.get(pk=a.pk)
+        self.assertEqual(a.setvalue, self.DEFAULT)
+        self.assertEqual(a.setnull, None)
+        self.assertEqual(a.setdefault, self.DEFAULT)
+        self.assertEqual(a.setdefault_none, None)
+        self.assertEqual(a.o2o_setnull, None)
+        self.assertEqual(a.child_setnull, None)
+        self.assertFalse(RChild.objects.filter(pk__in=pks).exists())
+
+        self.assertRaises(IntegrityError, R.objects.filter(pk=a.protect_id).delete,
+                          chunk_size=3)
+        R.objects.filter(pk__in=[a.auto_id, a.cascade_id]).delete(chunk_size=1)
+        self.assertFalse(A.objects.exists())
+
+    def test_inheritance(self):
+        children = [RChild.objects.create() for i in xrange(3)]
+        RChild.objects.all().delete(chunk_size=2, progress=self.progress)
+        self.assertFalse(R.objects.filter(pk__in=[c.pk for c in children]).exists())
+        self.assertEqual(self.chunks, [(RChild, 2), (RChild, 1)])
+
+        child = RChild.objects.create()
+        R.objects.filter(pk=child.pk).delete(chunk_size=2)
+        self.assertFalse(RChild.objects.exists())
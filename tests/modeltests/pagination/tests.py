@@ -2,7 +2,10 @@ from __future__ import absolute_import, unicode_literals
 
 from datetime import datetime
 
-from django.core.paginator import Paginator, InvalidPage, EmptyPage
+from django.core.cache import cache
+from django.core.paginator import (Paginator, InvalidPage, EmptyPage,
+    CursorPaginator, InvalidCursor, CachedCount, EstimatedCount)
+from django.db import connection
 from django.test import TestCase
 from django.utils import six
 
@@ -132,3 +135,143 @@ class PaginationTests(TestCase):
         self.assertEqual(42, paginator.count)
         self.assertEqual(5, paginator.num_pages)
         self.assertEqual([1, 2, 3, 4, 5], list(paginator.page_range))
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        # Several articles share a pub_date, so that the primary key breaks
+        # the ties.
+        for x in range(1, 10):
+            Article.objects.create(headline='Article %s' % x,
+                                   pub_date=datetime(2005, 7, 29 - x // 3))
+
+    def headlines(self, page):
+        return [a.headline for a in page]
+
+    def test_forward_and_backward(self):
+        paginator = CursorPaginator(Article.objects.all(), 4, ordering=['pub_date'])
+        self.assertEqual(paginator.ordering, ['pub_date', 'id'])
+        with self.assertNumQueries(1):
+            page = paginator.page()
+        self.assertEqual(self.headlines(page),
+                         ['Article 9', 'Article 6', 'Article 7', 'Article 8'])
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+        self.assertIsNone(page.previous_cursor())
+
+        with self.assertNumQueries(1):
+            page = paginator.page(page.next_cursor())
+        self.assertEqual(self.headlines(page),
+                         ['Article 3', 'Article 4', 'Article 5', 'Article 1'])
+        self.assertTrue(page.has_next())
+        self.assertTrue(page.has_previous())
+
+        last = paginator.page(page.next_cursor())
+        self.assertEqual(self.headlines(last), ['Article 2'])
+        self.assertFalse(last.has_next())
+        self.assertIsNone(last.next_cursor())
+
+        page = paginator.page(last.previous_cursor())
+        self.assertEqual(self.headlines(page),
+                         ['Article 3', 'Article 4', 'Article 5', 'Article 1'])
+        page = paginator.page(page.previous_cursor())
+        self.assertEqual(self.headlines(page),
+                         ['Article 9', 'Article 6', 'Article 7', 'Article 8'])
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def test_descending(self):
+        paginator = CursorPaginator(Article.objects.order_by('-pub_date'), 5)
+        self.assertEqual(paginator.ordering, ['-pub_date', '-id'])
+        page = paginator.page()
+        self.assertEqual(self.headlines(page),
+                         ['Article 2', 'Article 1', 'Article 5', 'Article 4', 'Article 3'])
+        page = paginator.page(page.next_cursor())
+        self.assertEqual(self.headlines(page),
+                         ['Article 8', 'Article 7', 'Article 6', 'Article 9'])
+        self.assertFalse(page.has_next())
+
+    def test_mixed_directions(self):
+        paginator = CursorPaginator(Article.objects.all(), 3,
+                                    ordering=['-pub_date', 'headline'])
+        pages = []
+        page = paginator.page()
+        while True:
+            pages.append(self.headlines(page))
+            if not page.has_next():
+                break
+            page = paginator.page(page.next_cursor())
+        self.assertEqual(pages, [
+            ['Article 1', 'Article 2', 'Article 3'],
+            ['Article 4', 'Article 5', 'Article 6'],
+            ['Article 7', 'Article 8', 'Article 9'],
+        ])
+
+    def test_invalid_cursors(self):
+        paginator = CursorPaginator(Article.objects.all(), 4)
+        cursor = paginator.page().next_cursor()
+        self.assertRaises(InvalidCursor, paginator.page, cursor + 'x')
+        self.assertRaises(InvalidPage, paginator.page, 'garbage')
+        # Cursors can't be used with another paginator.
+        other = CursorPaginator(Article.objects.all(), 4, salt='other')
+        self.assertRaises(InvalidCursor, other.page, cursor)
+        self.assertRaises(ValueError, CursorPaginator, Article.objects.all(), 4,
+                          ordering=['?'])
+
+    def test_empty(self):
+        paginator = CursorPaginator(Article.objects.none(), 4)
+        page = paginator.page()
+        self.assertEqual(len(page), 0)
+        self.assertFalse(page.has_other_pages())
+        self.assertIsNone(page.next_cursor())
+
+
+class CountStrategyTests(TestCase):
+    def setUp(self):
+        for x in range(1, 10):
+            Article.objects.create(headline='Article %s' % x,
+                                   pub_date=datetime(2005, 7, 29))
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_estimated_count(self):
+        tables = []
+        def estimated_row_count(table_name):
+            tables.append(table_name)
+            return 1000
+        connection.ops.estimated_row_count = estimated_row_count
+        try:
+            strategy = EstimatedCount()
+            with self.assertNumQueries(0):
+                paginator = Paginator(Article.objects.all(), 5, count_strategy=strategy)
+                self.assertEqual(paginator.count, 1000)
+            self.assertEqual(tables, [Article._meta.db_table])
+            # Filtered querysets are counted exactly.
+            qs = Article.objects.filter(headline__startswith='Article')
+            self.assertEqual(strategy.count(qs), 9)
+            self.assertEqual(strategy.count(list(range(4))), 4)
+            # So are small tables.
+            self.assertEqual(EstimatedCount(threshold=2000).count(Article.objects.all()), 9)
+        finally:
+            del connection.ops.estimated_row_count
+        # Without statistics, counts are exact.
+        self.assertEqual(EstimatedCount(threshold=0).count(Article.objects.all()), 9)
+
+    def test_cached_count(self):
+        strategy = CachedCount(timeout=60)
+        with self.assertNumQueries(1):
+            self.assertEqual(strategy.count(Article.objects.all()), 9)
+        Article.objects.create(headline='Article 10', pub_date=datetime(2005, 7, 29))
+        with self.assertNumQueries(0):
+            paginator = Paginator(Article.objects.all(), 5, count_strategy=strategy)
+            self.assertEqual(paginator.count, 9)
+            self.assertEqual(paginator.num_pages, 2)
+        # Querysets with different filters have different counts.
+        with self.assertNumQueries(1):
+            qs = Article.objects.filter(headline__in=['Article 1', 'Article 2'])
+            self.assertEqual(strategy.count(qs), 2)
+        # Empty querysets and lists aren't cached.
+        with self.assertNumQueries(0):
+            self.assertEqual(strategy.count(Article.objects.none()), 0)
+            self.assertEqual(strategy.count([1, 2]), 2)
@@ -2,6 +2,8 @@ from __future__ import absolute_import, unicode_literals
 
 from django.contrib.contenttypes.models import ContentType
 from django.db import connection
+from django.db.models import Prefetch
+from django.db.models.query import get_prefetch_batch_size
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.utils import six
@@ -608,3 +610,116 @@ class MultiDbTests(TestCase):
             ages = ", ".join(str(a.authorwithage.age) for a in A.prefetch_related('authorwithage'))
 
         self.assertEqual(ages, "50, 49")
+
+
+class CustomPrefetchTests(TestCase):
+
+    def setUp(self):
+        self.book1 = Book.objects.create(title="Poems")
+        self.book2 = Book.objects.create(title="Jane Eyre")
+        self.book3 = Book.objects.create(title="Wuthering Heights")
+
+        self.author1 = Author.objects.create(name="Charlotte",
+                                             first_book=self.book1)
+        self.author2 = Author.objects.create(name="Anne",
+                                             first_book=self.book1)
+        self.author3 = Author.objects.create(name="Emily",
+                                             first_book=self.book2)
+
+        self.book1.authors.add(self.author1, self.author2, self.author3)
+        self.book2.authors.add(self.author1)
+        self.book3.authors.add(self.author3)
+
+        self.house1 = House.objects.create(address="123 Main St")
+        self.house2 = House.objects.create(address="45 Side St")
+        self.room1 = Room.objects.create(name="Kitchen", house=self.house1)
+        self.room2 = Room.objects.create(name="Dining room", house=self.house1)
+        self.room3 = Room.objects.create(name="Lounge", house=self.house2)
+        self.person1 = Person.objects.create(name="Joe")
+        self.person2 = Person.objects.create(name="Mary")
+        self.person1.houses.add(self.house1, self.house2)
+        self.person2.houses.add(self.house2)
+
+    def test_m2m_custom_queryset(self):
+        with self.assertNumQueries(2):
+            books = Book.objects.prefetch_related(
+                Prefetch('authors', queryset=Author.objects.filter(name__startswith="C")))
+            authors = [[a.name for a in b.authors.all()] for b in books]
+        self.assertEqual(authors, [["Charlotte"], ["Charlotte"], []])
+
+    def test_reverse_fk_to_attr(self):
+        with self.assertNumQueries(2):
+            houses = House.objects.prefetch_related(
+                Prefetch('rooms', queryset=Room.objects.filter(name__contains="room"),
+                         to_attr='some_rooms'))
+            rooms = [[r.name for r in h.some_rooms] for h in houses]
+        self.assertEqual(rooms, [["Dining room"], []])
+        # The related manager isn't affected.
+        with self.assertNumQueries(1):
+            self.assertEqual(len(houses[0].rooms.all()), 2)
+
+    def test_forward_fk_to_attr(self):
+        with self.assertNumQueries(2):
+            authors = Author.objects.prefetch_related(
+                Prefetch('first_book', queryset=Book.objects.only('title'),
+                         to_attr='debut'))
+            titles = [a.debut.title for a in authors]
+        self.assertEqual(sorted(titles), ["Jane Eyre", "Poems", "Poems"])
+
+    def test_traverse_to_attr(self):
+        with self.assertNumQueries(3):
+            people = Person.objects.prefetch_related(
+                Prefetch('houses', queryset=House.objects.filter(address__contains="Side"),
+                         to_attr='side_houses'),
+                'side_houses__rooms')
+            rooms = [[r.name for h in p.side_houses for r in h.rooms.all()]
+                     for p in people]
+        self.assertEqual(rooms, [["Lounge"], ["Lounge"]])
+
+    def test_nested_prefetch_in_queryset(self):
+        with self.assertNumQueries(3):
+            people = Person.objects.prefetch_related(
+                Prefetch('houses', queryset=House.objects.prefetch_related('rooms')))
+            rooms = [[r.name for h in p.houses.all() for r in h.rooms.all()]
+                     for p in people]
+        self.assertEqual(rooms, [["Kitchen", "Dining room", "Lounge"], ["Lounge"]])
+
+    def test_invalid_querysets(self):
+        self.assertRaises(ValueError, Prefetch, 'authors',
+                          queryset=Author.objects.values('name'))
+        with self.assertRaises(ValueError):
+            list(Book.objects.prefetch_related(
+                'authors', Prefetch('authors', queryset=Author.objects.all())))
+        TaggedItem.objects.create(tag="great", content_object=self.book1)
+        with self.assertRaises(ValueError):
+            list(TaggedItem.objects.prefetch_related(
+                Prefetch('content_object', queryset=Book.objects.all())))
+
+
+class PrefetchBatchTests(TestCase):
+
+    def setUp(self):
+        self.houses = [House.objects.create(address="House %d" % i) for i in range(5)]
+        for house in self.houses:
+            Room.objects.create(name="Room of %s" % house.address, house=house)
+
+    def test_batches(self):
+        ops = connection.ops
+        ops.max_in_list_size = lambda: 2
+        try:
+            with self.assertNumQueries(4):
+                houses = list(House.objects.prefetch_related('rooms'))
+        finally:
+            del ops.max_in_list_size
+        self.assertEqual([[r.name for r in h.rooms.all()] for h in houses],
+                         [["Room of %s" % h.address] for h in self.houses])
+
+    def test_query_params_limit(self):
+        House.objects.bulk_create([House(address="Flat %d" % i) for i in range(1200)],
+                                  batch_size=100)
+        batch_size = get_prefetch_batch_size(connection) or 1205
+        with self.assertNumQueries(1 + (1205 + batch_size - 1) // batch_size):
+            houses = list(House.objects.prefetch_related('rooms'))
+        self.assertEqual(len(houses), 1205)
+        with self.assertNumQueries(0):
+            self.assertEqual(sum(len(h.rooms.all()) for h in houses), 5)
@@ -1,7 +1,7 @@
 from __future__ import absolute_import
 
 from django.contrib import admin
-from django.core.paginator import Paginator
+from django.core.paginator import Paginator, ExactCount
 
 from .models import (Event, Child, Parent, Genre, Band, Musician, Group,
     Quartet, Membership, ChordsMusician, ChordsBand, Invitation, Swallow)
@@ -41,6 +41,20 @@ class CustomPaginationAdmin(ChildAdmin):
     paginator = CustomPaginator
 
 
+class RecordingCount(ExactCount):
+    def __init__(self):
+        self.counted = []
+
+    def count(self, object_list):
+        self.counted.append(object_list)
+        return super(RecordingCount, self).count(object_list)
+
+
+class CountStrategyChildAdmin(ChildAdmin):
+    list_filter = ['name']
+    count_strategy = RecordingCount()
+
+
 class FilteredChildAdmin(admin.ModelAdmin):
     list_display = ['name', 'parent']
     list_per_page = 10
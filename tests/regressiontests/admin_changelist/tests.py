@@ -17,7 +17,7 @@ from .admin import (ChildAdmin, QuartetAdmin, BandAdmin, ChordsBandAdmin,
     GroupAdmin, ParentAdmin, DynamicListDisplayChildAdmin,
     DynamicListDisplayLinksChildAdmin, CustomPaginationAdmin,
     FilteredChildAdmin, CustomPaginator, site as custom_site,
-    SwallowAdmin)
+    SwallowAdmin, CountStrategyChildAdmin)
 from .models import (Event, Child, Parent, Genre, Band, Musician, Group,
     Quartet, Membership, ChordsMusician, ChordsBand, Invitation, Swallow,
     UnorderedObject, OrderedObject)
@@ -164,6 +164,23 @@ class ChangeListTests(TestCase):
         cl.get_results(request)
         self.assertIsInstance(cl.paginator, CustomPaginator)
 
+    def test_count_strategy(self):
+        parent = Parent.objects.create(name='parent')
+        for i in range(15):
+            Child.objects.create(name='name %s' % (i % 3), parent=parent)
+
+        m = CountStrategyChildAdmin(Child, admin.site)
+        m.count_strategy.counted = []
+        request = self.factory.get('/child/', data={'name': 'name 1'})
+        cl = ChangeList(request, Child, m.list_display, m.list_display_links,
+                m.list_filter, m.date_hierarchy, m.search_fields,
+                m.list_select_related, m.list_per_page, m.list_max_show_all,
+                m.list_editable, m)
+        self.assertIs(cl.paginator.count_strategy, m.count_strategy)
+        self.assertEqual((cl.result_count, cl.full_result_count), (5, 15))
+        # Both the filtered and the full counts go through the strategy.
+        self.assertEqual(len(m.count_strategy.counted), 2)
+
     def test_distinct_for_m2m_in_list_filter(self):
         """
         Regression test for #13902: When using a ManyToMany in list_filter,
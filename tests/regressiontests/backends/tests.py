@@ -3,6 +3,9 @@
 from __future__ import absolute_import, unicode_literals
 
 import datetime
+import os
+import shutil
+import tempfile
 import threading
 
 from django.conf import settings
@@ -10,6 +13,7 @@ from django.core.management.color import no_style
 from django.core.exceptions import ImproperlyConfigured
 from django.db import (backend, connection, connections, DEFAULT_DB_ALIAS,
     IntegrityError, transaction)
+from django.db.backends.pool import ConnectionPool, PoolTimeout, pools
 from django.db.backends.signals import connection_created
 from django.db.backends.postgresql_psycopg2 import version as pg_version
 from django.db.utils import ConnectionHandler, DatabaseError, load_backend
@@ -666,6 +670,132 @@ class ThreadTests(TestCase):
         self.assertEqual(len(exceptions), 0)
 
 
+class ConnectionPoolTests(unittest.TestCase):
+    """
+    Connection pooling, exercised against file-based SQLite databases.
+    """
+    alias = 'pooled'
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.handler = self.get_handler()
+
+    def tearDown(self):
+        pools.discard(self.alias)
+        shutil.rmtree(self.dirname)
+
+    def get_handler(self, **options):
+        pool = {'MAX_SIZE': 2, 'TIMEOUT': 0.1}
+        pool.update(options)
+        return ConnectionHandler({self.alias: {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(self.dirname, 'pooled.db'),
+            'POOL': pool,
+        }})
+
+    def test_connection_reused_after_close(self):
+        conn = self.handler[self.alias]
+        conn.cursor()
+        raw = conn.connection
+        conn.close()
+        self.assertTrue(conn.connection is None)
+        conn.cursor()
+        self.assertTrue(conn.connection is raw)
+        conn.close()
+        stats = conn.pool.stats()
+        self.assertEqual(stats['opened'], 1)
+        self.assertEqual(stats['reused'], 1)
+        self.assertEqual(stats['idle'], 1)
+
+    def test_connection_shared_across_threads(self):
+        conn = self.handler[self.alias]
+        conn.cursor()
+        raw = conn.connection
+        conn.close()
+        seen = []
+        def runner():
+            other = self.get_handler()[self.alias]
+            other.cursor()
+            seen.append(other.connection)
+            other.close()
+        t = threading.Thread(target=runner)
+        t.start()
+        t.join()
+        self.assertEqual(seen, [raw])
+
+    def test_pending_transaction_rolled_back(self):
+        conn = self.handler[self.alias]
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE pool_test (x INTEGER)")
+        conn._commit()
+        cursor.execute("INSERT INTO pool_test VALUES (1)")
+        conn.close()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM pool_test")
+        self.assertEqual(cursor.fetchone()[0], 0)
+        conn.close()
+
+    def test_max_age(self):
+        self.handler = self.get_handler(MAX_AGE=0)
+        conn = self.handler[self.alias]
+        conn.cursor()
+        raw = conn.connection
+        conn.close()
+        conn.cursor()
+        self.assertFalse(conn.connection is raw)
+        conn.close()
+        stats = conn.pool.stats()
+        self.assertEqual(stats['opened'], 2)
+        self.assertEqual(stats['discarded'], 2)
+        self.assertEqual(stats['size'], 0)
+
+    def test_health_check(self):
+        self.handler = self.get_handler(HEALTH_CHECK=True)
+        conn = self.handler[self.alias]
+        conn.cursor()
+        raw = conn.connection
+        conn.close()
+        # Break the idle connection behind the pool's back.
+        raw.close()
+        conn.cursor()
+        self.assertFalse(conn.connection is raw)
+        conn.cursor().execute("SELECT 1")
+        conn.close()
+        self.assertEqual(conn.pool.stats()['discarded'], 1)
+
+    def test_checkout_timeout(self):
+        first = self.handler[self.alias]
+        second = self.get_handler()[self.alias]
+        third = self.get_handler()[self.alias]
+        first.cursor()
+        second.cursor()
+        self.assertRaises(PoolTimeout, third.cursor)
+        stats = first.pool.stats()
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['waits'], 1)
+        self.assertTrue(stats['max_wait_time'] >= 0.1)
+        # A connection handed back makes room for the waiting wrapper.
+        first.close()
+        third.cursor()
+        self.assertEqual(first.pool.stats()['reused'], 1)
+        second.close()
+        third.close()
+
+    def test_pool_disabled(self):
+        handler = ConnectionHandler({'unpooled': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(self.dirname, 'unpooled.db'),
+        }})
+        conn = handler['unpooled']
+        self.assertTrue(conn.pool is None)
+        conn.cursor()
+        conn.close()
+        self.assertFalse('unpooled' in pools)
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, ConnectionPool, 'invalid', max_size=0)
+
+
 class MySQLPKZeroTests(TestCase):
     """
     Zero as id for AutoField should raise exception in MySQL, because MySQL
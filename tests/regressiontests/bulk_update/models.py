@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class Project(models.Model):
+    name = models.CharField(max_length=100)
+
+
+class Task(models.Model):
+    name = models.CharField(max_length=100)
+    done = models.BooleanField(default=False)
+    deadline = models.DateField(null=True)
+    project = models.ForeignKey(Project, null=True)
+
+
+class Chore(Task):
+    room = models.CharField(max_length=100)
@@ -0,0 +1,88 @@
+from __future__ import absolute_import
+
+import datetime
+from operator import attrgetter
+
+from django.core.exceptions import FieldError
+from django.test import TestCase
+
+from .models import Chore, Project, Task
+
+
+class BulkUpdateTests(TestCase):
+    def setUp(self):
+        self.tasks = [Task.objects.create(name="task %d" % i) for i in range(10)]
+
+    def test_simple(self):
+        for i, task in enumerate(self.tasks):
+            task.done = i % 2 == 0
+            task.deadline = datetime.date(2012, 10, i + 1)
+        with self.assertNumQueries(1):
+            rows = Task.objects.bulk_update(self.tasks, ['done', 'deadline'])
+        self.assertEqual(rows, 10)
+        self.assertQuerysetEqual(Task.objects.filter(done=True).order_by('pk'),
+            [t.name for t in self.tasks[::2]], attrgetter('name'))
+        self.assertEqual(
+            [t.deadline for t in Task.objects.order_by('pk')],
+            [datetime.date(2012, 10, i + 1) for i in range(10)])
+
+    def test_null_and_foreign_key(self):
+        projects = [Project.objects.create(name="p%d" % i) for i in range(2)]
+        self.tasks[0].project = projects[0]
+        self.tasks[1].project = projects[1]
+        self.tasks[2].deadline = datetime.date(2012, 10, 10)
+        Task.objects.bulk_update(self.tasks[:3], ['project', 'deadline'])
+        self.assertEqual(Task.objects.get(pk=self.tasks[0].pk).project, projects[0])
+        self.assertEqual(Task.objects.get(pk=self.tasks[1].pk).project, projects[1])
+        task = Task.objects.get(pk=self.tasks[2].pk)
+        self.assertEqual(task.project, None)
+        self.assertEqual(task.deadline, datetime.date(2012, 10, 10))
+
+    def test_only_given_objects_and_fields(self):
+        for task in self.tasks:
+            task.name = "renamed"
+            task.done = True
+        Task.objects.bulk_update(self.tasks[:5], ['done'])
+        self.assertEqual(Task.objects.filter(done=True).count(), 5)
+        self.assertEqual(Task.objects.filter(name="renamed").count(), 0)
+
+    def test_batch_size(self):
+        for task in self.tasks:
+            task.done = True
+        with self.assertNumQueries(4):
+            Task.objects.bulk_update(self.tasks, ['done'], batch_size=3)
+        self.assertEqual(Task.objects.filter(done=True).count(), 10)
+
+    def test_large_batch(self):
+        tasks = [Task.objects.create(name="") for i in range(1001)]
+        for i, task in enumerate(tasks):
+            task.name = "task %d" % i
+        self.assertEqual(Task.objects.bulk_update(tasks, ['name', 'done']), 1001)
+        self.assertEqual(Task.objects.filter(name__startswith="task ").count(), 1011)
+
+    def test_queryset_filters_apply(self):
+        for task in self.tasks:
+            task.done = True
+        rows = Task.objects.filter(name="task 1").bulk_update(self.tasks, ['done'])
+        self.assertEqual(rows, 1)
+        self.assertEqual(list(Task.objects.filter(done=True)), [self.tasks[1]])
+
+    def test_inherited_fields(self):
+        chores = [Chore.objects.create(name="chore %d" % i, room="hall")
+                  for i in range(3)]
+        for chore in chores:
+            chore.done = True
+            chore.room = "kitchen"
+        Chore.objects.bulk_update(chores, ['done', 'room'])
+        self.assertEqual(Chore.objects.filter(done=True, room="kitchen").count(), 3)
+        self.assertEqual(Task.objects.filter(done=True).count(), 3)
+
+    def test_empty(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(Task.objects.bulk_update([], ['done']), 0)
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, Task.objects.bulk_update, self.tasks, [])
+        self.assertRaises(FieldError, Task.objects.bulk_update, self.tasks, ['id'])
+        self.assertRaises(ValueError, Task.objects.bulk_update,
+                          [Task(name="unsaved")], ['name'])
@@ -0,0 +1,130 @@
+"""
+A memcached server speaking the text protocol, keeping its data in memory, to
+test memcached clients without a real server.
+"""
+from __future__ import unicode_literals
+
+import socket
+import threading
+import time
+
+from django.utils.six.moves import socketserver
+
+
+class FakeMemcachedHandler(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # A small send buffer, so that clients sending many commands without
+        # reading the replies block quickly, as they would with larger
+        # batches on a real server.
+        self.request.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        socketserver.StreamRequestHandler.setup(self)
+
+    def handle(self):
+        server = self.server.memcached
+        with server.lock:
+            server.connections.append(self.request)
+        while True:
+            try:
+                line = self.rfile.readline()
+            except socket.error:
+                return
+            if not line:
+                return
+            reply = server.execute(line.split(), self.rfile)
+            try:
+                self.wfile.write(reply)
+                self.wfile.flush()
+            except socket.error:
+                return
+
+
+class FakeMemcachedServer(object):
+    """
+    Listens on a local port until stop() is called. The commands received,
+    with their keys, are recorded in ``commands``, and the connections in
+    ``connections``.
+    """
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self.connections = []
+        self.lock = threading.Lock()
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), FakeMemcachedHandler)
+        self.server.daemon_threads = True
+        self.server.memcached = self
+        self.address = '127.0.0.1:%d' % self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        with self.lock:
+            for connection in self.connections:
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except socket.error:
+                    pass
+                connection.close()
+
+    def _expires(self, exptime):
+        exptime = int(exptime)
+        if exptime == 0:
+            return None
+        if exptime > 60 * 60 * 24 * 30:
+            return exptime
+        return time.time() + exptime
+
+    def _get(self, key):
+        item = self.data.get(key)
+        if item is not None and item[2] is not None and item[2] <= time.time():
+            del self.data[key]
+            item = None
+        return item
+
+    def execute(self, parts, rfile):
+        command, args = parts[0].decode('ascii'), parts[1:]
+        with self.lock:
+            self.commands.append((command, args))
+            if command == 'get':
+                reply = []
+                for key in args:
+                    item = self._get(key)
+                    if item is not None:
+                        reply.append(b'VALUE ' + key + (' %d %d\r\n' % (item[0], len(item[1]))).encode('ascii'))
+                        reply.append(item[1] + b'\r\n')
+                reply.append(b'END\r\n')
+                return b''.join(reply)
+            if command in ('set', 'add'):
+                key, flags, exptime, length = args[0], int(args[1]), args[2], int(args[3])
+                data = rfile.read(length + 2)[:-2]
+                if command == 'add' and self._get(key) is not None:
+                    return b'NOT_STORED\r\n'
+                self.data[key] = (flags, data, self._expires(exptime))
+                return b'STORED\r\n'
+            if command == 'delete':
+                if self._get(args[0]) is None:
+                    return b'NOT_FOUND\r\n'
+                del self.data[args[0]]
+                return b'DELETED\r\n'
+            if command in ('incr', 'decr'):
+                item = self._get(args[0])
+                if item is None:
+                    return b'NOT_FOUND\r\n'
+                try:
+                    value = int(item[1])
+                except ValueError:
+                    return b'CLIENT_ERROR cannot increment or decrement non-numeric value\r\n'
+                if command == 'incr':
+                    value += int(args[1])
+                else:
+                    value = max(value - int(args[1]), 0)
+                self.data[args[0]] = (item[0], str(value).encode('ascii'), item[2])
+                return str(value).encode('ascii') + b'\r\n'
+            if command == 'flush_all':
+                self.data.clear()
+                return b'OK\r\n'
+            return b'ERROR\r\n'
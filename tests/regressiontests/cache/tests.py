@@ -8,8 +8,10 @@ import hashlib
 import os
 import random
 import re
+import shutil
 import string
 import tempfile
+import threading
 import time
 import warnings
 
@@ -18,6 +20,8 @@ from django.core import management
 from django.core.cache import get_cache
 from django.core.cache.backends.base import (CacheKeyWarning,
     InvalidCacheBackendError)
+from django.core.cache.backends.filebased import sqlite3
+from django.core.cache.backends.memcached import ConsistentHashRing
 from django.db import router
 from django.http import HttpResponse, HttpRequest, QueryDict
 from django.middleware.cache import (FetchFromCacheMiddleware,
@@ -32,6 +36,7 @@ from django.utils.cache import (patch_vary_headers, get_cache_key,
 from django.utils.encoding import force_text
 from django.views.decorators.cache import cache_page
 
+from .fake_memcached import FakeMemcachedServer
 from .models import Poll, expensive_calculation
 
 # functions/classes for complex data type tests
@@ -819,6 +824,54 @@ class DBCacheTests(BaseCacheTests, TransactionTestCase):
         self.cache = get_cache('db://%s?max_entries=30&cull_frequency=0' % self._table_name)
         self.perform_cull_test(50, 18)
 
+    def test_cull_probability(self):
+        # Caches no larger than the default MAX_ENTRIES are checked on every
+        # write by default.
+        self.assertEqual(get_cache(self.backend_name, LOCATION=self._table_name)._cull_probability, 1.0)
+        self.assertEqual(get_cache(self.backend_name, LOCATION=self._table_name, OPTIONS={'MAX_ENTRIES': 3000})._cull_probability, 0.1)
+        self.cache = get_cache(self.backend_name, LOCATION=self._table_name, OPTIONS={'MAX_ENTRIES': 30, 'CULL_PROBABILITY': 0})
+        self.perform_cull_test(50, 49)
+        self.cache = get_cache(self.backend_name, LOCATION=self._table_name, OPTIONS={'MAX_ENTRIES': 30, 'CULL_PROBABILITY': 1})
+        # The first check culls the overflowing cache.
+        self.cache.set('cull', 'value')
+        keys = ['cull'] + ['cull%d' % i for i in range(1, 50)]
+        self.assertEqual(len(self.cache.get_many(keys)), 34)
+
+    def test_batched_queries(self):
+        from django.db import connection
+        cache = get_cache(self.backend_name, LOCATION=self._table_name, OPTIONS={'CULL_PROBABILITY': 0})
+        data = dict(('key%d' % i, i) for i in range(500))
+        # Upserts need a single query per batch, other backends a DELETE and
+        # an INSERT per entry.
+        if connection.ops.cache_upsert_sql(1) is not None:
+            num_queries = len(cache._batches(connection, list(data), 3))
+            with self.assertNumQueries(num_queries):
+                cache.set_many(data)
+        else:
+            cache.set_many(data)
+        num_queries = len(cache._batches(connection, list(data), 1))
+        with self.assertNumQueries(num_queries):
+            self.assertEqual(cache.get_many(data), data)
+        with self.assertNumQueries(num_queries):
+            cache.delete_many(data)
+        self.assertEqual(cache.get_many(data), {})
+
+    def test_set_many_replaces(self):
+        self.cache.set_many({'a': 1, 'b': 2})
+        self.cache.set_many({'b': 3, 'c': 4})
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 3, 'c': 4})
+
+    def test_get_many_expired(self):
+        self.cache.set_many({'a': 1, 'b': 2}, 1)
+        self.cache.set('c', 3)
+        time.sleep(2)
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'c': 3})
+        # Expired entries are deleted.
+        from django.db import connection
+        cursor = connection.cursor()
+        cursor.execute('SELECT COUNT(*) FROM %s' % connection.ops.quote_name(self._table_name))
+        self.assertEqual(cursor.fetchone()[0], 1)
+
     def test_second_call_doesnt_crash(self):
         with six.assertRaisesRegex(self, management.CommandError,
                 "Cache table 'test cache table' could not be created"):
@@ -931,6 +984,53 @@ class LocMemCacheTests(unittest.TestCase, BaseCacheTests):
         self.cache.decr(key)
         self.assertEqual(expire, self.cache._expire_info[_key])
 
+    def test_lru_cull(self):
+        self.cache.reset_stats()
+        for i in range(30):
+            self.cache.set('key%d' % i, i)
+        # Reading key0 makes key1 to key10 the least recently used keys.
+        self.assertEqual(self.cache.get('key0'), 0)
+        self.cache.set('key30', 30)
+        self.assertEqual(self.cache.get('key0'), 0)
+        for i in range(1, 11):
+            self.assertFalse(self.cache.has_key('key%d' % i))
+        for i in range(11, 31):
+            self.assertTrue(self.cache.has_key('key%d' % i))
+        self.assertEqual(self.cache.stats()['evictions'], 10)
+
+    def test_lazy_expiry(self):
+        self.cache.set('expired', 'value', 0)
+        self.assertEqual(len(self.cache._cache), 1)
+        self.assertEqual(self.cache.get('expired'), None)
+        self.assertEqual(len(self.cache._cache), 0)
+        self.assertEqual(len(self.cache._expire_info), 0)
+
+    def test_stats(self):
+        self.cache.reset_stats()
+        self.cache.set('key', 'value')
+        self.cache.get('key')
+        self.cache.get('key')
+        self.cache.get('missing')
+        self.assertEqual(self.cache.stats(),
+                         {'hits': 2, 'misses': 1, 'evictions': 0, 'size': 1})
+        self.cache.reset_stats()
+        self.assertEqual(self.cache.stats()['hits'], 0)
+
+    def test_no_pickle(self):
+        cache = get_cache(self.backend_name, LOCATION='nopickle',
+                          OPTIONS={'PICKLE': False})
+        value = ('text', 42, None, frozenset([1.5]))
+        cache.set('immutable', value)
+        self.assertTrue(cache.get('immutable') is value)
+        # Mutable values are still copied.
+        mutable = [1, 2]
+        cache.set('mutable', mutable)
+        mutable.append(3)
+        self.assertEqual(cache.get('mutable'), [1, 2])
+        cache.set('count', 1)
+        self.assertEqual(cache.incr('count'), 2)
+        cache.clear()
+
 # memcached backend isn't guaranteed to be available.
 # To check the memcached backend, the test settings file will
 # need to contain at least one cache backend setting that points at
@@ -971,22 +1071,267 @@ class MemcachedCacheTests(unittest.TestCase, BaseCacheTests):
         self.assertRaises(Exception, self.cache.set, 'a' * 251, 'value')
 
 
+@override_settings(CACHES=dict(settings.CACHES, tiered_l2={
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'tiered-l2',
+}))
+class TieredCacheTests(TestCase, BaseCacheTests):
+    backend_name = 'django.core.cache.backends.tiered.TieredCache'
+
+    def setUp(self):
+        self.cache = get_cache(self.backend_name, LOCATION='tiered_l2')
+        self.prefix_cache = get_cache(self.backend_name, LOCATION='tiered_l2', KEY_PREFIX='cacheprefix')
+        self.v2_cache = get_cache(self.backend_name, LOCATION='tiered_l2', VERSION=2)
+        self.custom_key_cache = get_cache(self.backend_name, LOCATION='tiered_l2', KEY_FUNCTION=custom_key_func)
+        self.custom_key_cache2 = get_cache(self.backend_name, LOCATION='tiered_l2', KEY_FUNCTION='regressiontests.cache.tests.custom_key_func')
+        self.l2 = get_cache('tiered_l2')
+
+    def tearDown(self):
+        self.cache.clear()
+
+    def test_invalid_keys(self):
+        # Both tiers warn about keys refused by memcached.
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.cache.set('key with spaces', 'value')
+            self.assertTrue(len(w) > 0)
+            self.assertTrue(all(isinstance(warning.message, CacheKeyWarning) for warning in w))
+
+    def test_l1_hits(self):
+        self.cache.set('key', 'value')
+        self.cache.reset_stats()
+        # Values are read from L1, even if they change in L2.
+        self.l2.set('key', 'changed')
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.assertEqual(self.cache.get_many(['key', 'missing']), {'key': 'value'})
+        stats = self.cache.stats()
+        self.assertEqual((stats['l1_hits'], stats['l1_misses']), (2, 1))
+        self.assertEqual((stats['l2_hits'], stats['l2_misses']), (0, 1))
+        self.assertAlmostEqual(stats['l1_hit_ratio'], 2.0 / 3)
+        self.assertEqual(stats['l2_hit_ratio'], 0.0)
+        self.cache.reset_stats()
+        self.assertEqual(self.cache.stats()['l1_hit_ratio'], None)
+
+    def test_l1_timeout(self):
+        cache = get_cache(self.backend_name, LOCATION='tiered_l2', OPTIONS={'L1_TIMEOUT': 1})
+        cache.set('key', 'value')
+        self.l2.set('key', 'changed')
+        self.assertEqual(cache.get('key'), 'value')
+        time.sleep(2)
+        self.assertEqual(cache.get('key'), 'changed')
+        self.assertEqual(cache.stats()['l2_hits'], 1)
+
+    def test_l1_filled_from_l2(self):
+        self.l2.set_many({'a': 1, 'b': 2})
+        self.assertEqual(self.cache.get_many(['a', 'b']), {'a': 1, 'b': 2})
+        self.l2.delete_many(['a', 'b'])
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get_many(['a', 'b']), {'a': 1, 'b': 2})
+
+    def test_version_key(self):
+        # Two caches with their own L1, like two processes.
+        options = {'VERSION_KEY': 'generation', 'VERSION_CHECK_INTERVAL': 60, 'L1_TIMEOUT': 60}
+        cache1 = get_cache(self.backend_name, LOCATION='tiered_l2', OPTIONS=dict(options, L1_NAME='process1'))
+        cache2 = get_cache(self.backend_name, LOCATION='tiered_l2', OPTIONS=dict(options, L1_NAME='process2'))
+        cache1.set('key', 'value')
+        self.assertEqual(cache2.get('key'), 'value')
+        self.assertEqual(cache1.incr_version('key'), 2)
+        # The copy of cache2 is discarded once it checks the generation.
+        self.assertEqual(cache2.get('key'), 'value')
+        cache2._l1.delete('generation')
+        self.assertEqual(cache2.get('key'), None)
+        self.assertEqual(cache2.get('key', version=2), 'value')
+        cache1.clear()
+        cache2.clear()
+
+    def test_version_key_clear(self):
+        options = {'VERSION_KEY': 'generation', 'VERSION_CHECK_INTERVAL': 60, 'L1_TIMEOUT': 60}
+        cache1 = get_cache(self.backend_name, LOCATION='tiered_l2', OPTIONS=dict(options, L1_NAME='process1'))
+        cache2 = get_cache(self.backend_name, LOCATION='tiered_l2', OPTIONS=dict(options, L1_NAME='process2'))
+        cache1.set('other', 'value')
+        cache1.incr_version('other')
+        cache1.set('key', 'value')
+        self.assertEqual(cache2.get('key'), 'value')
+        # clear() empties L2, so the generation can't start over from a value
+        # cache2 has already seen.
+        cache1.clear()
+        cache2._l1.delete('generation')
+        self.assertEqual(cache2.get('key'), None)
+        # Neither can it when L2 loses the generation.
+        cache2.set('key', 'value')
+        self.l2.set('key', 'changed')
+        self.l2.delete('generation')
+        cache2._l1.delete('generation')
+        self.assertEqual(cache2.get('key'), 'changed')
+        cache1.clear()
+        cache2.clear()
+
+
+    def test_version_key_race(self):
+        options = {'VERSION_KEY': 'generation', 'VERSION_CHECK_INTERVAL': 60, 'L1_TIMEOUT': 60}
+        cache1 = get_cache(self.backend_name, LOCATION='tiered_l2', OPTIONS=dict(options, L1_NAME='process1'))
+        cache2 = get_cache(self.backend_name, LOCATION='tiered_l2', OPTIONS=dict(options, L1_NAME='process2'))
+        cache1.set('key', 'value')
+        l2_get = cache2._l2.get
+        def racing_get(key, default=None, version=None):
+            value = l2_get(key, default, version=version)
+            if key == 'key':
+                # Another process clears the cache while cache2 reads L2,
+                # and cache2 checks the generation again.
+                cache1.clear()
+                cache2._l1.delete('generation')
+            return value
+        cache2._l2.get = racing_get
+        self.assertEqual(cache2.get('key'), 'value')
+        del cache2._l2.get
+        # The value read before the clear isn't cached under the new
+        # generation.
+        self.assertEqual(cache2.get('key'), None)
+        cache1.clear()
+        cache2.clear()
+
+
+class PooledMemcachedCacheTests(unittest.TestCase, BaseCacheTests):
+    """
+    Tests the pooled memcached client against a fake memcached server.
+    """
+    backend_name = 'django.core.cache.backends.memcached.PooledMemcachedCache'
+
+    def setUp(self):
+        self.server = FakeMemcachedServer()
+        self.cache = get_cache(self.backend_name, LOCATION=self.server.address)
+        self.prefix_cache = get_cache(self.backend_name, LOCATION=self.server.address, KEY_PREFIX='cacheprefix')
+        self.v2_cache = get_cache(self.backend_name, LOCATION=self.server.address, VERSION=2)
+        self.custom_key_cache = get_cache(self.backend_name, LOCATION=self.server.address, KEY_FUNCTION=custom_key_func)
+        self.custom_key_cache2 = get_cache(self.backend_name, LOCATION=self.server.address, KEY_FUNCTION='regressiontests.cache.tests.custom_key_func')
+
+    def tearDown(self):
+        self.cache.clear()
+        self.server.stop()
+
+    def test_invalid_keys(self):
+        # memcached does not allow whitespace or control characters in keys
+        self.assertRaises(Exception, self.cache.set, 'key with spaces', 'value')
+        # memcached limits key length to 250
+        self.assertRaises(Exception, self.cache.set, 'a' * 251, 'value')
+
+    def test_connection_pool(self):
+        "Connections are reused by cache instances and threads"
+        def work():
+            cache = get_cache(self.backend_name, LOCATION=self.server.address)
+            for i in range(20):
+                cache.set('key%d' % i, i)
+                self.assertEqual(cache.get('key%d' % i), i)
+            cache.close()
+        work()
+        self.assertEqual(len(self.server.connections), 1)
+        threads = [threading.Thread(target=work) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(1 <= len(self.server.connections) <= 6)
+
+    def test_fork(self):
+        "Connections opened before os.fork() aren't reused by the child"
+        self.cache.set('key', 'value')
+        self.assertEqual(len(self.server.connections), 1)
+        server = self.cache._cache.servers[0]
+        inherited = server._idle[0]
+        pid = os.getpid()
+        getpid = os.getpid
+        os.getpid = lambda: pid + 1
+        try:
+            self.assertEqual(self.cache.get('key'), 'value')
+            self.assertEqual(len(self.server.connections), 2)
+            self.assertTrue(inherited not in server._idle)
+        finally:
+            os.getpid = getpid
+
+    def test_pipelined_multi_ops(self):
+        "Operations on many keys send a single request per server"
+        other = FakeMemcachedServer()
+        try:
+            cache = get_cache(self.backend_name, LOCATION=[self.server.address, other.address])
+            data = dict(('key%d' % i, i) for i in range(50))
+            cache.set_many(data)
+            self.assertEqual(cache.get_many(data.keys()), data)
+            cache.delete_many(data.keys())
+            self.assertEqual(cache.get_many(data.keys()), {})
+            for server in (self.server, other):
+                commands = [command for command, args in server.commands]
+                self.assertEqual(commands.count('get'), 2)
+                # Both servers hold some of the keys.
+                self.assertTrue(0 < commands.count('set') < 50)
+                self.assertEqual(commands.count('set'), commands.count('delete'))
+            self.assertEqual(len(self.server.connections) + len(other.connections), 2)
+        finally:
+            other.stop()
+
+    def test_consistent_hashing(self):
+        "Adding a server only moves the keys it receives"
+        servers = ['10.0.0.%d:11211' % i for i in range(1, 5)]
+        keys = [('key%d' % i).encode('ascii') for i in range(1000)]
+        ring = ConsistentHashRing(servers)
+        new_ring = ConsistentHashRing(servers + ['10.0.0.5:11211'])
+        moved = [key for key in keys if ring.get_node(key) != new_ring.get_node(key)]
+        self.assertTrue(100 < len(moved) < 300)
+        self.assertEqual(set(new_ring.get_node(key) for key in moved), set(['10.0.0.5:11211']))
+
+    def test_large_pipelines(self):
+        # Sending every command before reading any reply would fill the
+        # socket buffers of both ends, and time out.
+        cache = get_cache(self.backend_name, LOCATION=self.server.address,
+                          OPTIONS={'SOCKET_TIMEOUT': 2})
+        data = dict(('key%d' % i, 'x' * 200) for i in range(20000))
+        cache.set_many(data)
+        self.assertEqual(cache.get_many(data), data)
+        cache.delete_many(data)
+        self.assertEqual(cache.get_many(data), {})
+
+    def test_unhashable_options(self):
+        cache = get_cache(self.backend_name, LOCATION=self.server.address,
+                          OPTIONS={'POOL_SIZE': 2, 'EXTRA': [1, 2]})
+        cache.set('key', 'value')
+        self.assertEqual(cache.get('key'), 'value')
+
+    def test_dead_server(self):
+        "The keys of an unreachable server are sent to the next ones"
+        other = FakeMemcachedServer()
+        cache = get_cache(self.backend_name, LOCATION=[self.server.address, other.address])
+        data = dict(('key%d' % i, i) for i in range(20))
+        cache.set_many(data)
+        other.stop()
+        # The pooled connections to the stopped server fail.
+        result = cache.get_many(data.keys())
+        self.assertTrue(0 < len(result) < 20)
+        # Then the server can't be connected to.
+        self.assertEqual(cache.get_many(data.keys()), result)
+        cache.set('key0', 'value')
+        self.assertEqual(cache.get('key0'), 'value')
+        cache.set_many(data)
+        self.assertEqual(cache.get_many(data.keys()), data)
+
+
 class FileBasedCacheTests(unittest.TestCase, BaseCacheTests):
     """
     Specific test cases for the file-based cache.
     """
     backend_name = 'django.core.cache.backends.filebased.FileBasedCache'
+    index = False
 
     def setUp(self):
         self.dirname = tempfile.mkdtemp()
-        self.cache = get_cache(self.backend_name, LOCATION=self.dirname, OPTIONS={'MAX_ENTRIES': 30})
-        self.prefix_cache = get_cache(self.backend_name, LOCATION=self.dirname, KEY_PREFIX='cacheprefix')
-        self.v2_cache = get_cache(self.backend_name, LOCATION=self.dirname, VERSION=2)
-        self.custom_key_cache = get_cache(self.backend_name, LOCATION=self.dirname, KEY_FUNCTION=custom_key_func)
-        self.custom_key_cache2 = get_cache(self.backend_name, LOCATION=self.dirname, KEY_FUNCTION='regressiontests.cache.tests.custom_key_func')
+        options = {'INDEX': self.index}
+        self.cache = get_cache(self.backend_name, LOCATION=self.dirname, OPTIONS=dict(options, MAX_ENTRIES=30))
+        self.prefix_cache = get_cache(self.backend_name, LOCATION=self.dirname, KEY_PREFIX='cacheprefix', OPTIONS=options)
+        self.v2_cache = get_cache(self.backend_name, LOCATION=self.dirname, VERSION=2, OPTIONS=options)
+        self.custom_key_cache = get_cache(self.backend_name, LOCATION=self.dirname, KEY_FUNCTION=custom_key_func, OPTIONS=options)
+        self.custom_key_cache2 = get_cache(self.backend_name, LOCATION=self.dirname, KEY_FUNCTION='regressiontests.cache.tests.custom_key_func', OPTIONS=options)
 
     def tearDown(self):
         self.cache.clear()
+        shutil.rmtree(self.dirname, ignore_errors=True)
 
     def test_hashing(self):
         """Test that keys are hashed into subdirectories correctly"""
@@ -1018,6 +1363,65 @@ class FileBasedCacheTests(unittest.TestCase, BaseCacheTests):
         self.cache = get_cache('file://%s?max_entries=30' % self.dirname)
         self.perform_cull_test(50, 29)
 
+    def test_entry_count(self):
+        self.cache.set('key1', 'value')
+        self.cache.set('key2', 'value')
+        self.cache.set('key2', 'other value')
+        self.assertEqual(self.cache._num_entries, 2)
+        self.cache.delete('key1')
+        self.assertEqual(self.cache._num_entries, 1)
+        self.cache.clear()
+        self.assertEqual(self.cache._num_entries, 0)
+
+    def test_index_option(self):
+        self.cache.set('key', 'value')
+        self.assertEqual(os.path.exists(os.path.join(self.dirname, 'index.sqlite3')), self.index)
+
+    def test_atomic_write(self):
+        self.cache.set('foo', 'bar')
+        self.cache.set('foo', 'baz')
+        fname = self.cache._key_to_file(self.cache.make_key('foo'))
+        # No temporary file is left behind.
+        self.assertEqual(os.listdir(os.path.dirname(fname)), [os.path.basename(fname)])
+        self.assertEqual(self.cache.get('foo'), 'baz')
+
+
+@unittest.skipIf(sqlite3 is None, "The index requires the sqlite3 module")
+class IndexedFileBasedCacheTests(FileBasedCacheTests):
+    index = True
+
+    def test_cull_expired_first(self):
+        for i in range(10):
+            self.cache.set('expired%d' % i, 'value', -1)
+        for i in range(20):
+            self.cache.set('live%d' % i, 'value', 1000)
+        # The cache is full: the expired entries are culled.
+        self.cache.set('new', 'value')
+        self.assertEqual(self.cache._num_entries, 21)
+        for i in range(20):
+            self.assertTrue(self.cache.has_key('live%d' % i))
+
+    def test_index_rebuilt(self):
+        self.cache.set('key1', 'value')
+        self.cache.set('key2', 'value')
+        for name in os.listdir(self.dirname):
+            if name.startswith('index.'):
+                os.remove(os.path.join(self.dirname, name))
+        cache = get_cache(self.backend_name, LOCATION=self.dirname, OPTIONS={'INDEX': True})
+        self.assertEqual(cache._num_entries, 2)
+        self.assertEqual(cache.get('key1'), 'value')
+
+    def test_index_retried(self):
+        cache = get_cache(self.backend_name, LOCATION=self.dirname, OPTIONS={'INDEX': True})
+        open_index = cache._open_index
+        def locked_index():
+            raise sqlite3.OperationalError('database is locked')
+        cache._open_index = locked_index
+        self.assertEqual(cache._index(), None)
+        # The failure isn't remembered.
+        cache._open_index = open_index
+        self.assertNotEqual(cache._index(), None)
+
 
 class CustomCacheKeyValidationTests(unittest.TestCase):
     """
@@ -1529,6 +1933,59 @@ class CacheMiddlewareTest(TestCase):
         self.assertNotEqual(result, None)
         self.assertEqual(result.content, b'Hello World 1')
 
+    def _expire_page(self, request):
+        cache_key = get_cache_key(request, 'middlewareprefix', 'GET', cache=self.other_cache)
+        response = self.other_cache.get(cache_key)
+        response._cache_expires = time.time() - 1
+        self.other_cache.set(cache_key, response, 60)
+
+    @override_settings(CACHE_MIDDLEWARE_STALE_SECONDS=60)
+    def test_stale_while_revalidate(self):
+        update_middleware = UpdateCacheMiddleware()
+        fetch_middleware = FetchFromCacheMiddleware()
+        request = self.factory.get('/view/')
+        self.assertEqual(fetch_middleware.process_request(request), None)
+        update_middleware.process_response(request, hello_world_view(request, '1'))
+        self._expire_page(request)
+
+        # The first request for the expired page regenerates it...
+        request = self.factory.get('/view/')
+        self.assertEqual(fetch_middleware.process_request(request), None)
+        # ...while the others get the expired page.
+        other_request = self.factory.get('/view/')
+        result = fetch_middleware.process_request(other_request)
+        self.assertEqual(result.content, b'Hello World 1')
+        update_middleware.process_response(other_request, result)
+
+        update_middleware.process_response(request, hello_world_view(request, '2'))
+        result = fetch_middleware.process_request(self.factory.get('/view/'))
+        self.assertEqual(result.content, b'Hello World 2')
+
+        # The lock is released once the page is regenerated.
+        self._expire_page(request)
+        self.assertEqual(fetch_middleware.process_request(self.factory.get('/view/')), None)
+
+    def test_early_refresh(self):
+        update_middleware = UpdateCacheMiddleware()
+        fetch_middleware = FetchFromCacheMiddleware()
+        request = self.factory.get('/view/')
+        self.assertEqual(fetch_middleware.process_request(request), None)
+        response = update_middleware.process_response(request, hello_world_view(request, '1'))
+        self.assertTrue(response._cache_regeneration_time >= 0)
+        cache_key = get_cache_key(request, 'middlewareprefix', 'GET', cache=self.other_cache)
+        response = self.other_cache.get(cache_key)
+        response._cache_regeneration_time = 1e9
+        self.other_cache.set(cache_key, response, 60)
+
+        self.assertNotEqual(fetch_middleware.process_request(self.factory.get('/view/')), None)
+        with self.settings(CACHE_MIDDLEWARE_EARLY_REFRESH=1):
+            fetch_middleware = FetchFromCacheMiddleware()
+            # A page taking that long to generate is almost always
+            # regenerated early.
+            request = self.factory.get('/view/')
+            self.assertEqual(fetch_middleware.process_request(request), None)
+            self.assertTrue(request._cache_update_cache)
+
     @override_settings(CACHE_MIDDLEWARE_ANONYMOUS_ONLY=True)
     def test_cache_middleware_anonymous_only_wont_cause_session_access(self):
         """ The cache middleware shouldn't cause a session access due to
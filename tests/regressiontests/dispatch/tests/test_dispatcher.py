@@ -35,6 +35,7 @@ class Callable(object):
 a_signal = Signal(providing_args=["val"])
 b_signal = Signal(providing_args=["val"])
 c_signal = Signal(providing_args=["val"])
+d_signal = Signal(providing_args=["val"], use_caching=True)
 
 class DispatcherTests(unittest.TestCase):
     """Test suite for dispatcher (barely started)"""
@@ -137,6 +138,35 @@ class DispatcherTests(unittest.TestCase):
         self.assertFalse(a_signal.has_listeners())
         self.assertFalse(a_signal.has_listeners(sender=object()))
 
+    def testCaching(self):
+        class Sender(object):
+            pass
+        other = Sender()
+        self.assertEqual(d_signal.send(sender=self, val="test"), [])
+        d_signal.connect(receiver_1_arg, sender=self)
+        # Connecting a receiver invalidates the cache.
+        self.assertEqual(d_signal.sender_receivers_cache, {})
+        self.assertTrue(d_signal.has_listeners(sender=self))
+        self.assertFalse(d_signal.has_listeners(sender=other))
+        self.assertEqual(d_signal.send(sender=self, val="test"),
+                         [(receiver_1_arg, "test")])
+        self.assertEqual(d_signal.send(sender=other, val="test"), [])
+        self.assertEqual(len(d_signal.sender_receivers_cache), 2)
+        d_signal.disconnect(receiver_1_arg, sender=self)
+        self.assertEqual(d_signal.send(sender=self, val="test"), [])
+        self._testIsClean(d_signal)
+
+    def testCachingGarbageCollected(self):
+        a = Callable()
+        d_signal.connect(a.a, sender=self)
+        self.assertEqual(d_signal.send(sender=self, val="test"), [(a.a, "test")])
+        del a
+        garbage_collect()
+        self.assertEqual(d_signal.sender_receivers_cache, {})
+        self.assertEqual(d_signal.send(sender=self, val="test"), [])
+        self.assertFalse(d_signal.has_listeners(sender=self))
+        self._testIsClean(d_signal)
+
 
 class ReceiverTestCase(unittest.TestCase):
     """
@@ -7,7 +7,7 @@ import pickle
 from django.core.exceptions import SuspiciousOperation
 from django.http import (QueryDict, HttpResponse, HttpResponseRedirect,
                          HttpResponsePermanentRedirect, HttpResponseNotAllowed,
-                         HttpResponseNotModified,
+                         HttpResponseNotModified, StreamingHttpResponse,
                          SimpleCookie, BadHeaderError,
                          parse_cookie)
 from django.test import TestCase
@@ -379,6 +379,93 @@ class HttpResponseSubclassesTests(TestCase):
             content_type='text/html')
         self.assertContains(response, 'Only the GET method is allowed', status_code=405)
 
+class StreamingHttpResponseTests(unittest.TestCase):
+    def test_streaming_response(self):
+        r = StreamingHttpResponse(iter(['hello', 'world']))
+
+        # iterating over the response itself yields bytestring chunks.
+        chunks = list(r)
+        self.assertEqual(chunks, [b'hello', b'world'])
+        for chunk in chunks:
+            self.assertIsInstance(chunk, six.binary_type)
+
+        # and the response can only be iterated once.
+        self.assertEqual(list(r), [])
+
+        # even when a sequence that can be iterated many times, like a list,
+        # is given as content.
+        r = StreamingHttpResponse(['abc', 'def'])
+        self.assertEqual(list(r), [b'abc', b'def'])
+        self.assertEqual(list(r), [])
+
+        # streaming responses don't have a `content` attribute.
+        self.assertFalse(hasattr(r, 'content'))
+
+        # and you can't accidentally assign to a `content` attribute.
+        with self.assertRaises(AttributeError):
+            r.content = 'xyz'
+
+        # but they do have a `streaming_content` attribute.
+        self.assertTrue(hasattr(r, 'streaming_content'))
+
+        # that exists so we can check if a response is streaming, and wrap or
+        # replace the content iterator.
+        r.streaming_content = iter(['abc', 'def'])
+        r.streaming_content = (chunk.upper() for chunk in r.streaming_content)
+        self.assertEqual(list(r), [b'ABC', b'DEF'])
+
+        # coercing a streaming response to bytes doesn't return a complete HTTP
+        # message like a regular response does. it only gives us the headers.
+        r = StreamingHttpResponse(iter(['hello', 'world']))
+        self.assertEqual(
+            six.binary_type(r), b'Content-Type: text/html; charset=utf-8')
+
+        # and this won't consume its content.
+        self.assertEqual(list(r), [b'hello', b'world'])
+
+        # additional content cannot be written to the response.
+        r = StreamingHttpResponse(iter(['hello', 'world']))
+        with self.assertRaises(Exception):
+            r.write('!')
+
+        # and we can't tell the current position.
+        with self.assertRaises(Exception):
+            r.tell()
+
+    def test_close(self):
+        closed = []
+
+        class Content(object):
+            def __iter__(self):
+                return iter([b'abc'])
+
+            def close(self):
+                closed.append(True)
+
+        r = StreamingHttpResponse(Content())
+        self.assertEqual(list(r), [b'abc'])
+        r.close()
+        self.assertEqual(closed, [True])
+
+        # The content replaced since is closed too.
+        closed = []
+        r = StreamingHttpResponse(Content())
+        r.streaming_content = []
+        r.close()
+        self.assertEqual(closed, [True])
+
+    def test_pickle_closable_content(self):
+        # Responses whose content was read from a file can be cached.
+        f = open(__file__, 'rb')
+        r = HttpResponse(f)
+        r.content = r.content
+        unpickled = pickle.loads(pickle.dumps(r))
+        self.assertEqual(unpickled.content, r.content)
+        unpickled.close()
+        self.assertFalse(f.closed)
+        r.close()
+        self.assertTrue(f.closed)
+
 class CookieTests(unittest.TestCase):
     def test_encode(self):
         """
@@ -3,12 +3,13 @@
 import gzip
 import re
 import random
+import zlib
 from io import BytesIO
 
 from django.conf import settings
 from django.core import mail
 from django.http import HttpRequest
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.middleware.clickjacking import XFrameOptionsMiddleware
 from django.middleware.common import CommonMiddleware
 from django.middleware.http import ConditionalGetMiddleware
@@ -322,6 +323,12 @@ class ConditionalGetMiddlewareTest(TestCase):
         self.assertTrue('Content-Length' in self.resp)
         self.assertEqual(int(self.resp['Content-Length']), content_length)
 
+    def test_content_length_header_not_added_to_streaming_response(self):
+        self.resp = StreamingHttpResponse(['content'])
+        self.resp = ConditionalGetMiddleware().process_response(self.req, self.resp)
+        self.assertFalse('Content-Length' in self.resp)
+        self.assertEqual(b''.join(self.resp), b'content')
+
     def test_content_length_header_not_changed(self):
         bad_content_length = len(self.resp.content) + 10
         self.resp['Content-Length'] = bad_content_length
@@ -511,6 +518,7 @@ class GZipMiddlewareTest(TestCase):
     short_string = b"This string is too short to be worth compressing."
     compressible_string = b'a' * 500
     uncompressible_string = b''.join(six.int2byte(random.randint(0, 255)) for _ in xrange(500))
+    sequence = [b'a' * 500, b'b' * 200, b'a' * 300]
 
     def setUp(self):
         self.req = HttpRequest()
@@ -525,6 +533,8 @@ class GZipMiddlewareTest(TestCase):
         self.resp.status_code = 200
         self.resp.content = self.compressible_string
         self.resp['Content-Type'] = 'text/html; charset=UTF-8'
+        self.stream_resp = StreamingHttpResponse(self.sequence)
+        self.stream_resp['Content-Type'] = 'text/html; charset=UTF-8'
 
     @staticmethod
     def decompress(gzipped_string):
@@ -539,6 +549,53 @@ class GZipMiddlewareTest(TestCase):
         self.assertEqual(r.get('Content-Encoding'), 'gzip')
         self.assertEqual(r.get('Content-Length'), str(len(r.content)))
 
+    def test_compress_streaming_response(self):
+        """
+        Tests that streaming responses are compressed as they're iterated,
+        without a Content-Length.
+        """
+        self.stream_resp['Content-Length'] = '1000'
+        r = GZipMiddleware().process_response(self.req, self.stream_resp)
+        self.assertTrue(r.streaming)
+        self.assertEqual(r.get('Content-Encoding'), 'gzip')
+        self.assertFalse(r.has_header('Content-Length'))
+        chunks = list(r)
+        # Each item of the sequence yields a chunk, plus the trailer.
+        self.assertEqual(len(chunks), len(self.sequence) + 1)
+        self.assertEqual(self.decompress(b''.join(chunks)), b''.join(self.sequence))
+
+    def test_compress_streaming_response_flushes_chunks(self):
+        """
+        Tests that each chunk of a compressed streaming response can be
+        decompressed as soon as it's received.
+        """
+        r = GZipMiddleware().process_response(self.req, self.stream_resp)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        for item, chunk in zip(self.sequence, r):
+            self.assertEqual(decompressor.decompress(chunk), item)
+
+    def test_compress_streaming_response_closes_source(self):
+        """
+        Tests that closing a compressed streaming response closes the
+        original content.
+        """
+        class Content(object):
+            closed = False
+
+            def __iter__(self):
+                return iter(GZipMiddlewareTest.sequence)
+
+            def close(self):
+                self.closed = True
+
+        content = Content()
+        r = StreamingHttpResponse(content)
+        r['Content-Type'] = 'text/html; charset=UTF-8'
+        r = GZipMiddleware().process_response(self.req, r)
+        self.assertEqual(self.decompress(b''.join(r)), b''.join(self.sequence))
+        r.close()
+        self.assertTrue(content.closed)
+
     def test_compress_non_200_response(self):
         """
         Tests that compression is performed on responses with a status other than 200.
@@ -614,3 +671,16 @@ class ETagGZipMiddlewareTest(TestCase):
         nogzip_etag = response.get('ETag')
 
         self.assertNotEqual(gzip_etag, nogzip_etag)
+
+    def test_streaming_response(self):
+        """
+        Tests that no ETag is computed for streaming responses, which would
+        consume their content.
+        """
+        request = self.rf.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        response = GZipMiddleware().process_response(request,
+            CommonMiddleware().process_response(request,
+                StreamingHttpResponse([self.compressible_string])))
+        self.assertFalse(response.has_header('ETag'))
+        self.assertEqual(GZipMiddlewareTest.decompress(b''.join(response)),
+                         self.compressible_string)
@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+    age = models.IntegerField(default=30)
+
+
+class Book(models.Model):
+    title = models.CharField(max_length=100)
+    author = models.ForeignKey(Author, null=True)
+    cover = models.FileField(upload_to='covers', blank=True)
+
+
+class Novel(Book):
+    genre = models.CharField(max_length=50)
+
+
+class Edition(models.Model):
+    init_calls = 0
+
+    isbn = models.CharField(max_length=20)
+    book = models.ForeignKey(Book)
+
+    def __init__(self, *args, **kwargs):
+        super(Edition, self).__init__(*args, **kwargs)
+        Edition.init_calls += 1
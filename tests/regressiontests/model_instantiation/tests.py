@@ -0,0 +1,104 @@
+from __future__ import absolute_import
+
+from django.db.models import signals
+from django.test import TestCase
+
+from .models import Author, Book, Edition, Novel
+
+
+class InstanceBuilderTests(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(name="Ursula", age=82)
+        self.book = Book.objects.create(title="Earthsea", author=self.author,
+                                        cover="covers/earthsea.jpg")
+        self.novel = Novel.objects.create(title="The Dispossessed",
+                                          author=self.author, genre="sf")
+
+    def assertLoaded(self, obj, db='default'):
+        self.assertEqual(obj._state.db, db)
+        self.assertFalse(obj._state.adding)
+
+    def test_builder_availability(self):
+        self.assertIsNotNone(Author._instance_builder())
+        # Overridden __init__() methods must run.
+        self.assertIsNone(Edition._instance_builder())
+
+        def receiver(**kwargs):
+            pass
+        signals.post_init.connect(receiver, sender=Author)
+        try:
+            self.assertIsNone(Author._instance_builder())
+            self.assertIsNotNone(Book._instance_builder())
+        finally:
+            signals.post_init.disconnect(receiver, sender=Author)
+        self.assertIsNotNone(Author._instance_builder())
+
+    def test_plain_iteration(self):
+        author = Author.objects.get()
+        self.assertEqual((author.pk, author.name, author.age),
+                         (self.author.pk, "Ursula", 82))
+        self.assertLoaded(author)
+        self.assertEqual(author, self.author)
+
+    def test_descriptors(self):
+        book = Book.objects.get(pk=self.book.pk)
+        self.assertEqual(book.cover.name, "covers/earthsea.jpg")
+        self.assertIs(book.cover.instance, book)
+        self.assertEqual(book.author, self.author)
+
+    def test_deferred_fields(self):
+        author = Author.objects.defer('age').get()
+        self.assertLoaded(author)
+        self.assertNotIn('age', author.__dict__)
+        with self.assertNumQueries(1):
+            self.assertEqual(author.age, 82)
+        author = Author.objects.only('age').get()
+        self.assertEqual(author.age, 82)
+        with self.assertNumQueries(1):
+            self.assertEqual(author.name, "Ursula")
+
+    def test_inheritance(self):
+        novel = Novel.objects.get()
+        self.assertEqual((novel.title, novel.genre), ("The Dispossessed", "sf"))
+        self.assertEqual(novel.book_ptr_id, self.novel.pk)
+        self.assertLoaded(novel)
+
+    def test_select_related(self):
+        with self.assertNumQueries(1):
+            book = Book.objects.select_related('author').get(pk=self.book.pk)
+            self.assertEqual(book.author.name, "Ursula")
+        self.assertLoaded(book.author)
+        with self.assertNumQueries(1):
+            book = Book.objects.select_related('novel').get(pk=self.novel.pk)
+            self.assertEqual(book.novel.genre, "sf")
+            self.assertEqual(book.novel.title, "The Dispossessed")
+        self.assertLoaded(book.novel)
+        book = Book.objects.select_related('novel').get(pk=self.book.pk)
+        with self.assertRaises(Novel.DoesNotExist):
+            book.novel
+
+    def test_using(self):
+        author = Author.objects.using('other').create(name="Octavia")
+        self.assertLoaded(Author.objects.using('other').get(pk=author.pk), 'other')
+
+    def test_signal_receivers(self):
+        instances = []
+
+        def receiver(sender, instance, **kwargs):
+            instances.append(instance)
+        signals.post_init.connect(receiver, sender=Author)
+        try:
+            book = Book.objects.select_related('author').get(pk=self.book.pk)
+            authors = list(Author.objects.all())
+        finally:
+            signals.post_init.disconnect(receiver, sender=Author)
+        self.assertEqual(instances, [book.author] + authors)
+        self.assertLoaded(authors[0])
+
+    def test_custom_init(self):
+        Edition.objects.create(isbn="0-689-31727-3", book=self.book)
+        Edition.init_calls = 0
+        edition = Edition.objects.select_related('book').get()
+        self.assertEqual(Edition.init_calls, 1)
+        self.assertEqual(edition.book, self.book)
+        self.assertLoaded(edition)
@@ -7,9 +7,10 @@ from operator import attrgetter
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
-from django.core import management
-from django.db import connections, router, DEFAULT_DB_ALIAS
+from django.core import management, signals as core_signals
+from django.db import connections, router, DatabaseError, DEFAULT_DB_ALIAS
 from django.db.models import signals
+from django.db.routers import PrimaryReplicaRouter
 from django.test import TestCase
 from django.utils.six import StringIO
 
@@ -1931,3 +1932,111 @@ class RouterModelArgumentTestCase(TestCase):
         pet = Pet.objects.create(owner=person, name='Wart')
         # test related FK collection
         person.delete()
+
+
+class PrimaryReplicaRouterTestCase(TestCase):
+    multi_db = True
+
+    def setUp(self):
+        self.old_routers = router.routers
+        self.router = PrimaryReplicaRouter(replicas={'other': 1})
+        router.routers = [self.router]
+
+    def tearDown(self):
+        router.routers = self.old_routers
+        self.router.unpin()
+
+    def test_reads_go_to_replicas(self):
+        self.assertEqual(Book.objects.db, 'other')
+        self.assertEqual(Book.objects.all().db, 'other')
+        self.assertEqual(Book.objects.db_manager('default').db, 'default')
+        self.assertEqual(self.router.stats()['other']['reads'], 2)
+
+    def test_writes_pin_reads_to_primary(self):
+        self.assertEqual(Book.objects.db, 'other')
+        book = Book(title="Pro Django", published=datetime.date(2008, 12, 16))
+        book.save()
+        self.assertEqual(book._state.db, 'default')
+        self.assertTrue(self.router.is_pinned())
+        self.assertEqual(Book.objects.db, 'default')
+        self.assertEqual(Book.objects.get(title="Pro Django"), book)
+        # The pin is released at the end of the request.
+        core_signals.request_finished.send(sender=self.__class__)
+        self.assertFalse(self.router.is_pinned())
+        self.assertEqual(Book.objects.db, 'other')
+
+        self.router.pin()
+        core_signals.request_started.send(sender=self.__class__)
+        self.assertEqual(Book.objects.db, 'other')
+
+        stats = self.router.stats()
+        self.assertEqual(stats['default']['writes'], 1)
+        self.assertEqual(stats['other']['reads'], 3)
+        self.router.reset_stats()
+        self.assertEqual(self.router.stats()['default']['writes'], 0)
+
+    def test_weights(self):
+        weighted = PrimaryReplicaRouter(replicas={'default': 1, 'other': 3})
+        weighted.random.seed(42)
+        counts = {'default': 0, 'other': 0}
+        for i in range(400):
+            counts[weighted.db_for_read(Book)] += 1
+        self.assertEqual(counts['default'] + counts['other'], 400)
+        self.assertTrue(60 < counts['default'] < 140, counts)
+
+        unweighted = PrimaryReplicaRouter(primary='other', replicas=['default'])
+        self.assertEqual(unweighted.replicas, {'default': 1})
+        self.assertEqual(unweighted.db_for_read(Book), 'default')
+
+    def test_replicas_from_settings(self):
+        old_databases = dict(settings.DATABASES)
+        settings.DATABASES['other'] = dict(settings.DATABASES['other'],
+                                           REPLICA_OF='default',
+                                           REPLICA_WEIGHT=2)
+        try:
+            self.assertEqual(PrimaryReplicaRouter().replicas, {'other': 2})
+            self.assertEqual(PrimaryReplicaRouter(primary='other').replicas, {})
+        finally:
+            settings.DATABASES.clear()
+            settings.DATABASES.update(old_databases)
+
+    def test_lagging_replica_ejected(self):
+        self.router.max_lag = 5
+        self.router.check_interval = 0
+        connections['other'].ops.replication_lag = lambda: 10
+        try:
+            self.assertEqual(Book.objects.db, 'default')
+            stats = self.router.stats()
+            self.assertFalse(stats['other']['healthy'])
+            self.assertEqual(stats['other']['lag'], 10)
+            self.assertEqual(stats['other']['ejections'], 1)
+            # The replica is back once it has caught up.
+            connections['other'].ops.replication_lag = lambda: 1
+            self.assertEqual(Book.objects.db, 'other')
+            stats = self.router.stats()
+            self.assertTrue(stats['other']['healthy'])
+            self.assertEqual(stats['other']['lag'], 1)
+            self.assertEqual(stats['other']['ejections'], 1)
+        finally:
+            del connections['other'].ops.replication_lag
+
+    def test_unreachable_replica_ejected(self):
+        def probe(alias):
+            raise DatabaseError("Connection refused")
+        self.router.probe = probe
+        self.router.check_interval = 60
+        self.assertEqual(Book.objects.db, 'default')
+        self.assertFalse(self.router.stats()['other']['healthy'])
+        # Replicas aren't probed again before check_interval has elapsed.
+        del self.router.probe
+        self.assertEqual(Book.objects.db, 'default')
+        self.router.check_replicas()
+        self.assertEqual(Book.objects.db, 'other')
+
+    def test_syncdb_and_relations(self):
+        self.assertEqual(self.router.allow_syncdb('other', Book), False)
+        self.assertEqual(self.router.allow_syncdb('default', Book), None)
+        book = Book.objects.using('other').create(title="Pro Django",
+            published=datetime.date(2008, 12, 16))
+        person = Person.objects.create(name="Marty Alchin")
+        self.assertTrue(self.router.allow_relation(book, person))
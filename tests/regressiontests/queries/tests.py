@@ -12,7 +12,8 @@ from django.db.models import Count
 from django.db.models.query import Q, ITER_CHUNK_SIZE, EmptyQuerySet
 from django.db.models.sql.where import WhereNode, EverythingNode, NothingNode
 from django.db.models.sql.datastructures import EmptyResultSet
-from django.test import TestCase, skipUnlessDBFeature
+from django.db.models.sql.sqlcache import clear_sql_caches, get_sql_cache
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
 from django.test.utils import str_prefix
 from django.utils import unittest
 from django.utils.datastructures import SortedDict
@@ -2125,3 +2126,134 @@ class NullJoinPromotionOrTest(TestCase):
         # so we can use INNER JOIN for it. However, we can NOT use INNER JOIN
         # for the b->c join, as a->b is nullable.
         self.assertEqual(str(qset.query).count('INNER JOIN'), 1)
+
+class ChunkedIteratorTests(TestCase):
+    def setUp(self):
+        for num in range(25):
+            Number.objects.create(num=num)
+
+    def test_iterator_chunk_size(self):
+        fetch_sizes = []
+        conn = connections[DEFAULT_DB_ALIAS]
+        chunked_cursor = conn.chunked_cursor
+        def recording_chunked_cursor():
+            cursor = chunked_cursor()
+            fetchmany = cursor.fetchmany
+            def recording_fetchmany(size):
+                fetch_sizes.append(size)
+                return fetchmany(size)
+            cursor.fetchmany = recording_fetchmany
+            return cursor
+        conn.chunked_cursor = recording_chunked_cursor
+        try:
+            nums = [n.num for n in Number.objects.order_by('num').iterator(chunk_size=7)]
+        finally:
+            del conn.chunked_cursor
+        self.assertEqual(nums, list(range(25)))
+        self.assertTrue(fetch_sizes)
+        self.assertEqual(set(fetch_sizes), set([7]))
+
+    def test_values_iterator_chunk_size(self):
+        qs = Number.objects.order_by('num')
+        self.assertEqual(
+            [d['num'] for d in qs.values('num').iterator(chunk_size=4)],
+            list(range(25)))
+        self.assertEqual(
+            list(qs.values_list('num', flat=True).iterator(chunk_size=4)),
+            list(range(25)))
+
+    def test_unchunked_iterator(self):
+        self.assertEqual(len(list(Number.objects.iterator())), 25)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql',
+                         "Server-side cursors are specific to PostgreSQL")
+    def test_postgresql_named_cursor(self):
+        cursor = connection.chunked_cursor()
+        self.assertTrue(cursor.name.startswith('_django_curs_'))
+        self.assertNotEqual(cursor.name, connection.chunked_cursor().name)
+        self.assertFalse(getattr(connection.cursor(), 'name', None))
+
+
+class ChunkedIteratorSaveTests(TransactionTestCase):
+    def test_save_while_iterating(self):
+        """
+        The commits made by saving objects during a chunked iteration don't
+        interrupt it.
+        """
+        for num in range(25):
+            Number.objects.create(num=num)
+        for number in Number.objects.order_by('num').iterator(chunk_size=7):
+            number.num += 100
+            number.save()
+        self.assertEqual(
+            list(Number.objects.order_by('num').values_list('num', flat=True)),
+            list(range(100, 125)))
+
+
+class CompiledSQLCacheTests(TestCase):
+    def setUp(self):
+        self.connection = connections[DEFAULT_DB_ALIAS]
+        self.connection.settings_dict['SQL_CACHE_SIZE'] = 2
+        clear_sql_caches()
+        self.cache = get_sql_cache(self.connection)
+        self.n1 = Number.objects.create(num=1)
+        self.n2 = Number.objects.create(num=2)
+        Number.objects.create(num=3)
+
+    def tearDown(self):
+        self.connection.settings_dict['SQL_CACHE_SIZE'] = 0
+        clear_sql_caches()
+
+    def compile(self, qs):
+        return qs.query.get_compiler(qs.db).as_sql()
+
+    def test_same_shape_reuses_sql(self):
+        sql1, params1 = self.compile(Number.objects.filter(num=1).order_by('num'))
+        sql2, params2 = self.compile(Number.objects.filter(num=2).order_by('num'))
+        self.assertEqual(sql1, sql2)
+        self.assertEqual(params1, (1,))
+        self.assertEqual(params2, (2,))
+        stats = self.cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(list(Number.objects.filter(num=2)), [self.n2])
+
+    def test_value_dependent_sql(self):
+        # The number of values in an "in" lookup changes the SQL.
+        self.assertEqual(
+            Number.objects.filter(num__in=[1, 2]).count(), 2)
+        self.assertEqual(
+            Number.objects.filter(num__in=[1, 2, 3]).count(), 3)
+        self.assertEqual(
+            list(Number.objects.filter(pk__in=[self.n1.pk])), [self.n1])
+        # isnull=True and isnull=False render different SQL.
+        self.assertEqual(Tag.objects.filter(parent__isnull=True).count(), 0)
+        Tag.objects.create(name='t1')
+        self.assertEqual(Tag.objects.filter(parent__isnull=True).count(), 1)
+        self.assertEqual(Tag.objects.filter(parent__isnull=False).count(), 0)
+
+    def test_limits(self):
+        qs = Number.objects.order_by('num')
+        self.assertEqual([n.num for n in qs[:1]], [1])
+        self.assertEqual([n.num for n in qs[1:3]], [2, 3])
+        self.assertEqual([n.num for n in qs[:1]], [1])
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_uncacheable(self):
+        from django.db.models import F
+        self.assertEqual(Number.objects.filter(num=F('num')).count(), 3)
+        self.assertEqual(
+            Number.objects.filter(pk__in=Number.objects.filter(num=1)).count(), 1)
+        self.assertEqual(self.cache.stats()['uncacheable'], 2)
+        # Only the inner query of the subquery was stored.
+        self.assertEqual(self.cache.stats()['size'], 1)
+
+    def test_bounded_size(self):
+        list(Number.objects.filter(num=1))
+        list(Number.objects.filter(num__gt=1))
+        list(Number.objects.filter(num__lt=1))
+        self.assertEqual(self.cache.stats()['size'], 2)
+
+    def test_disabled(self):
+        self.connection.settings_dict['SQL_CACHE_SIZE'] = 0
+        self.assertTrue(get_sql_cache(self.connection) is None)
@@ -0,0 +1,104 @@
+from __future__ import unicode_literals
+
+from django.template import Context, Template
+from django.template.loader_tags import BlockNode
+from django.test.utils import override_settings
+from django.utils.safestring import mark_safe
+from django.utils.unittest import TestCase
+
+
+class SilentError(Exception):
+    silent_variable_failure = True
+
+
+class Item(object):
+    def __init__(self, name):
+        self.name = name
+
+    def upper_name(self):
+        return self.name.upper()
+
+    def fails_silently(self):
+        raise SilentError
+
+    def fails(self):
+        raise ValueError
+
+    def delete(self):
+        raise AssertionError("Templates must not call methods altering data.")
+    delete.alters_data = True
+
+
+class CompilerTests(TestCase):
+    def assertRendersLikeNodes(self, source, context):
+        with override_settings(TEMPLATE_DEBUG=False):
+            walked = Template(source)
+            compiled = Template(source)
+            compiled.compile()
+        self.assertEqual(walked.nodelist.compiled, None)
+        self.assertNotEqual(compiled.nodelist.compiled, None)
+        expected = walked.render(Context(context))
+        output = compiled.render(Context(context))
+        self.assertEqual(output, expected)
+        return output
+
+    def test_lookups(self):
+        items = [Item('a'), Item('<b>')]
+        output = self.assertRendersLikeNodes(
+            '{% for item in items %}{{ item.name }} {{ item.upper_name }} '
+            '{{ item.fails_silently }}{{ item.delete }}{{ item.missing }} '
+            '{{ items.1.name }}{{ dict.key }}{{ dict.items }}|{% endfor %}',
+            {'items': items, 'dict': {'key': 'value', 'items': 'k'}})
+        self.assertEqual(output, 'a A  &lt;b&gt;valuek|&lt;b&gt; &lt;B&gt;  &lt;b&gt;valuek|')
+
+    def test_exceptions(self):
+        template = Template('{{ item.fails }}')
+        template.compile()
+        self.assertRaises(ValueError, template.render, Context({'item': Item('a')}))
+
+    def test_filters(self):
+        self.assertRendersLikeNodes(
+            '{{ a|upper }} {{ a|safe|upper }} {{ a|escape|lower }} '
+            '{{ b|default:a|join:"," }} {{ b|default_if_none:"none" }} '
+            '{{ c|date:"Y" }} {{ a|add:1|add:n }} {{ s|linebreaks }}',
+            {'a': '<a>', 'b': None, 'n': 2, 's': mark_safe('<p>\n</p>')})
+
+    def test_autoescape(self):
+        self.assertRendersLikeNodes(
+            '{% autoescape off %}{{ a }}{% for x in l %}{{ x }}{% endfor %}'
+            '{% endautoescape %}{{ a }}', {'a': '<&>', 'l': ['<', '>']})
+
+    def test_tags(self):
+        self.assertRendersLikeNodes(
+            '{% for k, v in d %}{% cycle "odd" "even" %}{{ k }}={{ v }}'
+            '{% ifchanged v %}!{% endifchanged %}{{ forloop.parentloop }}'
+            '{% empty %}empty{% endfor %}'
+            '{% for x in missing %}{% empty %}none{% endfor %}'
+            '{% if a and not b %}1{% elif a %}2{% else %}3{% endif %}'
+            '{% if b %}4{% endif %}{% ifequal a 1 %}5{% endifequal %}'
+            '{% with a as x %}{% with y=x|add:1 %}{{ x }}{{ y }}{% endwith %}{% endwith %}'
+            '{% filter upper %}{{ a }}b{% endfilter %}'
+            '{% firstof b a %}{% widthratio a 2 10 %}{% templatetag openblock %}'
+            '{% spaceless %}<b> </b> <i></i>{% endspaceless %}'
+            '{% verbatim %}{{ a }}{% endverbatim %}',
+            {'d': [('a', 1), ('b', 1), ('c', 2)], 'a': 1, 'b': 0})
+
+    def test_nested_nodelists(self):
+        template = Template('{% block content %}{{ a }}{% endblock %}')
+        template.compile()
+        block = template.nodelist.get_nodes_by_type(BlockNode)[0]
+        self.assertNotEqual(block.nodelist.compiled, None)
+        self.assertEqual(template.render(Context({'a': 1})), '1')
+
+    def test_string_if_invalid(self):
+        with override_settings(TEMPLATE_STRING_IF_INVALID='INVALID'):
+            output = self.assertRendersLikeNodes(
+                '{{ a.b|upper }}{{ a|default:"x" }}{% for i in a %}{% endfor %}', {})
+        self.assertEqual(output, 'INVALIDINVALID')
+
+    @override_settings(TEMPLATE_COMPILE=True)
+    def test_setting(self):
+        with override_settings(TEMPLATE_DEBUG=False):
+            self.assertNotEqual(Template('{{ a }}').nodelist.compiled, None)
+        with override_settings(TEMPLATE_DEBUG=True):
+            self.assertEqual(Template('{{ a }}').nodelist.compiled, None)
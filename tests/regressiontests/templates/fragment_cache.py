@@ -0,0 +1,99 @@
+from __future__ import unicode_literals
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.template import Context, Template
+from django.templatetags import cache as cache_tag
+from django.utils.unittest import TestCase
+
+
+class CountingCache(LocMemCache):
+    """
+    Records the calls made by the cache tag, but not those get_many() and
+    set_many() make to get() and set().
+    """
+    def __init__(self):
+        super(CountingCache, self).__init__('fragment-cache-tests', {})
+        self.calls = []
+
+    def record(self, name, method, *args, **kwargs):
+        calls = self.calls
+        calls.append(name)
+        self.calls = []
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.calls = calls
+
+    def get(self, key, *args, **kwargs):
+        return self.record('get', super(CountingCache, self).get, key, *args, **kwargs)
+
+    def set(self, key, *args, **kwargs):
+        return self.record('set', super(CountingCache, self).set, key, *args, **kwargs)
+
+    def get_many(self, keys, *args, **kwargs):
+        return self.record('get_many', super(CountingCache, self).get_many, keys, *args, **kwargs)
+
+    def set_many(self, data, *args, **kwargs):
+        return self.record('set_many', super(CountingCache, self).set_many, data, *args, **kwargs)
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        self.old_cache = cache_tag.cache
+        cache_tag.cache = self.cache = CountingCache()
+        self.cache.clear()
+
+    def tearDown(self):
+        cache_tag.cache = self.old_cache
+
+    def render(self, template, **context):
+        self.cache.calls = []
+        return template.render(Context(context))
+
+    def test_loop_prefetch(self):
+        t = Template('{% load cache %}{% for i in items %}'
+                     '{% cache 60 row i %}[{{ i }}{{ x }}]{% endcache %}'
+                     '{% endfor %}')
+        self.assertEqual(self.render(t, items=[1, 2, 3]), '[1][2][3]')
+        # Misses are rendered, and stored once the loop is over.
+        self.assertEqual(self.cache.calls, ['get_many', 'set_many'])
+        self.assertEqual(self.render(t, items=[1, 2, 3, 4], x='!'), '[1][2][3][4!]')
+        self.assertEqual(self.cache.calls, ['get_many', 'set_many'])
+        self.assertEqual(self.render(t, items=[4, 3], x='?'), '[4!][3]')
+        self.assertEqual(self.cache.calls, ['get_many'])
+
+        stats = cache_tag.fragment_cache_stats(t)
+        self.assertEqual((stats['hits'], stats['misses']), (5, 4))
+        self.assertEqual(stats['hit_ratio'], 5.0 / 9)
+        self.assertEqual(stats['fragments'], {
+            'row': {'hits': 5, 'misses': 4, 'hit_ratio': 5.0 / 9},
+        })
+
+    def test_repeated_keys(self):
+        t = Template('{% load cache %}{% for i in items %}'
+                     '{% cache 60 row i %}{{ forloop.counter }}{% endcache %}'
+                     '{% endfor %}')
+        self.assertEqual(self.render(t, items=[1, 2, 1]), '121')
+
+    def test_conditional_fragment(self):
+        # Fragments whose key can't be built aren't prefetched.
+        t = Template('{% load cache %}{% for i in items %}{% if i.x %}'
+                     '{% cache 60 row i.x.y %}{{ i.x.y }}{% endcache %}'
+                     '{% endif %}{% endfor %}')
+        self.assertEqual(self.render(t, items=[{}, {'x': {'y': 1}}]), '1')
+        self.assertEqual(self.cache.calls, ['get_many', 'set_many'])
+
+    def test_nested_loops(self):
+        t = Template('{% load cache %}{% for row in rows %}{% for i in row %}'
+                     '{% cache 60 cell i %}{{ i }}{% endcache %}'
+                     '{% endfor %};{% endfor %}')
+        self.assertEqual(self.render(t, rows=[[1, 2], [3]]), '12;3;')
+        self.assertEqual(self.cache.calls, ['get_many', 'set_many'] * 2)
+
+    def test_outside_loop(self):
+        t = Template('{% load cache %}{% cache 60 single %}{{ x }}{% endcache %}')
+        self.assertEqual(self.render(t, x=1), '1')
+        self.assertEqual(self.cache.calls, ['get', 'set'])
+        self.assertEqual(self.render(t, x=2), '1')
+        self.assertEqual(self.cache.calls, ['get'])
+        self.assertEqual(cache_tag.fragment_cache_stats(t)['hit_ratio'], 0.5)
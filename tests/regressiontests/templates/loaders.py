@@ -13,10 +13,14 @@ import sys
 import pkg_resources
 import imp
 import os.path
+import shutil
+import tempfile
 
 from django.template import TemplateDoesNotExist, Context
+from django.template.loaders import cached
 from django.template.loaders.eggs import Loader as EggLoader
 from django.template import loader
+from django.test.utils import override_settings
 from django.utils import unittest, six
 from django.utils.six import StringIO
 
@@ -118,6 +122,123 @@ class CachedLoader(unittest.TestCase):
         # The two templates should not have the same content
         self.assertNotEqual(t1.render(Context({})), t2.render(Context({})))
 
+class CachedLoaderInvalidationTest(unittest.TestCase):
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.settings = override_settings(
+            TEMPLATE_DIRS=(self.template_dir,),
+            TEMPLATE_LOADERS=('django.template.loaders.filesystem.Loader',),
+            TEMPLATE_DEBUG=False,
+        )
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.template_dir)
+        shutil.rmtree(self.cache_dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.template_dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        # Make sure the change is visible to coarse mtimes.
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    def render(self, cache_loader, name):
+        template, origin = cache_loader.load_template(name)
+        return template.render(Context({'x': 'X'}))
+
+    def make_loader(self, **kwargs):
+        return cached.Loader(('django.template.loaders.filesystem.Loader',), **kwargs)
+
+    def test_no_check_interval(self):
+        cache_loader = self.make_loader()
+        self.write('a.html', 'one')
+        self.assertEqual(self.render(cache_loader, 'a.html'), 'one')
+        self.write('a.html', 'two')
+        self.assertEqual(self.render(cache_loader, 'a.html'), 'one')
+
+    def test_check_interval(self):
+        cache_loader = self.make_loader(check_interval=60)
+        self.write('a.html', 'one')
+        self.assertEqual(self.render(cache_loader, 'a.html'), 'one')
+        self.write('a.html', 'two')
+        # Files aren't checked again before the interval has elapsed.
+        self.assertEqual(self.render(cache_loader, 'a.html'), 'one')
+        cache_loader.watches['a.html'].next_check = 0
+        self.assertEqual(self.render(cache_loader, 'a.html'), 'two')
+        cache_loader.watches['a.html'].next_check = 0
+        self.assertEqual(self.render(cache_loader, 'a.html'), 'two')
+
+    def test_included_template_modified(self):
+        cache_loader = self.make_loader(check_interval=0)
+        self.write('a.html', 'one')
+        self.write('b.html', '[{% include "a.html" %}]')
+        self.assertEqual(self.render(cache_loader, 'b.html'), '[one]')
+        self.write('a.html', 'two')
+        self.assertEqual(self.render(cache_loader, 'b.html'), '[two]')
+
+    def test_template_deleted(self):
+        cache_loader = self.make_loader(check_interval=0)
+        self.write('a.html', 'one')
+        self.assertEqual(self.render(cache_loader, 'a.html'), 'one')
+        os.remove(os.path.join(self.template_dir, 'a.html'))
+        self.assertRaises(TemplateDoesNotExist, cache_loader.load_template, 'a.html')
+
+    def test_disk_cache(self):
+        self.write('a.html', '{% if not y %}{{ x|lower }}{% endif %}')
+        self.assertEqual(self.render(self.make_loader(cache_dir=self.cache_dir), 'a.html'), 'x')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        # Another loader finds the parsed template on disk.
+        def get_template_from_string(*args):
+            self.fail("The template was parsed again.")
+        old_get_template_from_string = cached.get_template_from_string
+        cached.get_template_from_string = get_template_from_string
+        try:
+            self.assertEqual(self.render(self.make_loader(cache_dir=self.cache_dir), 'a.html'), 'x')
+        finally:
+            cached.get_template_from_string = old_get_template_from_string
+
+        # A modified template gets a new entry.
+        self.write('a.html', 'two')
+        self.assertEqual(self.render(self.make_loader(cache_dir=self.cache_dir), 'a.html'), 'two')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    @override_settings(TEMPLATE_COMPILE=True)
+    def test_disk_cache_compiled(self):
+        self.write('a.html', '{% for i in "ab" %}{{ i }}{% endfor %}')
+        self.render(self.make_loader(cache_dir=self.cache_dir), 'a.html')
+        template, origin = self.make_loader(cache_dir=self.cache_dir).load_template('a.html')
+        self.assertIsNotNone(template.nodelist.compiled)
+        self.assertEqual(template.render(Context()), 'ab')
+
+    def test_disk_cache_version(self):
+        cache_loader = self.make_loader(cache_dir=self.cache_dir)
+        path = cache_loader.cache_path('one', 'a.html')
+        with override_settings(TEMPLATE_CACHE_VERSION='2'):
+            self.assertNotEqual(cache_loader.cache_path('one', 'a.html'), path)
+
+    def test_disk_cache_templatetags_signature(self):
+        path = self.make_loader(cache_dir=self.cache_dir).cache_path('one', 'a.html')
+        old_signature = cached._templatetags_signature
+        cached._templatetags_signature = lambda: 'changed'
+        try:
+            self.assertNotEqual(self.make_loader(cache_dir=self.cache_dir).cache_path('one', 'a.html'), path)
+        finally:
+            cached._templatetags_signature = old_signature
+
+    def test_disk_cache_corrupted(self):
+        self.write('a.html', 'one')
+        cache_loader = self.make_loader(cache_dir=self.cache_dir)
+        with open(cache_loader.cache_path('one', 'a.html'), 'wb') as f:
+            f.write(b'garbage')
+        self.assertEqual(self.render(cache_loader, 'a.html'), 'one')
+        # The file was replaced.
+        self.assertEqual(self.render(self.make_loader(cache_dir=self.cache_dir), 'a.html'), 'one')
+
 class RenderToStringTest(unittest.TestCase):
 
     def setUp(self):
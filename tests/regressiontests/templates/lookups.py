@@ -0,0 +1,80 @@
+from __future__ import unicode_literals
+
+import pickle
+
+from django.template import Context, Template, Variable
+from django.utils.unittest import TestCase
+
+
+class Plain(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class Mapping(object):
+    """
+    Supports item access for some keys, and has attributes of the same name.
+    """
+    items = 'attribute'
+
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+
+class LookupCacheTests(TestCase):
+    def test_cache(self):
+        var = Variable('obj.name')
+        self.assertEqual(var.resolve({'obj': Plain(name='a')}), 'a')
+        self.assertEqual((var.cache_hits, var.cache_misses), (0, 2))
+        self.assertEqual(var.resolve({'obj': Plain(name='b')}), 'b')
+        self.assertEqual((var.cache_hits, var.cache_misses), (2, 2))
+        # Another type replaces the cached one.
+        self.assertEqual(var.resolve({'obj': {'name': 'c'}}), 'c')
+        self.assertEqual((var.cache_hits, var.cache_misses), (3, 3))
+        self.assertEqual(var.resolve({'obj': Plain(name='d')}), 'd')
+        self.assertEqual((var.cache_hits, var.cache_misses), (4, 4))
+
+    def test_lookup_order(self):
+        # A cached type that supports item access still tries it first.
+        var = Variable('obj.items')
+        self.assertEqual(var.resolve({'obj': Mapping({'items': 'item'})}), 'item')
+        self.assertEqual(var.resolve({'obj': Mapping({})}), 'attribute')
+        self.assertEqual(var.resolve({'obj': Mapping({'items': 'item'})}), 'item')
+        self.assertEqual(var.cache_hits, 4)
+
+        var = Variable('list.1')
+        self.assertEqual(var.resolve({'list': ['a', 'b']}), 'b')
+        self.assertEqual(var.resolve({'list': ['c', 'd']}), 'd')
+        self.assertEqual(var.cache_hits, 2)
+
+    def test_template_stats(self):
+        template = Template('{% for obj in objs %}{{ obj.name }}'
+                            '{% if obj.flag and obj.name|default:"x" %}!'
+                            '{% endif %}{% endfor %}')
+        self.assertEqual(template.lookup_cache_stats(),
+                         {'hits': 0, 'misses': 0, 'hit_ratio': None})
+        objs = [Plain(name='a', flag=True), Plain(name='b', flag=False)]
+        self.assertEqual(template.render(Context({'objs': objs})), 'a!b')
+        # Misses: one per bit for the first object, hits: one per bit for the
+        # second one, except for 'objs' and the 'obj.name' of the condition,
+        # which are looked up once.
+        stats = template.lookup_cache_stats()
+        self.assertEqual(stats['misses'], 7)
+        self.assertEqual(stats['hits'], 4)
+        self.assertAlmostEqual(stats['hit_ratio'], 4.0 / 11)
+
+        compiled = Template('{% for obj in objs %}{{ obj.name }}{% endfor %}')
+        compiled.compile()
+        compiled.render(Context({'objs': objs}))
+        self.assertEqual(compiled.lookup_cache_stats()['hits'], 2)
+
+    def test_pickle(self):
+        var = Variable('obj.name')
+        var.resolve({'obj': Plain(name='a')})
+        var = pickle.loads(pickle.dumps(var))
+        self.assertEqual(var.cache_misses, 2)
+        self.assertEqual(var.resolve({'obj': Plain(name='b')}), 'b')
+        self.assertEqual(var.cache_misses, 4)
@@ -3,10 +3,12 @@ from __future__ import unicode_literals
 import os
 import pickle
 import time
+import zlib
 from datetime import datetime
 
 from django.test import RequestFactory, TestCase
 from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
 from django.template import Template, Context
 from django.template.response import (TemplateResponse, SimpleTemplateResponse,
                                       ContentNotRenderedError)
@@ -127,6 +129,33 @@ class SimpleTemplateResponseTest(TestCase):
         self.assertEqual(response['content-type'], 'application/json')
         self.assertEqual(response.status_code, 504)
 
+    def test_streaming(self):
+        consumed = []
+        class Item(object):
+            def value(self):
+                consumed.append(self)
+                return 'x' * 1000
+        response = self._response('{% for item in items %}{{ item.value }}{% endfor %}',
+                                   {'items': [Item() for i in range(20)]}, streaming=True)
+        response.render()
+        self.assertTrue(response.is_rendered)
+        # Nothing is rendered until the content is iterated over.
+        self.assertEqual(consumed, [])
+        chunks = iter(response)
+        self.assertEqual(next(chunks), b'x' * 9000)
+        self.assertEqual(len(consumed), 9)
+        self.assertEqual(b''.join(chunks), b'x' * 11000)
+        self.assertEqual(len(consumed), 20)
+
+    def test_streaming_middleware(self):
+        response = self._response('{% for i in "abc" %}{{ i }}{% endfor %}',
+                                  streaming=True).render()
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = GZipMiddleware().process_response(request, response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.assertEqual(decompressor.decompress(b''.join(response)), b'abc')
+
     def test_post_callbacks(self):
         "Rendering a template response triggers the post-render callbacks"
         post = []
@@ -228,6 +257,11 @@ class TemplateResponseTest(TestCase):
         self.assertEqual(response['content-type'], 'application/json')
         self.assertEqual(response.status_code, 504)
 
+    def test_streaming(self):
+        response = self._response('{% for i in "ab" %}{{ i }}{{ processors }}{% endfor %}',
+                                  streaming=True).render()
+        self.assertEqual(b''.join(response), b'ayesbyes')
+
     def test_custom_app(self):
         response = self._response('{{ foo }}', current_app="foobar")
 
@@ -36,16 +36,20 @@ from django.utils.tzinfo import LocalTimezone
 
 from .callables import CallableVariablesTests
 from .context import ContextTests
+from .lookups import LookupCacheTests
 from .custom import CustomTagTests, CustomFilterTests
 from .parser import ParserTests
 from .unicode import UnicodeTests
+from .compiler import CompilerTests
+from .fragment_cache import FragmentCacheTests
 from .nodelist import NodelistTest, ErrorIndexTest
 from .smartif import SmartIfTests
 from .response import (TemplateResponseTest, CacheMiddlewareTest,
     SimpleTemplateResponseTest, CustomURLConfTest)
 
 try:
-    from .loaders import RenderToStringTest, EggLoaderTest
+    from .loaders import (RenderToStringTest, EggLoaderTest, CachedLoader,
+        CachedLoaderInvalidationTest)
 except ImportError as e:
     if "pkg_resources" in e.args[0]:
         pass # If setuptools isn't installed, that's fine. Just move on.
@@ -502,10 +506,28 @@ class Templates(unittest.TestCase):
         self.assertEqual(failures, [], "Tests failed:\n%s\n%s" %
             ('-'*70, ("\n%s\n" % ('-'*70)).join(failures)))
 
+    @override_settings(TEMPLATE_COMPILE=True)
+    def test_compiled_templates(self):
+        # Compiled templates render exactly like node-walked ones.
+        self.test_templates()
+
+    stream = False
+
+    def test_streamed_templates(self):
+        # Streamed templates yield the same output as render().
+        self.stream = True
+        try:
+            self.test_templates()
+        finally:
+            self.stream = False
+
     def render(self, test_template, vals):
         context = template.Context(vals[1])
         before_stack_size = len(context.dicts)
-        output = test_template.render(context)
+        if self.stream:
+            output = ''.join(test_template.stream(context, chunk_size=0))
+        else:
+            output = test_template.render(context)
         if len(context.dicts) != before_stack_size:
             raise ContextStackException
         return output
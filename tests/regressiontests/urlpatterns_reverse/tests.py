@@ -3,11 +3,15 @@ Unit tests for reverse URL lookups.
 """
 from __future__ import absolute_import, unicode_literals
 
+from decimal import Decimal
+
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ImproperlyConfigured, ViewDoesNotExist
+from django.core import urlresolvers
 from django.core.urlresolvers import (reverse, resolve, get_callable,
-    get_resolver, NoReverseMatch, Resolver404, ResolverMatch, RegexURLResolver,
+    get_resolver, literal_prefix, reverse_validators, clear_url_caches,
+    NoReverseMatch, Resolver404, ResolverMatch, RegexURLResolver,
     RegexURLPattern)
 from django.http import HttpResponseRedirect, HttpResponsePermanentRedirect
 from django.shortcuts import redirect
@@ -171,6 +175,23 @@ class URLPatternReverse(TestCase):
         # Reversing None should raise an error, not return the last un-named view.
         self.assertRaises(NoReverseMatch, reverse, None)
 
+    def test_reverse_cache(self):
+        clear_url_caches()
+        self.assertEqual(reverse('places', args=[3]), '/places/3/')
+        self.assertEqual(len(urlresolvers._reverse_cache), 1)
+        self.assertEqual(reverse('places', args=[3]), '/places/3/')
+        self.assertEqual(len(urlresolvers._reverse_cache), 1)
+        # Equal arguments of different types are cached separately.
+        self.assertEqual(reverse('people', kwargs={'name': True}), '/people/True/')
+        self.assertEqual(reverse('people', kwargs={'name': 1}), '/people/1/')
+        self.assertEqual(len(urlresolvers._reverse_cache), 3)
+        # Failures and arguments of other types aren't cached.
+        self.assertRaises(NoReverseMatch, reverse, 'places', args=['x'])
+        self.assertEqual(reverse('places', args=[Decimal(3)]), '/places/3/')
+        self.assertEqual(len(urlresolvers._reverse_cache), 3)
+        clear_url_caches()
+        self.assertEqual(len(urlresolvers._reverse_cache), 0)
+
 class ResolverTests(unittest.TestCase):
     def test_resolver_repr(self):
         """
@@ -232,6 +253,120 @@ class ResolverTests(unittest.TestCase):
                         else:
                             self.assertEqual(t.name, e['name'], 'Wrong URL name.  Expected "%s", got "%s".' % (e['name'], t.name))
 
+    def test_literal_prefix(self):
+        for pattern, prefix in [
+            (r'^$', ''),
+            (r'normal/$', ''),
+            (r'^normal/(?P<arg1>\d+)/$', 'normal/'),
+            (r'^a\.b\-c/\d+/$', 'a.b-c/'),
+            (r'^ab?c/', 'a'),
+            (r'^ab*/', 'a'),
+            (r'^ab{2}/', 'a'),
+            (r'^a\.?/', 'a'),
+            (r'^a|b/', ''),
+            (r'^(a|b)/', ''),
+            (r'^a[|]/', 'a'),
+            (r'^a(b|c)/', 'a'),
+            (r'^\w+/', ''),
+            (r'^(?i)a/', ''),
+            (r'^abc/(?i)$', ''),
+            (r'^abc/(?x)$', ''),
+            (r'^abc/\\(?i)$', ''),
+            (r'^abc/(?:x)$', 'abc/'),
+            (r'^abc/(?P<i>\d+)$', 'abc/'),
+        ]:
+            self.assertEqual(literal_prefix(pattern), prefix, pattern)
+
+    def test_prefix_index_first_match(self):
+        """
+        Indexing patterns by their literal prefix doesn't change which one
+        matches first.
+        """
+        patterns = [
+            RegexURLPattern(r'^a/b/$', views.empty_view, name='ab'),
+            RegexURLPattern(r'b/$', views.empty_view, name='unanchored'),
+            RegexURLPattern(r'^a/', views.empty_view, name='a'),
+            RegexURLPattern(r'^a|q/$', views.empty_view, name='alternation'),
+            RegexURLPattern(r'^ab?/x/$', views.empty_view, name='optional'),
+            RegexURLResolver(r'^inc/', [
+                RegexURLPattern(r'^$', views.empty_view, name='inc-empty'),
+                RegexURLPattern(r'^(?P<arg>\d+)/$', views.empty_view, name='inc-arg'),
+            ]),
+            RegexURLPattern(r'^inc/', views.empty_view, name='inc-fallback'),
+            RegexURLPattern(r'^', views.empty_view, name='catch-all'),
+        ]
+        resolver = RegexURLResolver(r'^/', patterns)
+        for path in ['/a/b/', '/a/c/', '/x/b/', '/xq/', '/ab/x/', '/b/x/',
+                     '/inc/', '/inc/42/', '/inc/x/', '/zzz/', '/']:
+            # The first pattern matching when trying them all in order.
+            for pattern in patterns:
+                try:
+                    expected = pattern.resolve(path[1:])
+                except Resolver404:
+                    continue
+                if expected:
+                    break
+            self.assertEqual(resolver.resolve(path).url_name, expected.url_name, path)
+        self.assertEqual(resolver.resolve('/a/b/').url_name, 'ab')
+        self.assertEqual(resolver.resolve('/x/b/').url_name, 'unanchored')
+        self.assertEqual(resolver.resolve('/xq/').url_name, 'alternation')
+        self.assertEqual(resolver.resolve('/inc/42/').url_name, 'inc-arg')
+        self.assertEqual(resolver.resolve('/zzz/').url_name, 'catch-all')
+
+    def test_prefix_index_inline_flags(self):
+        """
+        Patterns setting global flags after their literal text aren't
+        indexed by a prefix which doesn't account for the flags.
+        """
+        patterns = [
+            RegexURLPattern(r'^abc/(?i)$', views.empty_view, name='insensitive'),
+            RegexURLPattern(r'^', views.empty_view, name='catch-all'),
+        ]
+        resolver = RegexURLResolver(r'^/', patterns)
+        self.assertEqual(resolver.resolve('/ABC/').url_name, 'insensitive')
+        self.assertEqual(resolver.resolve('/abc/').url_name, 'insensitive')
+
+    def test_prefix_index_candidates(self):
+        patterns = [RegexURLPattern(r'^route%d/(\d+)/$' % i, views.empty_view)
+                    for i in range(2000)]
+        resolver = RegexURLResolver(r'^/', patterns)
+        self.assertEqual(resolver.resolve('/route1999/1/').func, views.empty_view)
+        # Only routes whose prefix is a prefix of the path are tried.
+        self.assertEqual(resolver._candidates(patterns, 'route1999/1/'), [1999])
+        with self.assertRaises(Resolver404) as cm:
+            resolver.resolve('/route2000/1/')
+        # Every pattern is reported as tried.
+        self.assertEqual(len(cm.exception.args[0]['tried']), 2000)
+
+    def test_reverse_validators(self):
+        format, validators = reverse_validators(r'^people/(?P<name>\w+)/(\d+)/$')
+        self.assertEqual(format, 'people/%(name)s/%(_0)s/')
+        self.assertTrue(validators['name'].match('joe'))
+        self.assertFalse(validators['name'].match('joe/'))
+        self.assertTrue(validators['_0'].match('42'))
+        self.assertEqual(reverse_validators(r'^doc\.pdf$'), ('doc.pdf', {}))
+        # Patterns whose groups depend on their surroundings, or with parts
+        # which aren't literal text, are always matched as a whole.
+        for pattern in [r'^places?/$', r'^(?:places/)$', r'^(?P<x>\d+)+/$',
+                        r'^(?P<x>\w+)-(?P=x)/$', r'^(?P<x>\bfoo)/$',
+                        r'^(?P<x>a|b)/[a-z]/$', r'^a.b/$']:
+            self.assertEqual(reverse_validators(pattern), None, pattern)
+
+    def test_reverse_templates(self):
+        resolver = RegexURLResolver(r'^/', [
+            RegexURLPattern(r'^num/(?P<x>\d+)/$', views.empty_view, name='v'),
+            RegexURLPattern(r'^word/(?P<x>[a-z]+)/$', views.empty_view, name='v'),
+            RegexURLPattern(r'^back/(?P<x>\w+)-(?P=x)/$', views.empty_view, name='w'),
+        ])
+        templates = resolver.reverse_templates('v', '/')
+        self.assertEqual([t.format for t in templates], ['/word/%(x)s/', '/num/%(x)s/'])
+        self.assertTrue(all(t.validators is not None for t in templates))
+        self.assertEqual(resolver._reverse_with_prefix('v', '/', x=42), '/num/42/')
+        self.assertEqual(resolver._reverse_with_prefix('v', '/', x='abc'), '/word/abc/')
+        self.assertRaises(NoReverseMatch, resolver._reverse_with_prefix, 'v', '/', x='a-b')
+        self.assertEqual(resolver.reverse_templates('w', '/')[0].validators, None)
+        self.assertEqual(resolver._reverse_with_prefix('w', '/', x='a'), '/back/a-a/')
+
 class ReverseLazyTest(TestCase):
     urls = 'regressiontests.urlpatterns_reverse.reverse_lazy_urls'
 
@@ -8,7 +8,7 @@ import warnings
 
 from django.test import SimpleTestCase
 from django.utils.datastructures import (DictWrapper, ImmutableList,
-    MultiValueDict, MultiValueDictKeyError, MergeDict, SortedDict)
+    LRUDict, MultiValueDict, MultiValueDictKeyError, MergeDict, SortedDict)
 from django.utils import six
 
 
@@ -299,3 +299,42 @@ class DictWrapperTests(SimpleTestCase):
         d = DictWrapper({'a': 'a'}, f, 'xx_')
         self.assertEqual("Normal: %(a)s. Modified: %(xx_a)s" % d,
                           'Normal: a. Modified: *a')
+
+
+class LRUDictTests(SimpleTestCase):
+    def test_eviction_order(self):
+        d = LRUDict(3)
+        d['a'] = 1
+        d['b'] = 2
+        d['c'] = 3
+        # Reading 'a' makes 'b' the least recently used key.
+        self.assertEqual(d['a'], 1)
+        d['d'] = 4
+        self.assertEqual(d.keys(), ['c', 'a', 'd'])
+        self.assertFalse('b' in d)
+        # Updating a key also marks it as used.
+        d['c'] = 30
+        d['e'] = 5
+        self.assertEqual(d.keys(), ['d', 'c', 'e'])
+        self.assertEqual(len(d), 3)
+
+    def test_dict_methods(self):
+        d = LRUDict(2)
+        d[1] = 'one'
+        self.assertEqual(d.get(1), 'one')
+        self.assertEqual(d.get(2), None)
+        self.assertEqual(d.get(2, 'two'), 'two')
+        self.assertRaises(KeyError, d.__getitem__, 2)
+        self.assertEqual(d.pop(1), 'one')
+        self.assertEqual(d.pop(1, None), None)
+        self.assertRaises(KeyError, d.pop, 1)
+        d[2] = 'two'
+        d[3] = 'three'
+        del d[2]
+        self.assertEqual(list(d), [3])
+        self.assertEqual(d.popitem(), (3, 'three'))
+        self.assertRaises(KeyError, d.popitem)
+        d[4] = 'four'
+        d.clear()
+        self.assertEqual(len(d), 0)
+        self.assertRaises(ValueError, LRUDict, 0)
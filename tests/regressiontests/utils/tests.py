@@ -8,7 +8,7 @@ from .baseconv import TestBaseConv
 from .checksums import TestUtilsChecksums
 from .crypto import TestUtilsCryptoMisc, TestUtilsCryptoPBKDF2
 from .datastructures import (DictWrapperTests, ImmutableListTests,
-    MergeDictTests, MultiValueDictTests, SortedDictTests)
+    LRUDictTests, MergeDictTests, MultiValueDictTests, SortedDictTests)
 from .dateformat import DateFormatTests
 from .dateparse import DateParseTests
 from .datetime_safe import DatetimeTests